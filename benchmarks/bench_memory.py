@@ -0,0 +1,48 @@
+"""Benchmark per-insert cost of ChatHistoryMemory.add_message
+
+Fills a memory whose window is already full, so every insert also evicts,
+and reports the mean cost per insert for window sizes from 10 to 1,000,000.
+
+    $ python benchmarks/bench_memory.py
+"""
+
+import os
+import sys
+from time import perf_counter
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=wrong-import-position
+from examples.demo_tool_usage import ChatHistoryMemory
+from examples.messages import BaseMessage
+
+WINDOW_SIZES = (10, 1_000, 100_000, 1_000_000)
+INSERTS = 200_000
+
+
+def bench_add_message(window_size: int, inserts: int = INSERTS) -> float:
+    """Return mean seconds per insert into a full window of ``window_size``"""
+    memory = ChatHistoryMemory(window_size=window_size)
+    message = BaseMessage("User", "benchmark message", "user")
+    for _ in range(window_size):
+        memory.add_message(message)
+
+    start = perf_counter()
+    for _ in range(inserts):
+        memory.add_message(message)
+    elapsed = perf_counter() - start
+    assert len(memory.messages) == window_size
+    return elapsed / inserts
+
+
+def main() -> None:
+    """Print per-insert cost for each window size"""
+    print(f"{'window_size':>12}  {'ns/insert':>10}")
+    for window_size in WINDOW_SIZES:
+        per_insert = bench_add_message(window_size)
+        print(f"{window_size:>12}  {per_insert * 1e9:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
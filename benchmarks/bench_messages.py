@@ -0,0 +1,68 @@
+"""Benchmark memory held by one million stored messages
+
+Compares the slotted BaseMessage and FrozenMessage with a plain dataclass
+equivalent to the previous BaseMessage. Role strings are built at runtime
+(as they are when messages are parsed from JSON) so the plain dataclass
+holds a copy per message while the slotted types intern them. Message
+contents are shared and not counted.
+
+    $ python benchmarks/bench_messages.py
+"""
+
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=wrong-import-position
+from examples.messages import BaseMessage, FrozenMessage
+
+MESSAGES = 1_000_000
+ROLES = (("System", "system"), ("Assistant", "assistant"), ("User", "user"))
+
+
+@dataclass
+class DictMessage:
+    """Plain dataclass with a per-instance __dict__ (the old layout)"""
+
+    role_name: str
+    content: str
+    role_type: str = "user"
+    optimization_phrase: Optional[str] = None
+
+
+def bench_footprint(factory: Callable, count: int = MESSAGES) -> float:
+    """Return bytes allocated per message held in a list of ``count``"""
+    content = "benchmark message"
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    # "".join builds fresh, non-interned strings like a JSON decoder does
+    history = [
+        factory("".join(ROLES[i % 3][0]), content, "".join(ROLES[i % 3][1]))
+        for i in range(count)
+    ]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(history) == count
+    return (after - before) / count
+
+
+def main() -> None:
+    """Print bytes per message and MB per million messages for each type"""
+    baseline = bench_footprint(DictMessage)
+    print(f"{'type':>14}  {'bytes/msg':>9}  {'MB/1M msgs':>10}  {'saved':>6}")
+    for factory in (DictMessage, BaseMessage, FrozenMessage):
+        per_message = bench_footprint(factory)
+        saved = 1 - per_message / baseline
+        print(
+            f"{factory.__name__:>14}  {per_message:>9.0f}"
+            f"  {per_message * MESSAGES / 1e6:>10.1f}  {saved:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""Benchmark suite for the agent hot paths
+
+Runs every benchmark (or those whose name matches the ``--filter`` glob,
+e.g. ``memory_add_*``; a plain name selects just that one), writes
+the results as JSON and optionally compares them against a stored
+baseline, exiting non-zero when any benchmark regressed by more than
+``--threshold``. Only the standard library and the repo itself are used,
+so the suite runs offline.
+
+    $ python benchmarks/suite.py --output results.json
+    $ python benchmarks/suite.py --output new.json --compare results.json
+
+Each result is the best of several repeats in seconds per operation;
+taking the minimum filters out scheduler noise on a shared box.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from statistics import median
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=wrong-import-position
+from examples.demo_tool_usage import (
+    BaseTool,
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+    TextRatingTool,
+    setup_tool_agent,
+)
+from examples.file_context import FileContextStore
+from examples.filters import FilterChain, reject
+from examples.messages import BaseMessage
+from examples.search import build_index
+
+DEFAULT_THRESHOLD = 0.25
+REPEATS = 5
+
+
+def best_of(func: Callable[[], None], number: int, repeats: int = REPEATS) -> float:
+    """Best mean seconds per call of ``func`` over ``repeats`` runs"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter() - start) / number)
+    return best
+
+
+def make_tools(count: int) -> List[type]:
+    """``count`` distinct trivial tool classes named tool_0, tool_1, ..."""
+    return [
+        type(
+            f"BenchTool{i}",
+            (BaseTool,),
+            {"name": f"tool_{i}", "execute": lambda self, *args, **kwargs: "ok"},
+        )
+        for i in range(count)
+    ]
+
+
+def bench_step(tool_count: int) -> float:
+    """Seconds per ``step`` with ``tool_count`` tools, one of them matched"""
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=make_tools(tool_count))
+    message = BaseMessage("User", f"please use tool_{tool_count - 1} now")
+    return best_of(lambda: agent.step(message), number=2000)
+
+
+def bench_step_no_match() -> float:
+    """Seconds per ``step`` of the demo agent when no tool matches"""
+    agent = setup_tool_agent()
+    message = BaseMessage("User", "Just say hello to everyone")
+    return best_of(lambda: agent.step(message), number=5000)
+
+
+def bench_memory(window_size: int) -> float:
+    """Seconds per ``add_message`` into a full window of ``window_size``"""
+    memory = ChatHistoryMemory(window_size=window_size)
+    message = BaseMessage("User", "benchmark message", "user")
+    memory.add_messages(message for _ in range(window_size))
+    return best_of(lambda: memory.add_message(message), number=20000)
+
+
+def bench_shared_memory(threads: int, steps: int = 300) -> float:
+    """Seconds per ``step`` with ``threads`` agents sharing one memory
+
+    Steps are CPU-bound under the GIL, so compare against one thread to
+    spot lock convoys rather than expecting linear scaling.
+    """
+    best = float("inf")
+    for _ in range(REPEATS):
+        memory = ChatHistoryMemory(window_size=50)
+        agents = [
+            ChatAgent(memory=memory, tools=[GreetingTool, TextRatingTool])
+            for _ in range(threads)
+        ]
+        barrier = threading.Barrier(threads + 1)
+
+        def work(agent: ChatAgent) -> None:
+            barrier.wait()
+            for i in range(steps):
+                agent.step(BaseMessage("User", f"m{i} rating_tool: hi"))
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(work, agent) for agent in agents]
+            barrier.wait()
+            start = perf_counter()
+            for future in futures:
+                future.result()
+            best = min(best, (perf_counter() - start) / (threads * steps))
+        for agent in agents:
+            agent.close()
+    return best
+
+
+def bench_filters(rule_count: int) -> float:
+    """Seconds per filter pass over a tagged message with ``rule_count`` rules"""
+    chain = FilterChain.default()
+    for i in range(rule_count - len(chain)):
+        chain.add_rule(f"CUSTOM {i}", reject)
+    message = BaseMessage(
+        "User", "Private: 12345, Public: 67890 [STORE ONLY PUBLIC]", "user"
+    )
+    return best_of(lambda: chain.apply(message), number=20000)
+
+
+def bench_search(message_count: int) -> float:
+    """Seconds per ``search`` over a memory index of ``message_count`` messages"""
+    rng = random.Random(0)
+    words = [f"term{i}" for i in range(20_000)]
+    index = build_index(
+        " ".join(rng.choice(words) for _ in range(12)) for _ in range(message_count)
+    )
+    return best_of(lambda: index.search("term17 term99 term123", k=10), number=200)
+
+
+def bench_delegation(worker_count: int) -> float:
+    """Seconds per broadcast delegation to ``worker_count`` workers"""
+    workers = [
+        ChatAgent(memory=ChatHistoryMemory(), tools=[]) for _ in range(worker_count)
+    ]
+    agent = ChatAgent(
+        memory=ChatHistoryMemory(),
+        tools=[],
+        delegate_workers=workers,
+        delegation_strategy="broadcast",
+        delegation_timeout=10.0,
+    )
+    message = BaseMessage("User", "delegate to workers: summarize the notes")
+    try:
+        return best_of(lambda: agent.step(message), number=200)
+    finally:
+        agent.close()
+
+
+def bench_rating(megabytes: int) -> float:
+    """Seconds per ``TextRatingTool.execute`` on ``megabytes`` MB of text"""
+    text = "lorem ipsum dolor " * (megabytes * (1 << 20) // 18)
+    tool = TextRatingTool()
+    return best_of(lambda: tool.execute(text), number=3)
+
+
+def bench_file_edit(megabytes: int, patch: bool) -> float:
+    """Seconds per one-word edit of a ``megabytes`` MB context file
+
+    With ``patch`` the word is changed with ``FileContextStore.patch``
+    writing in place, otherwise the whole file is rewritten with ``write``.
+    """
+    text = "lorem ipsum dolor " * (megabytes * (1 << 20) // 18)
+    words = iter(range(10**9))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "context.txt")
+        store = FileContextStore(sync="none", patch_in_place=patch)
+        store.write(path, text + "word0")
+        store.add(path)
+        current = ["word0"]
+
+        def edit() -> None:
+            word = f"word{next(words) % 10}"
+            if patch:
+                store.patch(path, current[0], word)
+            else:
+                store.write(path, text + word)
+            current[0] = word
+
+        return best_of(edit, number=5)
+
+
+def bench_cli_cold_start() -> float:
+    """Median wall time of ``python -m examples.cli --help`` in a new process"""
+    command = [sys.executable, "-m", "examples.cli", "--help"]
+    timings = []
+    for _ in range(REPEATS):
+        start = perf_counter()
+        subprocess.run(
+            command, cwd=project_root, check=True, stdout=subprocess.DEVNULL
+        )
+        timings.append(perf_counter() - start)
+    return median(timings)
+
+
+BENCHMARKS: Dict[str, Callable[[], float]] = {
+    "step_no_match": bench_step_no_match,
+    "step_tools_3": lambda: bench_step(3),
+    "step_tools_100": lambda: bench_step(100),
+    "step_tools_10000": lambda: bench_step(10_000),
+    "memory_add_window_1000": lambda: bench_memory(1_000),
+    "memory_add_window_100000": lambda: bench_memory(100_000),
+    "memory_add_window_1000000": lambda: bench_memory(1_000_000),
+    "memory_shared_threads_1": lambda: bench_shared_memory(1),
+    "memory_shared_threads_8": lambda: bench_shared_memory(8),
+    "memory_filter_rules_3": lambda: bench_filters(3),
+    "memory_filter_rules_1000": lambda: bench_filters(1_000),
+    "memory_search_100000": lambda: bench_search(100_000),
+    "delegation_broadcast_1": lambda: bench_delegation(1),
+    "delegation_broadcast_8": lambda: bench_delegation(8),
+    "delegation_broadcast_32": lambda: bench_delegation(32),
+    "rating_tool_1mb": lambda: bench_rating(1),
+    "rating_tool_16mb": lambda: bench_rating(16),
+    "file_edit_16mb": lambda: bench_file_edit(16, patch=False),
+    "file_patch_16mb": lambda: bench_file_edit(16, patch=True),
+    "cli_cold_start": bench_cli_cold_start,
+}
+
+
+def run(name_filter: str = "*") -> Dict[str, float]:
+    """Run the benchmarks whose name matches the ``name_filter`` glob
+
+    Each result is printed as it finishes.
+    """
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if not fnmatch.fnmatchcase(name, name_filter):
+            continue
+        results[name] = bench()
+        print(f"{name:<28} {results[name] * 1e6:>14.2f} us", file=sys.stderr)
+    return results
+
+
+def compare(
+    current: Dict[str, float],
+    baseline: Dict[str, float],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Tuple[str, float, float, float, bool]]:
+    """Compare results with a baseline
+
+    Returns:
+        (name, baseline s/op, current s/op, ratio, regressed) for every
+        benchmark present in both
+    """
+    rows = []
+    for name in current:
+        if name not in baseline or not baseline[name]:
+            continue
+        ratio = current[name] / baseline[name]
+        rows.append((name, baseline[name], current[name], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def load_results(path: str) -> Dict[str, float]:
+    """Read the per-benchmark seconds from a results file"""
+    with open(path, encoding="utf-8") as f:
+        results = json.load(f)["results"]
+    return {name: entry["seconds"] for name, entry in results.items()}
+
+
+def write_results(path: str, results: Dict[str, float]) -> None:
+    """Write results with enough metadata to judge comparability"""
+    document = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {
+            name: {"seconds": seconds, "unit": "s/op"}
+            for name, seconds in results.items()
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite; return 1 if a compared benchmark regressed"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", "-o", help="write results as JSON to this file")
+    parser.add_argument("--compare", "-c", help="baseline results file to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown before flagging a regression (default: 0.25)",
+    )
+    parser.add_argument(
+        "--filter",
+        "-k",
+        default="*",
+        help="only run benchmarks whose name matches this glob (default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.filter)
+    if args.output:
+        write_results(args.output, results)
+    if not args.compare:
+        return 0
+
+    rows = compare(results, load_results(args.compare), args.threshold)
+    print(f"{'benchmark':<28} {'baseline us':>12} {'current us':>12} {'ratio':>7}")
+    for name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<28} {before * 1e6:>12.2f} {after * 1e6:>12.2f}"
+            f" {ratio:>7.2f}{flag}"
+        )
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
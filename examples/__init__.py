@@ -1,25 +1,35 @@
-"""Example modules package"""
-
-from .demo_tool_usage import (
-    GreetingTool,
-    TextRatingTool,
-    DiskUsageTool,
-    setup_tool_agent,
-    ChatAgent,
-    ChatHistoryMemory,
-    cli_main,
-)
-from .messages import BaseMessage
-from .cli import main
-
-__all__ = [
-    "GreetingTool",
-    "TextRatingTool",
-    "DiskUsageTool",
-    "setup_tool_agent",
-    "BaseMessage",
-    "ChatAgent",
-    "ChatHistoryMemory",
-    "cli_main",
-    "main",
-]
+"""Example modules package
+
+Exports are resolved lazily on first attribute access, so importing a
+submodule such as ``examples.cli`` does not pull in the agent and tool
+modules until they are actually used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "GreetingTool": ".demo_tool_usage",
+    "TextRatingTool": ".demo_tool_usage",
+    "DiskUsageTool": ".demo_tool_usage",
+    "setup_tool_agent": ".demo_tool_usage",
+    "BaseMessage": ".messages",
+    "ChatAgent": ".demo_tool_usage",
+    "ChatHistoryMemory": ".demo_tool_usage",
+    "cli_main": ".demo_tool_usage",
+    "main": ".cli",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
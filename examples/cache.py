@@ -0,0 +1,94 @@
+"""Result caching for tools declared as cacheable"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Counters reported by a ToolResultCache"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+
+# Returned by ToolResultCache.get when there is no usable entry
+MISSING = object()
+
+
+class ToolResultCache:
+    """Thread-safe LRU cache of tool results with an optional TTL
+
+    Holds at most ``max_entries`` results, evicting the least recently used
+    one when full. With ``ttl`` set, entries older than ``ttl`` seconds are
+    treated as misses and dropped when next looked up.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._stats = CacheStats()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached result for ``key`` or the ``MISSING`` sentinel"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl is None or self._clock() - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return value
+                del self._entries[key]
+                self._stats.expirations += 1
+            self._stats.misses += 1
+            return MISSING
+
+    def put(self, key: Hashable, value: str) -> None:
+        """Store ``value`` under ``key``, evicting the LRU entry if full"""
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit/miss/eviction counters"""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                size=len(self._entries),
+            )
+
+
+def cache_for(tool_cls: Any) -> Optional[ToolResultCache]:
+    """Build the cache a tool class declares, or None if it is uncached"""
+    max_entries = getattr(tool_cls, "cache_size", 0)
+    if not max_entries:
+        return None
+    return ToolResultCache(max_entries, ttl=getattr(tool_cls, "cache_ttl", None))
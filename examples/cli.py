@@ -1,33 +1,190 @@
-"""Command line interface for interacting with the agent"""
+"""Command line interface for interacting with the agent
+
+Only ``click`` and the standard library are imported at module load.
+The agent, tool, message, client and server modules are imported on first
+use, so ``--help`` and ``--version`` start as fast as possible.
+"""
+
+# Every import inside a function here is one of the lazy agent modules
+# pylint: disable=import-outside-toplevel
+import functools
+import json
+import sys
+from collections import deque
+from itertools import cycle
+from time import perf_counter
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 import click
-from .demo_tool_usage import setup_tool_agent, ChatAgent
-from .messages import BaseMessage
+
+if TYPE_CHECKING:
+    from .client import AgentClient
+    from .demo_tool_usage import ChatAgent
+    from .messages import StreamChunk
+
+# Flush streamed batch output every this many records
+BATCH_FLUSH_EVERY = 64
 
 
-def process_message(agent: ChatAgent, message: str, verbose: bool = False) -> str:
-    """Process a single message through the agent
-    
+def stream_message(
+    agent: "ChatAgent", message: str, verbose: bool = False
+) -> Iterator[str]:
+    """Process a single message, yielding output lines as they are ready
+
+    Each tool or worker result is yielded as soon as it completes.
+
     Args:
         agent: Configured ChatAgent instance
         message: User input message
         verbose: Show system reflections if True
-        
-    Returns:
-        str: Formatted response string
+
+    Yields:
+        str: Formatted output lines
     """
+    from .messages import BaseMessage
+
     if not message.strip():
         raise click.UsageError("Received empty message")
     user_msg = BaseMessage.make_user_message(role_name="User", content=message)
-    response = agent.step(user_msg)
+    yield from format_chunks(agent.step_stream(user_msg))
+    if verbose:
+        yield f"[System reflection] {agent.memory.messages[-1].content}"
+
 
-    output = f"Agent: {response.content}"
+def format_chunks(chunks: Iterable["StreamChunk"]) -> Iterator[str]:
+    """Output lines for streamed chunks
+
+    The final response repeats the streamed results, so it is only
+    yielded when nothing was streamed before it.
+    """
+    streamed = False
+    for chunk in chunks:
+        if chunk.final and streamed:
+            break
+        yield chunk.content if streamed else f"Agent: {chunk.content}"
+        streamed = True
+
+
+def remote_message(
+    client: "AgentClient", message: str, verbose: bool = False
+) -> Iterator[str]:
+    """``stream_message`` for an agent behind ``camel-agent serve``"""
+    if not message.strip():
+        raise click.UsageError("Received empty message")
+    yield from format_chunks(client.stream(message, verbose))
     if verbose:
-        output += f"\n[System reflection] {agent.memory.messages[-1].content}"
-    return output
+        yield f"[System reflection] {client.last_reflection}"
+
+
+def read_batch(stream: IO[str]) -> Iterator[Tuple[object, Optional[str], str]]:
+    """Parse batch input lazily, one line at a time
+
+    Lines starting with ``{`` are JSON objects carrying ``message`` (or
+    ``content``) and an optional ``id``; any other non-blank line is a
+    plain message whose id is its line number.
+
+    Yields:
+        (id, message or None, error text) for each non-blank line
+    """
+    for line_no, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        if not line.lstrip().startswith("{"):
+            yield line_no, line, ""
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        message = record.get("message", record.get("content"))
+        if not isinstance(message, str) or not message.strip():
+            yield record.get("id", line_no), None, "Missing message"
+            continue
+        yield record.get("id", line_no), message, ""
+
+
+def run_batch(agents: List["ChatAgent"], stream: IO[str], out: IO[str]) -> int:
+    """Stream responses for batch input as JSONL
+
+    One agent processes messages in order through ``step_many``; several
+    agents take messages round-robin and step in parallel. Each output
+    record carries the input id, the response and its latency in ms (the
+    time its step took, excluding time queued behind other messages);
+    records for invalid lines keep their place in the input order.
+
+    Returns:
+        int: number of records written
+    """
+    from .demo_tool_usage import step_many_sessions
+    from .messages import BaseMessage
+
+    # Input records not written yet, in input order: (id, error, read at);
+    # error is None for messages handed to the agents
+    pending: Deque[Tuple[object, Optional[str], float]] = deque()
+
+    def messages() -> Iterator[BaseMessage]:
+        for message_id, message, error in read_batch(stream):
+            if message is None:
+                pending.append((message_id, error, 0.0))
+                continue
+            pending.append((message_id, None, perf_counter()))
+            yield BaseMessage.make_user_message(role_name="User", content=message)
+
+    if len(agents) == 1:
+        # step_many reads each message right before stepping it
+        timed: Iterable[Tuple["BaseMessage", Optional[float]]] = (
+            (response, None) for response in agents[0].step_many(messages())
+        )
+    else:
+        # Messages are read ahead, so time each step where it runs
+        timed = step_many_sessions(
+            zip(cycle(agents), messages()), max_workers=len(agents), timed=True
+        )
+
+    written = 0
+
+    def emit(record: dict) -> None:
+        nonlocal written
+        out.write(json.dumps(record) + "\n")
+        written += 1
+        if written % BATCH_FLUSH_EVERY == 0:
+            out.flush()
 
+    def emit_errors() -> None:
+        while pending and pending[0][1] is not None:
+            message_id, error, _ = pending.popleft()
+            emit({"id": message_id, "error": error})
 
-@click.command()
+    for response, seconds in timed:
+        # Invalid lines read before this response's message come first
+        emit_errors()
+        message_id, _, started = pending.popleft()
+        if seconds is None:
+            seconds = perf_counter() - started
+        emit(
+            {
+                "id": message_id,
+                "response": response.content,
+                "latency_ms": round(seconds * 1000, 3),
+            }
+        )
+    emit_errors()
+    out.flush()
+    return written
+
+
+@click.group(invoke_without_command=True)
 @click.option("--message", "-m", help="Direct message to send to the agent")
 @click.option(
     "--verbose",
@@ -35,35 +192,178 @@ def process_message(agent: ChatAgent, message: str, verbose: bool = False) -> st
     is_flag=True,
     help="Show detailed processing information including system reflections",
 )
+@click.option(
+    "--batch",
+    "-b",
+    type=click.File("r", encoding="utf-8"),
+    help="Process newline-delimited messages or JSONL from FILE ('-' for stdin)"
+    " and stream JSONL responses",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of warm agents sharing the batch round-robin",
+)
+@click.option(
+    "--connect",
+    "-c",
+    metavar="ADDRESS",
+    help="Talk to a running 'serve' instance at a Unix socket path or"
+    " http://127.0.0.1:PORT instead of starting an agent",
+)
+@click.option(
+    "--session",
+    "-s",
+    default="default",
+    show_default=True,
+    help="Session id to use with --connect",
+)
+@click.option(
+    "--token",
+    envvar="CAMEL_AGENT_TOKEN",
+    help="Token printed by 'serve --port', needed to --connect over HTTP",
+)
 @click.version_option(version="0.1.0", prog_name="Agent CLI")
-def main(message=None, verbose=False):
+@click.pass_context
+def main(
+    ctx,
+    message=None,
+    verbose=False,
+    batch=None,
+    workers=1,
+    connect=None,
+    session="default",
+    token=None,
+):
     """Chat with an AI agent that can use tools
 
-    Run in either direct message mode or interactive conversation mode.
+    Run in either direct message mode or interactive conversation mode,
+    against a local agent or, with --connect, a long-lived server.
 
     Examples:
 
     \b
     $ python -m examples.cli --message "Hello"
     $ python -m examples.cli --verbose --message "Check disk usage"
+    $ python -m examples.cli --batch messages.jsonl > responses.jsonl
+    $ python -m examples.cli serve --socket /tmp/agent.sock &
+    $ python -m examples.cli --connect /tmp/agent.sock -m "Hello"
     """
-    agent = setup_tool_agent()
+    if ctx.invoked_subcommand is not None:
+        return
+
+    if batch is not None and message is not None:
+        raise click.UsageError("--batch cannot be combined with --message")
+    if connect is not None:
+        if batch is not None:
+            raise click.UsageError("--batch cannot be combined with --connect")
+        from .client import AgentClient
 
-    if message is not None:  # Direct message mode (check for option presence)
-        if not message.strip():
-            raise click.UsageError("Message cannot be empty when using --message")
-        click.echo(process_message(agent, message, verbose))
+        client = AgentClient(connect, session=session, token=token)
+        respond = functools.partial(remote_message, client)
     else:
-        click.echo("How can I help you?")
-        while True:
-            try:
-                message = input("> ")
-                if message.lower() in ["exit", "quit"]:
+        from .demo_tool_usage import setup_tool_agent
+
+        if batch is not None:
+            agents = [setup_tool_agent() for _ in range(workers)]
+            run_batch(agents, batch, sys.stdout)
+            return
+        respond = functools.partial(stream_message, setup_tool_agent())
+
+    try:
+        if message is not None:  # Direct message mode (check for option presence)
+            if not message.strip():
+                raise click.UsageError("Message cannot be empty when using --message")
+            for line in respond(message, verbose):
+                click.echo(line)
+        else:
+            click.echo("How can I help you?")
+            while True:
+                try:
+                    message = input("> ")
+                    if message.lower() in ["exit", "quit"]:
+                        break
+                    for line in respond(message, verbose):
+                        click.echo(line)
+                except (KeyboardInterrupt, EOFError):
+                    print("\nGoodbye!")
                     break
-                print(process_message(agent, message, verbose))
-            except (KeyboardInterrupt, EOFError):
-                print("\nGoodbye!")
-                break
+    except OSError as e:
+        if connect is None:
+            raise
+        raise click.ClickException(f"Cannot reach agent server at {connect}: {e}")
+    except RuntimeError as e:
+        if connect is None:
+            raise
+        raise click.ClickException(str(e))
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="Unix socket to listen on",
+)
+@click.option(
+    "--port",
+    type=click.IntRange(0, 65535),
+    help="Serve HTTP on 127.0.0.1:PORT instead (0 picks a free port)",
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0),
+    default=600.0,
+    show_default=True,
+    help="Seconds after which an unused session is closed",
+)
+@click.option(
+    "--max-sessions",
+    type=click.IntRange(min=1),
+    default=1024,
+    show_default=True,
+    help="Sessions kept before the least recently used are closed",
+)
+@click.option(
+    "--warm",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Agents kept built ahead of new sessions",
+)
+@click.option(
+    "--token",
+    envvar="CAMEL_AGENT_TOKEN",
+    help="Token HTTP clients must send; a random one is printed if not set",
+)
+def serve(socket_path, port, idle_timeout, max_sessions, warm, token):
+    """Keep warm agents in a long-lived server
+
+    Each session id gets its own agent, kept between requests; connect
+    with --connect. HTTP clients also need the token, via --token or
+    CAMEL_AGENT_TOKEN.
+    """
+    if (socket_path is None) == (port is None):
+        raise click.UsageError("Pass exactly one of --socket or --port")
+    from .server import AgentServer, SessionPool, run_server
+
+    pool = SessionPool(
+        idle_timeout=idle_timeout, max_sessions=max_sessions, warm=warm
+    )
+    server = AgentServer(pool, path=socket_path, port=port, token=token)
+
+    def ready(address: str) -> None:
+        click.echo(f"Serving on {address}", err=True)
+        if port is not None and token is None:
+            click.echo(f"Token: {server.token}", err=True)
+
+    try:
+        run_server(server, ready=ready)
+    except FileExistsError as e:
+        raise click.ClickException(str(e))
 
 
 if __name__ == "__main__":
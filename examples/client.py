@@ -0,0 +1,148 @@
+"""Thin client for a running ``camel-agent serve`` instance
+
+Only the standard library's ``json`` and ``socket`` (or ``http.client``
+for HTTP servers) are needed, so a client process starts in a fraction
+of the time it takes to build an agent. See ``examples.server`` for the
+protocol.
+"""
+
+# http.client is only needed for HTTP servers
+# pylint: disable=import-outside-toplevel
+import json
+import socket
+from typing import Any, Dict, Iterator, Optional
+
+from examples.messages import BaseMessage, StreamChunk
+
+
+class AgentClient:
+    """Send messages to one session of an agent server
+
+    Args:
+        address: Unix socket path, or ``http://host:port`` for an HTTP
+            server
+        session: Session id; every message sent with the same id goes to
+            the same warm agent
+        timeout: Socket timeout in seconds; None blocks
+        token: The server's token, required by HTTP servers
+    """
+
+    def __init__(
+        self,
+        address: str,
+        session: str = "default",
+        timeout: Optional[float] = None,
+        token: Optional[str] = None,
+    ):
+        self.address = address
+        self.session = session
+        self.timeout = timeout
+        self.token = token
+        self._stream = None
+        self._socket: Optional[socket.socket] = None
+        self.last_reflection: Optional[str] = None
+
+    @property
+    def is_http(self) -> bool:
+        """Whether the server is addressed by an HTTP URL"""
+        return self.address.startswith("http://")
+
+    def request(self, **request: Any) -> Iterator[Dict[str, Any]]:
+        """Send one request, yielding its reply records
+
+        Raises:
+            RuntimeError: The server answered with an error record
+        """
+        request.setdefault("session", self.session)
+        payload = json.dumps(request).encode("utf-8")
+        lines = self._http(payload) if self.is_http else self._unix(payload)
+        complete = False
+        try:
+            for line in lines:
+                reply = json.loads(line)
+                complete = "chunk" not in reply
+                if "error" in reply:
+                    raise RuntimeError(f"Agent server error: {reply['error']}")
+                yield reply
+                if complete:
+                    return
+        finally:
+            # Replies left unread would be taken for the next request's
+            if not complete:
+                self.close()
+
+    def _unix(self, payload: bytes) -> Iterator[bytes]:
+        if self._stream is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+            self._socket, self._stream = sock, sock.makefile("rwb")
+        self._stream.write(payload + b"\n")
+        self._stream.flush()
+        while True:
+            line = self._stream.readline()
+            if not line:
+                self.close()
+                raise ConnectionError(f"Agent server at {self.address} disconnected")
+            yield line
+
+    def _http(self, payload: bytes) -> Iterator[bytes]:
+        from http.client import HTTPConnection
+        from urllib.parse import urlsplit
+
+        url = urlsplit(self.address)
+        connection = HTTPConnection(url.hostname, url.port, timeout=self.timeout)
+        try:
+            headers = {"Content-Type": "application/json"}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            connection.request("POST", "/message", body=payload, headers=headers)
+            response = connection.getresponse()
+            if response.status != 200:
+                raise RuntimeError(
+                    f"Agent server error: {response.status} {response.reason}"
+                )
+            yield from response
+        finally:
+            connection.close()
+
+    def stream(self, message: str, verbose: bool = False) -> Iterator[StreamChunk]:
+        """Chunks of the response to ``message`` as the server sends them
+
+        The final chunk's message is the assistant response. With
+        ``verbose`` the server's reflection (its newest memory entry) is
+        kept in ``last_reflection``.
+        """
+        self.last_reflection = None
+        for reply in self.request(message=message, stream=True, verbose=verbose):
+            if "chunk" in reply:
+                yield StreamChunk(reply["chunk"], reply["source"])
+                continue
+            self.last_reflection = reply.get("reflection")
+            response = BaseMessage("Assistant", reply["response"], "assistant")
+            yield StreamChunk(response.content, message=response)
+
+    def step(self, message: str) -> str:
+        """The agent's response to ``message``"""
+        for reply in self.request(message=message):
+            return reply["response"]
+        raise ConnectionError("No response from agent server")
+
+    def end(self) -> bool:
+        """Close this client's session on the server"""
+        for reply in self.request(op="end"):
+            return reply["ended"]
+        return False
+
+    def close(self) -> None:
+        """Close the connection to a Unix socket server"""
+        if self._stream is not None:
+            self._stream.close()
+            self._socket.close()
+            self._stream = self._socket = None
+
+    def __enter__(self) -> "AgentClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,266 @@
+"""Scheduling of delegated tasks across worker agents"""
+
+import asyncio
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeout,
+    wait,
+)
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from examples.messages import BaseMessage
+
+STRATEGIES = ("broadcast", "first_response", "least_loaded")
+
+# (index of the worker in the worker list, response text)
+DelegationResult = Tuple[int, str]
+
+
+def _failure_text(error: BaseException) -> str:
+    return f"failed: {type(error).__name__}: {error}"
+
+
+class DelegationScheduler:
+    """Route delegated messages to worker agents
+
+    Strategies:
+        broadcast: every worker handles the message in parallel and all
+            responses are gathered in worker order
+        first_response: every worker starts and the first successful
+            response wins; in ``delegate`` the others finish in the
+            background, in ``adelegate`` they are cancelled
+        least_loaded: the worker with the fewest in-flight tasks handles
+            the message, ties going to the earliest worker
+
+    Each worker gets ``timeout`` seconds; slow or failing workers are
+    reported in their result text instead of raising. ``workers`` is read
+    on every call, so workers appended to the list later are scheduled too.
+    """
+
+    def __init__(
+        self,
+        workers: Sequence[Any],
+        strategy: str = "least_loaded",
+        timeout: Optional[float] = None,
+        max_threads: Optional[int] = None,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown delegation strategy {strategy!r}, "
+                f"expected one of {STRATEGIES}"
+            )
+        self.workers = workers
+        self.strategy = strategy
+        self.timeout = timeout
+        self._max_threads = max_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[int, int] = {}
+
+    @property
+    def broadcasts(self) -> bool:
+        """True when each task goes to several workers at once"""
+        return self.strategy == "broadcast" and len(self.workers) > 1
+
+    def load(self, worker: Any) -> int:
+        """Number of tasks currently running on ``worker``"""
+        return self._in_flight.get(id(worker), 0)
+
+    def _pick_least_loaded(self) -> int:
+        with self._lock:
+            index = min(
+                range(len(self.workers)), key=lambda i: self.load(self.workers[i])
+            )
+            # Reserve the slot now so concurrent callers spread out
+            self._begin(self.workers[index])
+        return index
+
+    def _begin(self, worker: Any) -> None:
+        self._in_flight[id(worker)] = self.load(worker) + 1
+
+    def _end(self, worker: Any) -> None:
+        with self._lock:
+            self._in_flight[id(worker)] -= 1
+
+    def _executor_for_workers(self) -> ThreadPoolExecutor:
+        # Kept separate from the tool executor: workers block on their own
+        # tools, and sharing one pool could starve those tool tasks.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_threads,
+                        thread_name_prefix="delegate",
+                    )
+        return self._executor
+
+    def _run(self, worker: Any, message: BaseMessage) -> str:
+        try:
+            return worker.step(message).content
+        finally:
+            self._end(worker)
+
+    async def _arun(self, worker: Any, message: BaseMessage) -> str:
+        try:
+            return (await worker.astep(message)).content
+        finally:
+            self._end(worker)
+
+    def _start_all(self) -> List[int]:
+        with self._lock:
+            for worker in self.workers:
+                self._begin(worker)
+        return list(range(len(self.workers)))
+
+    def delegate(self, message: BaseMessage) -> List[DelegationResult]:
+        """Hand ``message`` to workers according to the strategy"""
+        if not self.workers:
+            return []
+        if self.strategy == "least_loaded":
+            index = self._pick_least_loaded()
+            worker = self.workers[index]
+            if self.timeout is None:
+                try:
+                    return [(index, self._run(worker, message))]
+                except Exception as e:  # pylint: disable=broad-except
+                    return [(index, _failure_text(e))]
+            indices = [index]
+        else:
+            indices = self._start_all()
+
+        executor = self._executor_for_workers()
+        submitted = perf_counter()
+        futures = {
+            executor.submit(self._run, self.workers[i], message): i for i in indices
+        }
+        if self.strategy == "first_response":
+            return self._first_response(futures, submitted)
+
+        results = []
+        for future, index in futures.items():
+            results.append((index, self._result(future, submitted)))
+        return results
+
+    def delegate_iter(self, message: BaseMessage) -> Iterator[DelegationResult]:
+        """Like ``delegate``, yielding broadcast results as workers finish
+
+        Results come in completion order, so a slow worker does not hold
+        back the others; the other strategies yield their single result.
+        """
+        if not self.broadcasts:
+            yield from self.delegate(message)
+            return
+        indices = self._start_all()
+        executor = self._executor_for_workers()
+        submitted = perf_counter()
+        futures = {
+            executor.submit(self._run, self.workers[i], message): i for i in indices
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self._remaining(submitted),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                for future in sorted(pending, key=futures.__getitem__):
+                    yield futures[future], f"timed out after {self.timeout}s"
+                return
+            for future in sorted(done, key=futures.__getitem__):
+                yield futures[future], self._result(future, submitted)
+
+    def _remaining(self, submitted: float) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        return max(0.0, submitted + self.timeout - perf_counter())
+
+    def _result(self, future, submitted: float) -> str:
+        try:
+            return future.result(timeout=self._remaining(submitted))
+        except FutureTimeout:
+            return f"timed out after {self.timeout}s"
+        except Exception as e:  # pylint: disable=broad-except
+            return _failure_text(e)
+
+    def _first_response(self, futures, submitted: float) -> List[DelegationResult]:
+        pending = set(futures)
+        failures = []
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self._remaining(submitted),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for future in sorted(done, key=futures.__getitem__):
+                if future.exception() is None:
+                    return [(futures[future], future.result())]
+                failures.append((futures[future], _failure_text(future.exception())))
+        if failures and not pending:
+            return [min(failures)]
+        return [(min(futures.values()), f"timed out after {self.timeout}s")]
+
+    async def adelegate(self, message: BaseMessage) -> List[DelegationResult]:
+        """Async counterpart of ``delegate`` awaiting ``worker.astep``"""
+        if not self.workers:
+            return []
+        if self.strategy == "least_loaded":
+            indices = [self._pick_least_loaded()]
+        else:
+            indices = self._start_all()
+        tasks = {
+            asyncio.ensure_future(self._arun(self.workers[i], message)): i
+            for i in indices
+        }
+        if self.strategy == "first_response":
+            return await self._afirst_response(tasks)
+
+        gathered = await asyncio.gather(
+            *(asyncio.wait_for(task, self.timeout) for task in tasks),
+            return_exceptions=True,
+        )
+        results = []
+        for index, outcome in zip(tasks.values(), gathered):
+            if isinstance(outcome, asyncio.TimeoutError):
+                outcome = f"timed out after {self.timeout}s"
+            elif isinstance(outcome, BaseException):
+                outcome = _failure_text(outcome)
+            results.append((index, outcome))
+        return results
+
+    async def _afirst_response(self, tasks) -> List[DelegationResult]:
+        loop_time = asyncio.get_running_loop().time
+        deadline = None if self.timeout is None else loop_time() + self.timeout
+        pending = set(tasks)
+        failures = []
+        try:
+            while pending:
+                remaining = None
+                if deadline is not None:
+                    remaining = max(0.0, deadline - loop_time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in sorted(done, key=tasks.__getitem__):
+                    if task.exception() is None:
+                        return [(tasks[task], task.result())]
+                    failures.append((tasks[task], _failure_text(task.exception())))
+        finally:
+            for task in pending:
+                task.cancel()
+        if failures and not pending:
+            return [min(failures)]
+        return [(min(tasks.values()), f"timed out after {self.timeout}s")]
+
+    def close(self) -> None:
+        """Shut down the worker thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
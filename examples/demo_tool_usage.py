@@ -1,34 +1,478 @@
-from typing import Any, List, Optional
-from pathlib import Path
+import asyncio
+import functools
+import hashlib
+import os
+import shlex
 import shutil
-import statistics
+import threading
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FutureTimeout,
+    wait,
+)
+from itertools import islice
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from time import perf_counter
-from examples.messages import BaseMessage, PerformanceMetrics
+from examples.cache import MISSING, CacheStats, ToolResultCache, cache_for
+from examples.dispatch import ToolDispatcher
+from examples.filters import FilterChain
+from examples.file_context import FileContextStore
+from examples.messages import BaseMessage, PerformanceMetrics, StreamChunk
+from examples.metrics import LatencySummary, MetricsStore
+from examples.pool import ToolPool, shared_executor
+from examples.summarize import KeywordSummarizer
+from examples.tracing import Tracer
+
+if TYPE_CHECKING:
+    from examples.delegation import DelegationScheduler
+    from examples.search import MessageIndex
+    from examples.storage import StorageBackend
+
+
+# Evicted messages kept in the window's list before it is compacted
+COMPACT_AFTER = 64
+# Stored messages read per storage call when paging history in, e.g. to
+# refill the window or build the search index
+INDEX_PAGE = 1024
+# Newest stored messages ``ChatHistoryMemory.search`` covers by default
+SEARCH_LIMIT = 10_000
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count used for token-budget windows"""
+    return len(text.split())
+
+
+class MessageWindow(Sequence):
+    """Read-only sequence view over the messages held in a memory window"""
+
+    def __init__(self, window: Sequence[BaseMessage]):
+        self._window = window
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return iter(self._window)
+
+    def __reversed__(self) -> Iterator[BaseMessage]:
+        return reversed(self._window)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._window[index])
+        return self._window[index]
+
+    def __repr__(self) -> str:
+        return f"MessageWindow({list(self._window)!r})"
+
+
+class _WindowSlice(Sequence):
+    """Immutable view of ``items[start:stop]``
+
+    The memory only ever appends to ``items`` or swaps in a new list, so
+    the messages a view covers never change under it.
+    """
+
+    __slots__ = ("_items", "_start", "_stop")
+
+    def __init__(self, items: List[BaseMessage], start: int, stop: int):
+        self._items = items
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return map(self._items.__getitem__, range(self._start, self._stop))
+
+    def __reversed__(self) -> Iterator[BaseMessage]:
+        return map(self._items.__getitem__, reversed(range(self._start, self._stop)))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._items[self._start + start : self._start + max(start, stop)]
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("window index out of range")
+        return self._items[self._start + index]
 
 
-# pylint: disable=too-few-public-methods
 class ChatHistoryMemory:
-    """Memory implementation with storage control"""
+    """Memory implementation with storage control
+
+    The window is a ring buffer (``collections.deque``), so appending and
+    evicting are O(1) regardless of ``window_size``. Besides the message
+    count, the window can be bounded by the total number of characters or
+    tokens it holds; the newest message is always kept.
 
-    def __init__(self, window_size: int = 10):
+    With a ``storage`` backend (see ``examples.storage``) every stored
+    message is also persisted. The window is refilled from the newest
+    persisted messages on construction, and the full history stays
+    reachable through ``history`` without being held in RAM.
+
+    Before a message is stored it passes through ``filters``, a chain of
+    marker-triggered rules that can drop or rewrite it in one scan (see
+    ``examples.filters``). The default chain drops ``[DO NOT STORE]``
+    messages, keeps only the public segments of ``[STORE ONLY PUBLIC]``
+    ones and stores ``[SUMMARIZE]`` messages as a short summary made by
+    ``summarizer`` (see ``examples.summarize``). With ``compact`` set,
+    messages evicted from the window are folded into the rolling
+    ``summary`` instead of being dropped; ``context`` returns that summary
+    followed by the window.
+
+    ``search`` ranks stored messages by TF-IDF relevance using an inverted
+    index (see ``examples.search``) that is built on the first search and
+    then kept up to date as messages are added and evicted. It covers the
+    window, or the persisted history when there is a backend, and never
+    more than the newest ``search_limit`` messages: older ones drop out
+    of the index as new ones arrive. The index stays in RAM, costing
+    about 16 bytes per distinct term of each indexed message plus a tuple
+    of those terms, roughly 1 KB for a 50-word message, so the default
+    limit of 10,000 messages keeps it near 10 MB. ``search_limit=None``
+    indexes the whole history, at that cost per stored message.
+
+    The memory can be shared by agents stepping on different threads.
+    Writers serialize on a lock and each ``add_message``/``add_messages``
+    call is applied atomically; ``add_messages`` lets a writer batch its
+    appends under one acquisition. Every write ends by publishing an
+    immutable snapshot in O(1): the window lives in a list that is only
+    appended to (evicted messages are cut off by swapping in a new list
+    once they outnumber the live ones), so a snapshot is just the range
+    it covers. Readers of ``messages`` and ``context`` take the latest
+    snapshot without locking or copying, and always see the state
+    between two complete writes.
+    """
+
+    def __init__(
+        self,
+        window_size: Optional[int] = 10,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        tokenizer: Callable[[str], int] = count_tokens,
+        storage: Optional["StorageBackend"] = None,
+        summarizer: Optional[Any] = None,
+        compact: bool = False,
+        filters: Optional[FilterChain] = None,
+        search_limit: Optional[int] = SEARCH_LIMIT,
+    ):
         self.window_size = window_size
-        self.messages: List[BaseMessage] = []
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
+        self.tokenizer = tokenizer
+        self.storage = storage
+        self.summarizer = summarizer or KeywordSummarizer()
+        self.compact = compact
+        self.search_limit = search_limit
+        self.filters = (
+            filters if filters is not None else FilterChain.default(self.summarizer)
+        )
+        # Rolling summary of evicted messages and how many it covers
+        self.summary: Optional[str] = None
+        self.summarized_count = 0
+        # The window is _items[_start:]; only writers touch these
+        self._items: List[BaseMessage] = []
+        self._start = 0
+        # (chars, tokens) per message in the window
+        self._sizes: Deque[tuple] = deque()
+        self.total_chars = 0
+        self.total_tokens = 0
+        self._lock = threading.Lock()
+        self._version = 0
+        # (version, window, summary) published by the last write
+        self._snapshot: tuple = (0, _WindowSlice(self._items, 0, 0), None)
+        # History position of the next stored message
+        self._next_position = 0
+        self._index: Optional["MessageIndex"] = None
+        if storage is not None:
+            self._refill(storage)
+
+    def _refill(self, storage: "StorageBackend") -> None:
+        """Fill the window from the newest persisted messages
+
+        Pages backwards from the end of the history only until the
+        window's count, char or token budget is full, so a memory without
+        a count limit does not load the whole history. Only a memory with
+        no budget at all reads everything.
+        """
+        pages: List[List[BaseMessage]] = []
+        count = chars = tokens = 0
+        stop = len(storage)
+        while stop > 0:
+            if self.window_size is not None:
+                if count >= self.window_size:
+                    break
+                size = min(INDEX_PAGE, self.window_size - count)
+            else:
+                size = INDEX_PAGE
+            if self.max_chars is not None and chars > self.max_chars:
+                break
+            if self.max_tokens is not None and tokens > self.max_tokens:
+                break
+            start = max(0, stop - size)
+            page = storage.read(start, stop)
+            pages.append(page)
+            count += len(page)
+            chars += sum(len(message.content) for message in page)
+            if self.max_tokens is not None:
+                tokens += sum(self.tokenizer(message.content) for message in page)
+            stop = start
+        self._next_position = stop
+        for page in reversed(pages):
+            for message in page:
+                self._append(message)
+        self._evict()
+        self._publish()
+
+    def snapshot(self) -> tuple:
+        """Consistent (version, window, summary) without blocking writers
+
+        ``version`` changes with every write, so callers can cheaply tell
+        whether a snapshot they hold is still current.
+        """
+        return self._snapshot
+
+    def _publish(self) -> None:
+        """Make the state after a write visible to readers"""
+        self._version += 1
+        window = _WindowSlice(self._items, self._start, len(self._items))
+        self._snapshot = (self._version, window, self.summary)
+
+    @property
+    def messages(self) -> MessageWindow:
+        """Snapshot of the messages in the window, oldest first"""
+        return MessageWindow(self.snapshot()[1])
+
+    @property
+    def context(self) -> List[BaseMessage]:
+        """Rolling summary (as a system message) followed by the window"""
+        _, window, summary = self.snapshot()
+        if summary is None:
+            return list(window)
+        return [BaseMessage("System", summary, "system"), *window]
+
+    @property
+    def history(self) -> Sequence[BaseMessage]:
+        """Every stored message, oldest first
+
+        Backed by the storage backend and paged in on demand; without a
+        backend this is the window itself.
+        """
+        if self.storage is None:
+            return self.messages
+        # Storage is only loaded by memories that persist
+        # pylint: disable=import-outside-toplevel
+        from examples.storage import StoredHistory
+
+        return StoredHistory(self.storage)
+
+    def search(self, query: str, k: int = 5) -> List[BaseMessage]:
+        """The ``k`` stored messages most relevant to ``query``, best first"""
+        if self._index is None:
+            self._build_index()
+        # Writers update the index in place, so query it under the lock;
+        # messages no longer in the window are read after releasing it
+        with self._lock:
+            first_in_window = self._next_position - self._window_length()
+            results: List[Any] = [
+                self._window_at(position) if position >= first_in_window else position
+                for position, _ in self._index.search(query, k)
+            ]
+        return [
+            self.storage.read(result, result + 1)[0]
+            if isinstance(result, int)
+            else result
+            for result in results
+        ]
+
+    def _window_length(self) -> int:
+        return len(self._items) - self._start
+
+    def _window_at(self, position: int) -> BaseMessage:
+        """Message at a history position that is still in the window"""
+        first_in_window = self._next_position - self._window_length()
+        return self._items[self._start + position - first_in_window]
+
+    def _search_floor(self, first_in_window: int) -> int:
+        """Oldest history position the search index covers"""
+        floor = 0 if self.storage is not None else first_in_window
+        if self.search_limit is not None:
+            floor = max(floor, self._next_position - self.search_limit)
+        return floor
+
+    def _build_index(self) -> None:
+        """Index the searchable messages, reading storage without the lock"""
+        # The search module loads NumPy; only memories that search need it
+        # pylint: disable=import-outside-toplevel
+        from examples.search import MessageIndex
+
+        index = MessageIndex()
+        first = indexed = None
+        while True:
+            with self._lock:
+                if self._index is not None:
+                    return
+                first_in_window = self._next_position - self._window_length()
+                floor = self._search_floor(first_in_window)
+                if first is None:
+                    first = floor
+                indexed = floor if indexed is None else max(indexed, floor)
+                if indexed >= first_in_window:
+                    for position in range(indexed, self._next_position):
+                        index.add(position, self._window_at(position).content)
+                    # Drop what fell below the limit while paging unlocked
+                    for position in range(first, floor):
+                        index.remove(position)
+                    self._index = index
+                    return
+                end = first_in_window
+            # Messages evicted from the window: page them in from storage
+            for start in range(indexed, end, INDEX_PAGE):
+                page = self.storage.read(start, min(end, start + INDEX_PAGE))
+                for position, message in enumerate(page, start):
+                    index.add(position, message.content)
+            indexed = end
+
+    def flush(self) -> None:
+        """Commit messages the storage backend is still buffering"""
+        if self.storage is not None:
+            self.storage.flush()
+
+    def close(self) -> None:
+        """Commit buffered messages and close the storage backend"""
+        if self.storage is not None:
+            self.storage.close()
+
+    def filter_message(self, message: BaseMessage) -> Optional[BaseMessage]:
+        """The message as it should be stored, or None to drop it"""
+        # Default implementation - agents can override
+        return self.filters.apply(message)
 
     def should_store(self, message: BaseMessage) -> bool:
         """Determine if message should be stored"""
-        # Default implementation - agents can override
-        if "[DO NOT STORE]" in message.content:
-            return False
-        if "[STORE ONLY PUBLIC]" in message.content:
-            return "Public:" in message.content
-        return True
+        return self.filter_message(message) is not None
 
     def add_message(self, message: BaseMessage) -> None:
         """Add message to memory if it passes filters"""
-        if self.should_store(message):
-            self.messages.append(message)
-            if len(self.messages) > self.window_size:
-                self.messages.pop(0)
+        message = self.filter_message(message)
+        if message is not None:
+            with self._lock:
+                try:
+                    self._append(message)
+                    self._evict()
+                    if self.storage is not None:
+                        self.storage.append(message)
+                finally:
+                    self._publish()
+
+    def add_messages(self, messages: Iterable[BaseMessage]) -> None:
+        """Add several messages, evicting once after the whole batch
+
+        Leaves the window in the same state as calling ``add_message`` for
+        each message in turn.
+        """
+        stored = [
+            filtered
+            for filtered in map(self.filter_message, messages)
+            if filtered is not None
+        ]
+        with self._lock:
+            try:
+                for message in stored:
+                    self._append(message)
+                self._evict()
+                if self.storage is not None:
+                    self.storage.extend(stored)
+            finally:
+                self._publish()
+
+    async def aadd_message(self, message: BaseMessage) -> None:
+        """Awaitable ``add_message``
+
+        The in-RAM window never blocks, so this completes synchronously;
+        storage-backed memories can override it to await their I/O.
+        """
+        self.add_message(message)
+
+    def _append(self, message: BaseMessage) -> None:
+        chars = len(message.content)
+        # Tokenizing costs a pass over the text, so only do it when budgeted
+        tokens = self.tokenizer(message.content) if self.max_tokens is not None else 0
+        self._items.append(message)
+        self._sizes.append((chars, tokens))
+        self.total_chars += chars
+        self.total_tokens += tokens
+        if self._index is not None:
+            self._index.add(self._next_position, message.content)
+            if self.search_limit is not None:
+                self._index.remove(self._next_position - self.search_limit)
+        self._next_position += 1
+
+    def _over_budget(self) -> bool:
+        length = self._window_length()
+        if self.window_size is not None and length > self.window_size:
+            return True
+        if length <= 1:
+            return False
+        if self.max_chars is not None and self.total_chars > self.max_chars:
+            return True
+        return self.max_tokens is not None and self.total_tokens > self.max_tokens
+
+    def _evict(self) -> None:
+        evicted = []
+        # Evicted messages stay searchable while the backend holds them
+        unindex = self._index is not None and self.storage is None
+        while self._window_length() and self._over_budget():
+            if unindex:
+                self._index.remove(self._next_position - self._window_length())
+            message = self._items[self._start]
+            self._start += 1
+            chars, tokens = self._sizes.popleft()
+            self.total_chars -= chars
+            self.total_tokens -= tokens
+            if self.compact:
+                evicted.append(message)
+        if self._start >= COMPACT_AFTER and 2 * self._start >= len(self._items):
+            # Published snapshots keep the old list, which is never changed
+            self._items = self._items[self._start :]
+            self._start = 0
+        if evicted:
+            # One fold per batch of evictions keeps summarizer calls rare
+            self.summary = self.summarizer.fold(self.summary, evicted)
+            self.summarized_count += len(evicted)
+
+
+def _no_flush() -> None:
+    """Flush callback for steps that write straight to memory"""
+
+
+def _discard_task_result(task: asyncio.Future) -> None:
+    """Retrieve the outcome of an abandoned task so it is not logged"""
+    if not task.cancelled():
+        task.exception()
 
 
 # pylint: disable=too-few-public-methods
@@ -40,32 +484,346 @@ class ChatAgent:
         memory: ChatHistoryMemory,
         tools: List[Any],
         delegate_workers: List[Any] = None,
+        max_tool_instances: int = 4,
+        tool_timeout: Optional[float] = None,
+        tool_executor: Optional[Executor] = None,
+        delegation_strategy: str = "least_loaded",
+        delegation_timeout: Optional[float] = None,
+        performance_history: int = 1000,
+        tracer: Optional[Tracer] = None,
+        context_files: Optional[FileContextStore] = None,
     ):
-        self.performance_data = []
-        self.context_files = set()
+        # Bounded recent samples; long-run statistics live in self.metrics
+        self.performance_data: Deque[dict] = deque(maxlen=performance_history)
+        self.metrics = MetricsStore()
+        # Results of the latest optimize_with_random_phrases experiment
+        self.phrase_impact: Dict[str, float] = {}
+        self.phrase_intervals: Dict[str, Tuple[float, float]] = {}
+        # Names and cached contents of the files added with "add <file>"
+        self.context_files = (
+            context_files if context_files is not None else FileContextStore()
+        )
         """Initialize a ChatAgent with shared memory capability
 
         Args:
             memory: ChatHistoryMemory instance (can be shared between agents)
             tools: List of tool classes to register
             delegate_workers: List of ChatAgents to delegate to
+            max_tool_instances: Upper bound of pooled instances per tool
+            tool_timeout: Seconds to wait for each tool unless the tool
+                class sets its own ``timeout``; None waits indefinitely
+            tool_executor: Executor running matched tools concurrently,
+                defaults to a process-wide shared thread pool
+            delegation_strategy: How delegated tasks are routed to workers:
+                "broadcast", "first_response" or "least_loaded"
+            delegation_timeout: Seconds to wait for each delegated worker
+            performance_history: Number of recent per-step samples kept in
+                ``performance_data``
+            tracer: Receives per-phase spans of every step; the default
+                tracer has no sinks and is disabled
+            context_files: Store caching the contents of context files,
+                e.g. to set its memory budget
         """
         self.memory = memory
         # Store tools by name with class references
         self.tools = {tool.name: tool for tool in tools}
+        # Compiled once here and kept in sync by register/unregister_tool
+        self._dispatcher = ToolDispatcher(self.tools)
+        # Tool instances are reused across steps instead of built per call
+        self.tool_pool = ToolPool(max_instances=max_tool_instances)
+        # Result caches for tools that declare cache_size, keyed by class
+        self._tool_caches: Dict[Any, Optional[ToolResultCache]] = {}
+        self.tool_timeout = tool_timeout
+        self._tool_executor = tool_executor
         self.delegate_workers = delegate_workers or []
+        self.delegation_strategy = delegation_strategy
+        self.delegation_timeout = delegation_timeout
+        self._delegation: Optional["DelegationScheduler"] = None
+        self.tracer = tracer or Tracer()
+
+    @property
+    def delegation(self) -> "DelegationScheduler":
+        """Scheduler routing delegated tasks, created on first use"""
+        if self._delegation is None:
+            # pylint: disable=import-outside-toplevel
+            from examples.delegation import DelegationScheduler
+
+            self._delegation = DelegationScheduler(
+                self.delegate_workers,
+                strategy=self.delegation_strategy,
+                timeout=self.delegation_timeout,
+            )
+        return self._delegation
+
+    def register_tool(self, tool: Any) -> None:
+        """Register a tool class, replacing any tool with the same name"""
+        previous = self.tools.get(tool.name)
+        if previous is not None and previous is not tool:
+            self.tool_pool.discard(previous)
+        self.tools[tool.name] = tool
+        self._dispatcher.add(tool.name)
+
+    def unregister_tool(self, name: str) -> None:
+        """Remove a registered tool by name"""
+        tool = self.tools.pop(name, None)
+        self._dispatcher.remove(name)
+        if tool is not None:
+            self.tool_pool.discard(tool)
+
+    def _tool_timeout(self, tool_cls: Any) -> Optional[float]:
+        timeout = getattr(tool_cls, "timeout", None)
+        return self.tool_timeout if timeout is None else timeout
+
+    def _tool_cache(self, tool_cls: Any) -> Optional[ToolResultCache]:
+        try:
+            return self._tool_caches[tool_cls]
+        except KeyError:
+            return self._tool_caches.setdefault(tool_cls, cache_for(tool_cls))
+
+    def cache_stats(self) -> Dict[str, CacheStats]:
+        """Hit/miss/eviction counters of every registered cached tool"""
+        stats = {}
+        for tool_name, tool_cls in self.tools.items():
+            cache = self._tool_cache(tool_cls)
+            if cache is not None:
+                stats[tool_name] = cache.stats()
+        return stats
+
+    def _cache_lookup(
+        self, tool_name: str, content: str, use_cache: bool
+    ) -> Tuple[Optional[ToolResultCache], Hashable, Any]:
+        """Find a cached result for a tool call
+
+        Returns:
+            (cache to store a fresh result in or None, cache key,
+            cached result or MISSING)
+        """
+        tool_cls = self.tools[tool_name]
+        cache = self._tool_cache(tool_cls)
+        if cache is None:
+            return None, None, MISSING
+        key = tool_cls.cache_key(content)
+        try:
+            hash(key)
+        except TypeError:
+            return None, None, MISSING
+        if not use_cache:
+            # Bypassed calls still refresh the cached entry
+            return cache, key, MISSING
+        return cache, key, cache.get(key)
+
+    def _run_tool(
+        self,
+        tool_name: str,
+        content: str,
+        cache: Optional[ToolResultCache] = None,
+        key: Hashable = None,
+    ) -> str:
+        """Execute one tool on a pooled instance, caching its result"""
+        with self.tool_pool.checkout(self.tools[tool_name]) as tool:
+            started = perf_counter()
+            result = tool.execute(content)
+            elapsed = perf_counter() - started
+        self.metrics.record_tool(tool_name, elapsed)
+        self.tracer.record("tool.execute", elapsed, tool=tool_name)
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    def _call_tool(
+        self,
+        tool_name: str,
+        content: str,
+        cache: Optional[ToolResultCache],
+        key: Hashable,
+    ) -> str:
+        """Execute one tool inline, reporting failures as its result"""
+        try:
+            return self._run_tool(tool_name, content, cache, key)
+        except Exception as e:  # pylint: disable=broad-except
+            return f"failed: {type(e).__name__}: {e}"
+
+    def _split_cached(
+        self, tool_names: List[str], content: str, use_cache: bool
+    ) -> Tuple[Dict[str, str], List[tuple]]:
+        """Cached results by tool name and (tool, cache, key) of the misses"""
+        results: Dict[str, str] = {}
+        misses = []
+        for tool_name in tool_names:
+            cache, key, cached = self._cache_lookup(tool_name, content, use_cache)
+            if cached is MISSING:
+                misses.append((tool_name, cache, key))
+            else:
+                results[tool_name] = cached
+        return results, misses
+
+    def _runs_inline(self, misses: List[tuple]) -> bool:
+        return len(misses) == 1 and self._tool_timeout(self.tools[misses[0][0]]) is None
+
+    def _execute_tools(
+        self, tool_names: List[str], content: str, use_cache: bool = True
+    ) -> List[Tuple[str, str]]:
+        """Run matched tools concurrently and collect results in order
+
+        Cached results are served without running the tool. A single
+        remaining tool without a timeout runs inline to skip the thread hop.
+        Tools that fail or exceed their timeout are reported in their
+        result text; a timed-out tool keeps running in the background and
+        returns its instance to the pool when it finishes.
+        """
+        results, misses = self._split_cached(tool_names, content, use_cache)
+        if self._runs_inline(misses):
+            tool_name, cache, key = misses[0]
+            results[tool_name] = self._call_tool(tool_name, content, cache, key)
+        elif misses:
+            executor = self._tool_executor or shared_executor()
+            submitted = perf_counter()
+            futures = [
+                executor.submit(self._run_tool, tool_name, content, cache, key)
+                for tool_name, cache, key in misses
+            ]
+            for (tool_name, _, _), future in zip(misses, futures):
+                timeout = self._tool_timeout(self.tools[tool_name])
+                remaining = None
+                if timeout is not None:
+                    remaining = max(0.0, submitted + timeout - perf_counter())
+                try:
+                    results[tool_name] = future.result(timeout=remaining)
+                except FutureTimeout:
+                    results[tool_name] = f"timed out after {timeout}s"
+                except Exception as e:  # pylint: disable=broad-except
+                    results[tool_name] = f"failed: {type(e).__name__}: {e}"
+        return [(tool_name, results[tool_name]) for tool_name in tool_names]
+
+    def _iter_tools(
+        self, tool_names: List[str], content: str, use_cache: bool = True
+    ) -> Iterator[Tuple[str, str]]:
+        """Streaming counterpart of ``_execute_tools``
+
+        Yields (tool name, result) pairs in completion order: cached results
+        first, then each tool as soon as it finishes, fails or times out.
+        """
+        results, misses = self._split_cached(tool_names, content, use_cache)
+        yield from results.items()
+        if self._runs_inline(misses):
+            tool_name, cache, key = misses[0]
+            yield tool_name, self._call_tool(tool_name, content, cache, key)
+            return
+        if not misses:
+            return
+
+        executor = self._tool_executor or shared_executor()
+        submitted = perf_counter()
+        # future -> (position in misses, tool name, timeout, deadline)
+        pending = {}
+        for position, (tool_name, cache, key) in enumerate(misses):
+            timeout = self._tool_timeout(self.tools[tool_name])
+            future = executor.submit(self._run_tool, tool_name, content, cache, key)
+            deadline = None if timeout is None else submitted + timeout
+            pending[future] = (position, tool_name, timeout, deadline)
+        while pending:
+            deadlines = [item[3] for item in pending.values() if item[3] is not None]
+            wait_for = max(0.0, min(deadlines) - perf_counter()) if deadlines else None
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: pending[f][0]):
+                _, tool_name, _, _ = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield tool_name, future.result()
+                else:
+                    yield tool_name, f"failed: {type(error).__name__}: {error}"
+            now = perf_counter()
+            for future, (_, tool_name, timeout, deadline) in list(pending.items()):
+                if deadline is not None and deadline <= now:
+                    del pending[future]
+                    yield tool_name, f"timed out after {timeout}s"
+
+    async def _arun_tool(
+        self,
+        tool_name: str,
+        content: str,
+        cache: Optional[ToolResultCache] = None,
+        key: Hashable = None,
+    ) -> str:
+        """Await one tool on a pooled instance, caching its result"""
+        tool_cls = self.tools[tool_name]
+        tool = self.tool_pool.try_acquire(tool_cls)
+        if tool is None:
+            # Pool exhausted: wait for a release off the event loop
+            tool = await asyncio.to_thread(self.tool_pool.acquire, tool_cls)
+        try:
+            started = perf_counter()
+            result = await tool.aexecute(content)
+            elapsed = perf_counter() - started
+        finally:
+            self.tool_pool.release(tool)
+        self.metrics.record_tool(tool_name, elapsed)
+        self.tracer.record("tool.execute", elapsed, tool=tool_name)
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    async def _aexecute_tools(
+        self, tool_names: List[str], content: str, use_cache: bool = True
+    ) -> List[Tuple[str, str]]:
+        """Async counterpart of ``_execute_tools``
+
+        Each uncached tool runs as its own task. A timed-out task is
+        shielded from cancellation so its pooled instance is only released
+        once the tool has actually stopped using it.
+        """
+        loop_time = asyncio.get_running_loop().time
+        submitted = loop_time()
+        results: Dict[str, str] = {}
+        tasks = {}
+        for tool_name in tool_names:
+            cache, key, cached = self._cache_lookup(tool_name, content, use_cache)
+            if cached is MISSING:
+                tasks[tool_name] = asyncio.ensure_future(
+                    self._arun_tool(tool_name, content, cache, key)
+                )
+            else:
+                results[tool_name] = cached
+        for tool_name, task in tasks.items():
+            timeout = self._tool_timeout(self.tools[tool_name])
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, submitted + timeout - loop_time())
+            try:
+                results[tool_name] = await asyncio.wait_for(
+                    asyncio.shield(task), remaining
+                )
+            except asyncio.TimeoutError:
+                task.add_done_callback(_discard_task_result)
+                results[tool_name] = f"timed out after {timeout}s"
+            except Exception as e:  # pylint: disable=broad-except
+                results[tool_name] = f"failed: {type(e).__name__}: {e}"
+        return [(tool_name, results[tool_name]) for tool_name in tool_names]
+
+    def close(self) -> None:
+        """Tear down pooled tool instances and delegation threads"""
+        self.tool_pool.close()
+        self.context_files.release()
+        if self._delegation is not None:
+            self._delegation.close()
 
     def add_to_context(self, filename: str) -> None:
-        """Add a file to agent's context"""
+        """Add a file to agent's context, loading its contents"""
         self.context_files.add(filename)
 
     def remove_from_context(self, filename: str) -> str:
         """Remove a file from agent's context"""
         if filename in self.context_files:
-            self.context_files.remove(filename)
+            self.context_files.discard(filename)
             return f"Removed {filename} from context"
         return f"{filename} not found in context"
 
+    def read_context_file(self, filename: str) -> Optional[str]:
+        """Cached contents of a context file, revalidated against the disk"""
+        if filename not in self.context_files:
+            return None
+        return self.context_files.read(filename)
+
     def edit_file(self, filename: str, content: str) -> BaseMessage:
         """Edit a file in the agent's context.
         
@@ -86,10 +844,9 @@ class ChatAgent:
             # Ensure directory exists
             Path(filename).parent.mkdir(parents=True, exist_ok=True)
             
-            # Write content with proper encoding and error handling
-            with open(filename, "w", encoding="utf-8", errors="strict") as f:
-                f.write(content)
-                
+            # Write through the context store so its cached copy stays current
+            self.context_files.write(filename, content)
+
             return BaseMessage("Assistant", f"Updated {filename}", "assistant")
             
         except (IOError, OSError, UnicodeEncodeError) as e:
@@ -99,6 +856,37 @@ class ChatAgent:
                 "assistant"
             )
 
+    def patch_file(self, filename: str, old: str, new: str) -> BaseMessage:
+        """Replace the first occurrence of ``old`` in a context file
+
+        With the store's ``patch_in_place`` only the changed region is
+        rewritten (see ``examples.file_context``), so small edits to
+        large files stay cheap.
+
+        Args:
+            filename: Name of file to patch (must be in context)
+            old: Text to replace
+            new: Replacement text
+
+        Returns:
+            BaseMessage with status of operation
+        """
+        if filename not in self.context_files:
+            return BaseMessage("Assistant", f"{filename} not in context", "assistant")
+        try:
+            self.context_files.patch(
+                filename, old.replace("\\n", "\n"), new.replace("\\n", "\n")
+            )
+        except (OSError, UnicodeEncodeError, ValueError) as e:
+            return BaseMessage(
+                "Assistant", f"Error patching {filename}: {e}", "assistant"
+            )
+        return BaseMessage("Assistant", f"Patched {filename}", "assistant")
+
+    @staticmethod
+    def _is_file_command(content: str) -> bool:
+        return content.startswith(("add ", "remove ", "edit ", "patch "))
+
     def _handle_file_operations(self, message: BaseMessage) -> Optional[BaseMessage]:
         """Handle file-related commands, return response or None if not a file command"""
         content = message.content
@@ -125,61 +913,53 @@ class ChatAgent:
             content = parts[2].strip("'\"")
             return self.edit_file(filename, content)
 
-        return None
+        if content.startswith("patch "):
+            try:
+                parts = shlex.split(content)
+            except ValueError:
+                parts = []
+            if len(parts) != 4:
+                return BaseMessage(
+                    "Assistant",
+                    "Invalid patch format. Use: patch <filename> '<old>' '<new>'",
+                    "assistant",
+                )
+            return self.patch_file(*parts[1:])
 
-    def step(self, message: BaseMessage) -> BaseMessage:
-        """Process a message and return response"""
-        start_time = perf_counter()
-        self.memory.add_message(message)
+        return None
 
-        # Handle file operations first
-        file_response = self._handle_file_operations(message)
-        if file_response:
-            return file_response
+    @staticmethod
+    def _delegation_response(results: List[Tuple[int, str]]) -> BaseMessage:
+        """Aggregate delegated worker results into one response"""
+        if len(results) == 1:
+            content = f"Delegated to worker: {results[0][1]}"
+        else:
+            content = "\n".join(
+                f"Delegated to worker {index + 1}: {result}"
+                for index, result in results
+            )
+        return BaseMessage("Assistant", content, role_type="assistant")
 
-        # Check for delegation commands first
-        if "delegate to" in message.content.lower():
-            for worker in self.delegate_workers:
-                # Pass the task directly to worker agent
-                worker_response = worker.step(message)
-                response = BaseMessage(
-                    "Assistant",
-                    f"Delegated to worker: {worker_response.content}",
-                    role_type="assistant",
-                )
-                self.memory.add_message(response)
-                return response
+    def _compose_response(
+        self, message: BaseMessage, tool_results: List[Tuple[str, str]]
+    ) -> Tuple[List[BaseMessage], BaseMessage]:
+        """Build the response to a non-command message
 
-        # Check if any tool name is mentioned in the message
-        content_lower = message.content.lower()
+        Returns the messages to write to memory, in order, and the response.
+        Shared by ``step`` and ``astep`` so both drivers only differ in how
+        they perform I/O.
+        """
+        writes = []
         tool_responses = []
-
-        # Collect all exact tool matches first
-        for tool_name, tool_cls in self.tools.items():
-            if tool_name in content_lower:
-                tool_response = tool_cls().execute(message.content)
-                tool_responses.append(f"Used {tool_name}: {tool_response}")
-                self.memory.add_message(
-                    BaseMessage(
-                        "System",
-                        f"Agent used {tool_name}: {tool_response}",
-                        role_type="system",
-                    )
+        for tool_name, tool_response in tool_results:
+            tool_responses.append(f"Used {tool_name}: {tool_response}")
+            writes.append(
+                BaseMessage(
+                    "System",
+                    f"Agent used {tool_name}: {tool_response}",
+                    role_type="system",
                 )
-
-        # If no exact matches, check for partial matches
-        if not tool_responses:
-            for tool_name, tool_cls in self.tools.items():
-                if any(part in content_lower for part in tool_name.split("_")):
-                    tool_response = tool_cls().execute(message.content)
-                    tool_responses.append(f"Used {tool_name}: {tool_response}")
-                    self.memory.add_message(
-                        BaseMessage(
-                            "System",
-                            f"Agent used {tool_name}: {tool_response}",
-                            role_type="system",
-                        )
-                    )
+            )
 
         if tool_responses:
             response = BaseMessage(
@@ -187,8 +967,8 @@ class ChatAgent:
                 "\n".join(tool_responses),
                 role_type="assistant",
             )
-            self.memory.add_message(response)
-            return response
+            writes.append(response)
+            return writes, response
 
         # Handle errors and missing context
         try:
@@ -198,7 +978,7 @@ class ChatAgent:
             response = BaseMessage("Assistant", "Hello World!", role_type="assistant")
 
         except ValueError as e:  # More specific exception
-            self.memory.add_message(
+            writes.append(
                 BaseMessage(
                     "System",
                     f"Error processing request: {str(e)}",
@@ -211,41 +991,585 @@ class ChatAgent:
                 role_type="assistant",
             )
 
-        response_time = perf_counter() - start_time
+        writes.append(response)
+        return writes, response
+
+    def _record_step(
+        self, message: BaseMessage, response_time: float, tools_used: int
+    ) -> None:
+        """Record one step in the recent samples and the metrics store"""
         self.performance_data.append(
             {
                 "response_time": response_time,
-                "tools_used": len(tool_responses),
+                "tools_used": tools_used,
                 "phrase_variation": getattr(message, "optimization_phrase", None),
             }
         )
-        self.memory.add_message(response)
+        self.metrics.record_step(response_time, tools_used)
+
+    def _finish_step(
+        self, message: BaseMessage, start_time: float, path: str, tools_used: int = 0
+    ) -> None:
+        """Record a step on every return path, tagged with the path taken"""
+        response_time = perf_counter() - start_time
+        self._record_step(message, response_time, tools_used)
+        self.tracer.record("step", response_time, path=path, tools_used=tools_used)
+
+    def step(self, message: BaseMessage, use_cache: bool = True) -> BaseMessage:
+        """Process a message and return response
+
+        Args:
+            message: Incoming message
+            use_cache: Serve cacheable tools from their result cache; pass
+                False to force fresh tool runs for this call
+        """
+        return self._step(
+            message, self.memory.add_message, _no_flush, use_cache=use_cache
+        )
+
+    def _step(
+        self,
+        message: BaseMessage,
+        write: Callable[[BaseMessage], None],
+        flush: Callable[[], None],
+        tool_names: Optional[List[str]] = None,
+        use_cache: bool = True,
+    ) -> BaseMessage:
+        """Run one step, sending memory writes to ``write``
+
+        ``flush`` is called before delegating so workers sharing the memory
+        see this step's earlier writes first. ``tool_names`` skips matching
+        when the caller already knows the dispatch result.
+        """
+        tracer = self.tracer
+        if not tracer.enabled:
+            return self._step_untraced(message, write, flush, tool_names, use_cache)
+        start_time = perf_counter()
+        with tracer.span("memory.add"):
+            write(message)
+
+        # Handle file operations first
+        with tracer.span("file_command"):
+            file_response = self._handle_file_operations(message)
+        if file_response:
+            self._finish_step(message, start_time, "file_command")
+            return file_response
+
+        # Check for delegation commands first
+        if "delegate to" in message.content.lower() and self.delegate_workers:
+            flush()
+            # Pass the task directly to the scheduled worker agents
+            with tracer.span("delegation", strategy=self.delegation_strategy):
+                results = self.delegation.delegate(message)
+            response = self._delegation_response(results)
+            with tracer.span("memory.add"):
+                write(response)
+            self._finish_step(message, start_time, "delegation")
+            return response
+
+        # Exact tool name matches take precedence over partial name matches
+        if tool_names is None:
+            with tracer.span("dispatch"):
+                tool_names = self._dispatcher.match(message.content.lower())
+        with tracer.span("tools", count=len(tool_names)):
+            tool_results = self._execute_tools(tool_names, message.content, use_cache)
+        writes, response = self._compose_response(message, tool_results)
+        with tracer.span("memory.add"):
+            for item in writes:
+                write(item)
+        self._finish_step(
+            message, start_time, "tools" if tool_results else "reply", len(tool_results)
+        )
+        return response
+
+    def _step_untraced(
+        self,
+        message: BaseMessage,
+        write: Callable[[BaseMessage], None],
+        flush: Callable[[], None],
+        tool_names: Optional[List[str]],
+        use_cache: bool,
+    ) -> BaseMessage:
+        """``_step`` without spans, taken while tracing is disabled"""
+        start_time = perf_counter()
+        write(message)
+        file_response = self._handle_file_operations(message)
+        if file_response:
+            self._record_step(message, perf_counter() - start_time, 0)
+            return file_response
+
+        if "delegate to" in message.content.lower() and self.delegate_workers:
+            flush()
+            response = self._delegation_response(self.delegation.delegate(message))
+            write(response)
+            self._record_step(message, perf_counter() - start_time, 0)
+            return response
+
+        if tool_names is None:
+            tool_names = self._dispatcher.match(message.content.lower())
+        tool_results = self._execute_tools(tool_names, message.content, use_cache)
+        writes, response = self._compose_response(message, tool_results)
+        for item in writes:
+            write(item)
+        self._record_step(message, perf_counter() - start_time, len(tool_results))
+        return response
+
+    def step_many(
+        self,
+        messages: Iterable[BaseMessage],
+        batch_size: int = 64,
+        use_cache: bool = True,
+    ) -> Iterator[BaseMessage]:
+        """Process messages in order, yielding each response as it is ready
+
+        Accepts any iterable, including generators, and consumes it lazily.
+        Memory writes are buffered and applied with ``add_messages`` once
+        per ``batch_size`` messages (and before any delegation), so memory
+        read while iterating may lag behind the yielded responses; it is
+        complete once the generator is exhausted or closed. Dispatch
+        results are reused for repeated message contents within a batch.
+        Performance data is recorded per message exactly as ``step`` does.
+        """
+        buffer: List[BaseMessage] = []
+
+        def flush() -> None:
+            if buffer:
+                self.memory.add_messages(buffer)
+                buffer.clear()
+
+        matches: Dict[str, List[str]] = {}
+        match = self._dispatcher.match
+        try:
+            for count, message in enumerate(messages, 1):
+                content_lower = message.content.lower()
+                tool_names = matches.get(content_lower)
+                if tool_names is None:
+                    tool_names = matches[content_lower] = match(content_lower)
+                yield self._step(
+                    message, buffer.append, flush, tool_names, use_cache
+                )
+                if count % batch_size == 0:
+                    flush()
+                    matches.clear()
+        finally:
+            flush()
+
+    def step_stream(
+        self, message: BaseMessage, use_cache: bool = True
+    ) -> Iterator[StreamChunk]:
+        """Process a message, yielding each part of the response when ready
+
+        Every tool result and every broadcast worker response is yielded
+        as its own chunk as soon as it completes, so slow tools do not
+        hold back fast ones. The stream ends with a final chunk whose
+        ``message`` is the response ``step`` would have returned; memory
+        holds the same messages as after ``step`` by the time it is
+        yielded, even if the stream is closed early. File commands, plain
+        replies and single-worker delegation only yield the final chunk.
+
+        Args:
+            message: Incoming message
+            use_cache: Serve cacheable tools from their result cache
+        """
+        tracer = self.tracer
+        # Checked once: with tracing off no span is entered at all
+        traced = tracer.enabled
+        write = self.memory.add_message
+        start_time = perf_counter()
+        first_output = traced
+
+        def partial(content: str, source: str) -> StreamChunk:
+            nonlocal first_output
+            if first_output:
+                tracer.record("first_output", perf_counter() - start_time)
+                first_output = False
+            return StreamChunk(content, source)
+
+        def finish(path: str, tools_used: int = 0) -> None:
+            if traced:
+                self._finish_step(message, start_time, path, tools_used)
+            else:
+                self._record_step(message, perf_counter() - start_time, tools_used)
+
+        if traced:
+            with tracer.span("memory.add"):
+                write(message)
+            with tracer.span("file_command"):
+                file_response = self._handle_file_operations(message)
+        else:
+            write(message)
+            file_response = self._handle_file_operations(message)
+        if file_response:
+            finish("file_command")
+            yield StreamChunk(file_response.content, message=file_response)
+            return
+
+        if "delegate to" in message.content.lower() and self.delegate_workers:
+            started = perf_counter()
+            if not self.delegation.broadcasts:
+                # One result: the final chunk alone, worded as step() words it
+                results = self.delegation.delegate(message)
+                pending = iter(())
+            else:
+                results = []
+                pending = self.delegation.delegate_iter(message)
+            try:
+                for index, result in pending:
+                    results.append((index, result))
+                    yield partial(
+                        f"Delegated to worker {index + 1}: {result}",
+                        f"worker {index + 1}",
+                    )
+            finally:
+                # A stream closed early still waits for the workers and
+                # leaves memory and metrics as step() would
+                results.extend(pending)
+                tracer.record(
+                    "delegation",
+                    perf_counter() - started,
+                    strategy=self.delegation_strategy,
+                )
+                response = self._delegation_response(sorted(results))
+                with tracer.span("memory.add"):
+                    write(response)
+                finish("delegation")
+            yield StreamChunk(response.content, message=response)
+            return
+
+        if traced:
+            with tracer.span("dispatch"):
+                tool_names = self._dispatcher.match(message.content.lower())
+        else:
+            tool_names = self._dispatcher.match(message.content.lower())
+        results = {}
+        started = perf_counter()
+        pending = self._iter_tools(tool_names, message.content, use_cache)
+        try:
+            for tool_name, result in pending:
+                results[tool_name] = result
+                yield partial(f"Used {tool_name}: {result}", tool_name)
+        finally:
+            results.update(pending)
+            if traced:
+                tracer.record(
+                    "tools", perf_counter() - started, count=len(tool_names)
+                )
+            tool_results = [
+                (tool_name, results[tool_name])
+                for tool_name in tool_names
+                if tool_name in results
+            ]
+            writes, response = self._compose_response(message, tool_results)
+            if traced:
+                with tracer.span("memory.add"):
+                    for item in writes:
+                        write(item)
+            else:
+                for item in writes:
+                    write(item)
+            finish("tools" if tool_results else "reply", len(tool_results))
+        yield StreamChunk(response.content, message=response)
+
+    async def astep(
+        self, message: BaseMessage, use_cache: bool = True
+    ) -> BaseMessage:
+        """Process a message without blocking the running event loop
+
+        Mirrors ``step``: memory writes, file operations, delegation and
+        tool calls are awaited, so many sessions can share one loop.
+        """
+        tracer = self.tracer
+        if not tracer.enabled:
+            return await self._astep_untraced(message, use_cache)
+        start_time = perf_counter()
+        with tracer.span("memory.add"):
+            await self.memory.aadd_message(message)
+
+        if self._is_file_command(message.content):
+            with tracer.span("file_command"):
+                file_response = await asyncio.to_thread(
+                    self._handle_file_operations, message
+                )
+            if file_response:
+                self._finish_step(message, start_time, "file_command")
+                return file_response
+
+        if "delegate to" in message.content.lower() and self.delegate_workers:
+            with tracer.span("delegation", strategy=self.delegation_strategy):
+                results = await self.delegation.adelegate(message)
+            response = self._delegation_response(results)
+            with tracer.span("memory.add"):
+                await self.memory.aadd_message(response)
+            self._finish_step(message, start_time, "delegation")
+            return response
+
+        with tracer.span("dispatch"):
+            tool_names = self._dispatcher.match(message.content.lower())
+        with tracer.span("tools", count=len(tool_names)):
+            tool_results = await self._aexecute_tools(
+                tool_names, message.content, use_cache
+            )
+        writes, response = self._compose_response(message, tool_results)
+        with tracer.span("memory.add"):
+            for write in writes:
+                await self.memory.aadd_message(write)
+        self._finish_step(
+            message, start_time, "tools" if tool_results else "reply", len(tool_results)
+        )
+        return response
+
+    async def _astep_untraced(
+        self, message: BaseMessage, use_cache: bool
+    ) -> BaseMessage:
+        """``astep`` without spans, taken while tracing is disabled"""
+        start_time = perf_counter()
+        await self.memory.aadd_message(message)
+        if self._is_file_command(message.content):
+            file_response = await asyncio.to_thread(
+                self._handle_file_operations, message
+            )
+            if file_response:
+                self._record_step(message, perf_counter() - start_time, 0)
+                return file_response
+
+        if "delegate to" in message.content.lower() and self.delegate_workers:
+            results = await self.delegation.adelegate(message)
+            response = self._delegation_response(results)
+            await self.memory.aadd_message(response)
+            self._record_step(message, perf_counter() - start_time, 0)
+            return response
+
+        tool_names = self._dispatcher.match(message.content.lower())
+        tool_results = await self._aexecute_tools(
+            tool_names, message.content, use_cache
+        )
+        writes, response = self._compose_response(message, tool_results)
+        for write in writes:
+            await self.memory.aadd_message(write)
+        self._record_step(message, perf_counter() - start_time, len(tool_results))
         return response
 
-    def calculate_performance_metrics(self, trials: int = 10) -> PerformanceMetrics:
-        """Calculate performance metrics from recent trials"""
-        recent_data = self.performance_data[-trials:] if self.performance_data else []
+    def calculate_performance_metrics(
+        self, trials: int = 10, window: Optional[float] = None
+    ) -> PerformanceMetrics:
+        """Calculate performance metrics from recent trials
+
+        Args:
+            trials: Number of most recent steps averaged for
+                ``avg_response_time`` and ``tool_usage_count``
+            window: Seconds of history the percentiles, stdev and per-tool
+                breakdown cover; None uses all-time metrics
+        """
+        start = max(0, len(self.performance_data) - trials)
+        recent_data = list(islice(self.performance_data, start, None))
+        if window is None:
+            steps, tools = self.metrics.steps, dict(self.metrics.tools)
+        else:
+            steps, tools = self.metrics.window(window)
         return PerformanceMetrics(
             avg_response_time=(
-                statistics.mean(d["response_time"] for d in recent_data)
+                sum(d["response_time"] for d in recent_data) / len(recent_data)
                 if recent_data
                 else 0.0
             ),
             tool_usage_count=sum(d["tools_used"] for d in recent_data),
             trials=len(recent_data),
-            phrase_impact={},
+            phrase_impact=dict(self.phrase_impact),
+            stdev_response_time=steps.stats.stdev,
+            p50_response_time=steps.histogram.percentile(50),
+            p95_response_time=steps.histogram.percentile(95),
+            p99_response_time=steps.histogram.percentile(99),
+            per_tool={name: summary.as_dict() for name, summary in tools.items()},
+            phrase_intervals=dict(self.phrase_intervals),
         )
 
+    def optimize_with_random_phrases(
+        self,
+        phrases: List[str],
+        trials: int = 10,
+        phrases_per_trial: int = 2,
+        prompts: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        confidence: float = 0.95,
+        min_samples: int = 30,
+        early_stop: bool = True,
+        seed: Optional[int] = None,
+    ) -> PerformanceMetrics:
+        """Measure how prefixing prompts with each phrase changes latency
+
+        Every trial runs on a fresh clone of this agent in a worker process
+        and samples ``phrases_per_trial`` phrases; each sampled phrase is
+        timed against the unprefixed prompt on the same clone. Trials stop
+        being scheduled for a phrase once its effect is clearly non-zero
+        (see ``examples.experiments.run_experiment``). The results are
+        kept in ``phrase_impact``/``phrase_intervals`` and reported by
+        ``calculate_performance_metrics``; this agent's own memory and
+        performance data are left untouched.
+
+        Args:
+            phrases: Phrases to prefix prompts with
+            trials: Maximum number of trials to run
+            phrases_per_trial: Phrases sampled into each trial
+            prompts: Prompts to replay; defaults to the user messages in
+                memory, or a small built-in set if there are none
+            max_workers: Size of the process pool (defaults to CPU count)
+            executor: Run trials on this executor instead of a new process
+                pool; its tool classes must be reachable from its workers
+            confidence: Confidence level of the reported intervals
+            min_samples: Paired samples a phrase needs before it can stop
+            early_stop: Stop sampling phrases once they are decided
+            seed: Seed for phrase sampling and ordering within trials
+
+        Returns:
+            PerformanceMetrics over all timed trial steps, with
+            ``phrase_impact`` holding each phrase's mean latency change in
+            seconds (negative is faster)
+        """
+        # examples.experiments imports this module
+        # pylint: disable=import-outside-toplevel
+        from examples.experiments import (
+            DEFAULT_PROMPTS,
+            AgentSpec,
+            run_experiment,
+            z_score,
+        )
+
+        if prompts is None:
+            prompts = [m.content for m in self.memory.messages if m.role_type == "user"]
+        spec = AgentSpec.from_agent(self)
+        max_workers = max(1, max_workers or min(trials, os.cpu_count() or 1))
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            estimates, latencies, tools_used, completed = run_experiment(
+                spec,
+                phrases,
+                trials,
+                phrases_per_trial,
+                prompts or DEFAULT_PROMPTS,
+                executor,
+                max_in_flight=max_workers,
+                confidence=confidence,
+                min_samples=min_samples,
+                early_stop=early_stop,
+                seed=seed,
+            )
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        z = z_score(confidence)
+        sampled = {p: e for p, e in estimates.items() if e.stats.count}
+        self.phrase_impact = {p: e.stats.mean for p, e in sampled.items()}
+        self.phrase_intervals = {p: e.interval(z) for p, e in sampled.items()}
+        summary = LatencySummary()
+        for latency in latencies:
+            summary.record(latency)
+        return PerformanceMetrics(
+            avg_response_time=summary.stats.mean,
+            tool_usage_count=tools_used,
+            trials=completed,
+            phrase_impact=dict(self.phrase_impact),
+            stdev_response_time=summary.stats.stdev,
+            p50_response_time=summary.histogram.percentile(50),
+            p95_response_time=summary.histogram.percentile(95),
+            p99_response_time=summary.histogram.percentile(99),
+            phrase_intervals=dict(self.phrase_intervals),
+        )
+
+
+def _step_session(agent: ChatAgent, messages: List[BaseMessage]) -> List[tuple]:
+    """(response, seconds spent stepping it) for each message in order"""
+    results = []
+    started = perf_counter()
+    for response in agent.step_many(messages):
+        finished = perf_counter()
+        results.append((response, finished - started))
+        started = finished
+    return results
+
+
+def step_many_sessions(
+    pairs: Iterable[Tuple[ChatAgent, BaseMessage]],
+    max_workers: Optional[int] = None,
+    window: int = 256,
+    timed: bool = False,
+) -> Iterator[Any]:
+    """Step independent sessions in parallel, yielding responses in order
+
+    ``pairs`` yields ``(agent, message)`` items. Items are read ``window``
+    at a time; within a window each agent's messages run in order through
+    its ``step_many`` while different agents run on separate threads.
+    Agents must not share memory, since their writes would interleave.
+    With ``timed`` each response is yielded as ``(response, seconds)``,
+    the time its agent spent on that step rather than the time since the
+    message was read.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        items = iter(pairs)
+        while True:
+            chunk = list(islice(items, window))
+            if not chunk:
+                return
+            sessions: Dict[int, Tuple[ChatAgent, List[BaseMessage]]] = {}
+            for agent, message in chunk:
+                sessions.setdefault(id(agent), (agent, []))[1].append(message)
+            futures = {
+                key: executor.submit(_step_session, agent, msgs)
+                for key, (agent, msgs) in sessions.items()
+            }
+            responses = {key: iter(future.result()) for key, future in futures.items()}
+            for agent, _ in chunk:
+                response = next(responses[id(agent)])
+                yield response if timed else response[0]
+
 
 class BaseTool:
     """Base tool interface"""
 
     name: str
     description: str
+    # Seconds ChatAgent waits for this tool; None defers to the agent
+    timeout: Optional[float] = None
+
+    # Result caching: cache_size > 0 memoizes results by cache_key in an
+    # LRU of that many entries, and cache_ttl expires them after that many
+    # seconds. Only tools whose output depends on nothing but the key (or
+    # that tolerate TTL staleness) should enable it.
+    cache_size: int = 0
+    cache_ttl: Optional[float] = None
+
+    @classmethod
+    def cache_key(cls, *args, **kwargs) -> Hashable:
+        """Key identifying an ``execute`` call for result caching"""
+        return args, tuple(sorted(kwargs.items()))
+
+    def setup(self) -> None:
+        """Acquire expensive state once, before the first ``execute``
+
+        Pooled instances are reused across messages, so handles, compiled
+        patterns or warmed caches created here survive between calls.
+        """
+
+    def teardown(self) -> None:
+        """Release state acquired in ``setup``"""
 
     def execute(self, *args, **kwargs) -> str:
         raise NotImplementedError
 
+    async def aexecute(self, *args, **kwargs) -> str:
+        """Awaitable ``execute``
+
+        Sync-only tools are adapted by running ``execute`` on the event
+        loop's default executor; native async tools override this.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.execute, *args, **kwargs)
+        )
+
 
 class TextRatingTool(
     BaseTool
@@ -254,6 +1578,22 @@ class TextRatingTool(
 
     name: str = "rating_tool"
     description: str = "Useful for rating text complexity from 1-10 based on length"
+    cache_size: int = 1024
+
+    # Longer texts are cached under a 16-byte digest, not the text itself
+    cache_key_chars: int = 256
+
+    @classmethod
+    def cache_key(cls, *args, **kwargs) -> Hashable:
+        """The rated text, or its digest when it is long
+
+        Keeps the cache at about ``cache_size * cache_key_chars`` bytes of
+        keys however large the rated messages are.
+        """
+        text = args[0] if args else ""
+        if len(text) <= cls.cache_key_chars:
+            return text
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
 
     def execute(self, *args: str, **kwargs: str) -> str:
         """Analyze text and return a rating."""
@@ -273,6 +1613,14 @@ class DiskUsageTool(BaseTool):  # pylint: disable=too-few-public-methods,abstrac
 
     name: str = "disk_usage_tool"
     description: str = "Useful for checking disk space usage and available capacity"
+    # Usage changes slowly; serve a recent reading instead of a syscall
+    cache_size: int = 1
+    cache_ttl: float = 5.0
+
+    @classmethod
+    def cache_key(cls, *args, **kwargs) -> Hashable:
+        """The reading does not depend on the message"""
+        return ()
 
     def execute(
         self, *args: str, **kwargs: str
@@ -298,6 +1646,12 @@ class GreetingTool(BaseTool):  # pylint: disable=too-few-public-methods,abstract
 
     name: str = "greeting_tool"
     description: str = "Useful for when you need to generate a friendly greeting"
+    cache_size: int = 1
+
+    @classmethod
+    def cache_key(cls, *args, **kwargs) -> Hashable:
+        """The greeting does not depend on the message"""
+        return ()
 
     def execute(
         self, *args: str, **kwargs: str
@@ -0,0 +1,151 @@
+"""Compiled tool dispatch index for matching tool names in messages"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class ToolDispatcher:
+    """Aho-Corasick automaton over tool names and their ``_``-separated parts
+
+    A single pass over the (lowercased) message finds every full tool name
+    and every name part it contains. Matching keeps the precedence used by
+    ``ChatAgent.step``: if any full tool name occurs, only those tools match;
+    otherwise every tool with at least one name part in the message matches.
+    Results are returned in registration order.
+
+    Tools can be added and removed incrementally. Adding inserts the new
+    patterns into the trie and defers the failure-link pass to the next
+    match; removing only drops ownership of the patterns, and the trie is
+    compacted once dead patterns outnumber live ones.
+
+    For small tool sets a plain substring scan runs at C speed and beats a
+    Python-level automaton walk, so below ``scan_threshold`` patterns the
+    dispatcher falls back to ``in`` checks with the same semantics.
+    """
+
+    def __init__(self, names: Iterable[str] = (), scan_threshold: int = 16):
+        self.scan_threshold = scan_threshold
+        self._order: Dict[str, int] = {}
+        self._next_seq = 0
+        # pattern -> tool names that own it as full name / as a name part
+        self._exact: Dict[str, str] = {}
+        self._partial: Dict[str, Set[str]] = {}
+        # tools with an empty name part, which matches any message
+        self._always: Set[str] = set()
+        self._reset_trie()
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._order
+
+    def _reset_trie(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminal: List[Optional[str]] = [None]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._patterns: Set[str] = set()
+        self._dirty = False
+
+    def _insert(self, pattern: str) -> None:
+        if pattern in self._patterns:
+            return
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminal.append(None)
+                self._out.append(())
+            node = nxt
+        self._terminal[node] = pattern
+        self._patterns.add(pattern)
+        self._dirty = True
+
+    def _build(self) -> None:
+        """Compute failure links and merged outputs breadth-first"""
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        out: List[Tuple[str, ...]] = [()] * len(goto)
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            out[child] = (terminal[child],) if terminal[child] else ()
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                link = fail[node]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[child] = goto[link].get(char, 0)
+                own = (terminal[child],) if terminal[child] else ()
+                out[child] = own + out[fail[child]]
+                queue.append(child)
+        self._out = out
+        self._dirty = False
+
+    def add(self, name: str) -> None:
+        """Register a tool name; re-adding an existing name is a no-op"""
+        if name in self._order:
+            return
+        self._order[name] = self._next_seq
+        self._next_seq += 1
+        if name:
+            self._exact[name] = name
+            self._insert(name)
+        for part in name.split("_"):
+            if not part:
+                self._always.add(name)
+                continue
+            self._partial.setdefault(part, set()).add(name)
+            self._insert(part)
+
+    def remove(self, name: str) -> None:
+        """Unregister a tool name"""
+        if self._order.pop(name, None) is None:
+            return
+        self._exact.pop(name, None)
+        self._always.discard(name)
+        for part in set(name.split("_")):
+            owners = self._partial.get(part)
+            if owners is not None:
+                owners.discard(name)
+                if not owners:
+                    del self._partial[part]
+        live = set(self._exact) | set(self._partial)
+        if len(self._patterns) > 2 * len(live):
+            self._reset_trie()
+            for pattern in live:
+                self._insert(pattern)
+
+    def _found_patterns(self, text: str) -> Set[str]:
+        if len(self._patterns) < self.scan_threshold:
+            return {p for p in self._patterns if p in text}
+        if self._dirty:
+            self._build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+    def match(self, text: str) -> List[str]:
+        """Return tool names matched by ``text`` in registration order"""
+        found = self._found_patterns(text)
+        matched = {self._exact[p] for p in found if p in self._exact}
+        if not matched:
+            matched = set(self._always)
+            for pattern in found:
+                matched.update(self._partial.get(pattern, ()))
+        return sorted(matched, key=self._order.__getitem__)
@@ -0,0 +1,259 @@
+"""Parallel prompt-variation experiments on isolated agent clones
+
+Each trial rebuilds the agent from an ``AgentSpec`` in a worker process,
+so trials never share memory, tool pools or caches with each other or
+with the original agent. Within a trial every prompt is sent once as is
+and once prefixed with each phrase under test, in shuffled order, and the
+paired latency differences are returned. Pairing within one clone cancels
+most of the machine-to-machine and process-to-process noise.
+"""
+
+import random
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from dataclasses import dataclass
+from statistics import NormalDist
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from examples.demo_tool_usage import (
+    SEARCH_LIMIT,
+    ChatAgent,
+    ChatHistoryMemory,
+    count_tokens,
+)
+from examples.filters import FilterChain
+from examples.messages import BaseMessage
+from examples.metrics import RunningStats
+from examples.tracing import InMemorySink, Tracer
+
+# Used when the agent's memory holds no user messages to replay
+DEFAULT_PROMPTS = (
+    "Please say hello to the team",
+    "Use rating_tool on this short piece of text",
+)
+
+# (per-phrase paired latency deltas, all step latencies, tools used)
+TrialResult = Tuple[Dict[str, List[float]], List[float], int]
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    """Picklable recipe for rebuilding an agent in another process
+
+    The clone gets the agent's tools and tool settings, and a memory with
+    the same window budgets, filters, summarizer, compaction setting,
+    search limit and current contents (window and rolling summary). A
+    tracing agent's clone traces into an ``InMemorySink``, so spans cost
+    about as much to make but are not written to the original's sinks.
+
+    Not cloned: delegate workers (experiments measure the agent on its
+    own), the memory's storage backend (the clone keeps its memory in
+    RAM), context files, and the filters and summarizer of memories that
+    have none of their own (such as a RemoteChatHistoryMemory, whose
+    clone gets the defaults). Tool classes, filter actions, summarizer
+    and tokenizer must be picklable and importable by the worker process.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    tools: Tuple[Any, ...]
+    messages: Tuple[BaseMessage, ...] = ()
+    window_size: Optional[int] = 10
+    max_chars: Optional[int] = None
+    max_tokens: Optional[int] = None
+    tokenizer: Callable[[str], int] = count_tokens
+    max_tool_instances: int = 4
+    tool_timeout: Optional[float] = None
+    filters: Optional[FilterChain] = None
+    summarizer: Optional[Any] = None
+    compact: bool = False
+    search_limit: Optional[int] = SEARCH_LIMIT
+    summary: Optional[str] = None
+    summarized_count: int = 0
+    performance_history: int = 1000
+    traced: bool = False
+
+    @classmethod
+    def from_agent(cls, agent: ChatAgent) -> "AgentSpec":
+        """Capture an agent's tools, memory configuration and current memory"""
+        memory = agent.memory
+        return cls(
+            tools=tuple(agent.tools.values()),
+            messages=tuple(memory.messages),
+            window_size=memory.window_size,
+            max_chars=memory.max_chars,
+            max_tokens=memory.max_tokens,
+            tokenizer=memory.tokenizer,
+            max_tool_instances=agent.tool_pool.max_instances,
+            tool_timeout=agent.tool_timeout,
+            filters=getattr(memory, "filters", None),
+            summarizer=getattr(memory, "summarizer", None),
+            compact=memory.compact,
+            search_limit=memory.search_limit,
+            summary=memory.summary,
+            summarized_count=getattr(memory, "summarized_count", 0),
+            performance_history=agent.performance_data.maxlen or 1000,
+            traced=agent.tracer.enabled,
+        )
+
+    def build(self) -> ChatAgent:
+        """Create a fresh agent whose memory starts as a copy of the original"""
+        # The messages were filtered when the original stored them
+        memory = ChatHistoryMemory(
+            window_size=self.window_size,
+            max_chars=self.max_chars,
+            max_tokens=self.max_tokens,
+            tokenizer=self.tokenizer,
+            summarizer=self.summarizer,
+            compact=self.compact,
+            filters=FilterChain(),
+            search_limit=self.search_limit,
+        )
+        memory.summary = self.summary
+        memory.summarized_count = self.summarized_count
+        memory.add_messages(self.messages)
+        memory.filters = (
+            self.filters
+            if self.filters is not None
+            else FilterChain.default(memory.summarizer)
+        )
+        return ChatAgent(
+            memory=memory,
+            tools=list(self.tools),
+            max_tool_instances=self.max_tool_instances,
+            tool_timeout=self.tool_timeout,
+            performance_history=self.performance_history,
+            tracer=Tracer([InMemorySink()]) if self.traced else None,
+        )
+
+
+def phrase_message(prompt: str, phrase: Optional[str]) -> BaseMessage:
+    """User message for ``prompt``, prefixed with ``phrase`` if given"""
+    if phrase is None:
+        return BaseMessage.make_user_message("User", prompt)
+    message = BaseMessage.make_user_message("User", f"{phrase} {prompt}")
+    message.optimization_phrase = phrase
+    return message
+
+
+def run_trial(
+    spec: AgentSpec,
+    phrases: Sequence[str],
+    prompts: Sequence[str],
+    seed: int,
+    repeats: int = 3,
+) -> TrialResult:
+    """Run one trial on a fresh clone; executed in a worker process"""
+    rng = random.Random(seed)
+    agent = spec.build()
+    try:
+        # Warm up pools and lazily built state before timing anything
+        for prompt in prompts:
+            agent.step(phrase_message(prompt, None), use_cache=False)
+
+        deltas: Dict[str, List[float]] = {phrase: [] for phrase in phrases}
+        latencies = []
+        variants: List[Optional[str]] = [None, *phrases]
+        for _ in range(repeats):
+            for prompt in prompts:
+                rng.shuffle(variants)
+                timings = {}
+                for phrase in variants:
+                    message = phrase_message(prompt, phrase)
+                    started = perf_counter()
+                    agent.step(message, use_cache=False)
+                    timings[phrase] = perf_counter() - started
+                latencies.extend(timings.values())
+                for phrase in phrases:
+                    deltas[phrase].append(timings[phrase] - timings[None])
+        tools_used = sum(d["tools_used"] for d in agent.performance_data)
+        return deltas, latencies, tools_used
+    finally:
+        agent.close()
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal critical value for a confidence level"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+@dataclass
+class PhraseEstimate:
+    """Running estimate of one phrase's latency delta"""
+
+    stats: RunningStats
+    decided: bool = False
+
+    def interval(self, z: float) -> Tuple[float, float]:
+        """Confidence interval of the mean delta (normal approximation)"""
+        if self.stats.count < 2:
+            return float("-inf"), float("inf")
+        half_width = z * self.stats.stdev / self.stats.count**0.5
+        return self.stats.mean - half_width, self.stats.mean + half_width
+
+
+def run_experiment(
+    spec: AgentSpec,
+    phrases: Sequence[str],
+    trials: int,
+    phrases_per_trial: int,
+    prompts: Sequence[str],
+    executor: Executor,
+    max_in_flight: int,
+    confidence: float = 0.95,
+    min_samples: int = 30,
+    early_stop: bool = True,
+    seed: Optional[int] = None,
+) -> Tuple[Dict[str, PhraseEstimate], List[float], int, int]:
+    """Schedule trials on ``executor`` and aggregate their results
+
+    Trials are submitted ``max_in_flight`` at a time so that each new
+    trial only samples phrases that are still undecided. With
+    ``early_stop`` a phrase is decided once it has ``min_samples`` paired
+    deltas and its confidence interval excludes zero, i.e. it is clearly
+    faster or slower than the unprefixed prompt; the experiment ends early
+    when every phrase is decided.
+
+    Returns:
+        (estimate per phrase, step latencies, tools used, trials completed)
+    """
+    rng = random.Random(seed)
+    z = z_score(confidence)
+    estimates = {phrase: PhraseEstimate(RunningStats()) for phrase in phrases}
+    latencies: List[float] = []
+    tools_used = 0
+    completed = 0
+    submitted = 0
+    in_flight = set()
+
+    def submit() -> bool:
+        nonlocal submitted
+        undecided = [p for p in phrases if not estimates[p].decided]
+        if submitted >= trials or not undecided:
+            return False
+        chosen = rng.sample(undecided, min(phrases_per_trial, len(undecided)))
+        in_flight.add(
+            executor.submit(run_trial, spec, chosen, prompts, rng.randrange(2**32))
+        )
+        submitted += 1
+        return True
+
+    while len(in_flight) < max_in_flight and submit():
+        pass
+    while in_flight:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.discard(future)
+            deltas, trial_latencies, trial_tools = future.result()
+            completed += 1
+            latencies.extend(trial_latencies)
+            tools_used += trial_tools
+            for phrase, values in deltas.items():
+                estimate = estimates[phrase]
+                for value in values:
+                    estimate.stats.add(value)
+                low, high = estimate.interval(z)
+                if early_stop and estimate.stats.count >= min_samples:
+                    estimate.decided = estimate.decided or low > 0 or high < 0
+        while len(in_flight) < max_in_flight and submit():
+            pass
+    return estimates, latencies, tools_used, completed
@@ -0,0 +1,616 @@
+"""Cached contents of the files in an agent's context
+
+``FileContextStore`` replaces the plain set of file names an agent kept
+for ``add``/``remove``/``edit``. It still behaves like that set, but also
+loads each file's contents when the file is added and keeps them cached:
+
+    - every read revalidates the entry with one ``stat`` and only reloads
+      the file when its modification time or size changed
+    - files of ``mmap_threshold`` bytes or more are memory-mapped instead
+      of copied onto the heap; ``read_bytes`` serves them straight from
+      the map, while ``read`` decodes them once and keeps the str
+    - cached bytes (files, plus decoded copies of mapped ones) are bounded
+      by ``budget_bytes``; least recently used entries are evicted first
+      and reloaded on their next read
+    - ``write`` and ``patch`` update the entry in place, so a read after
+      an edit costs no I/O at all
+
+Writes never leave a half-written file behind: the new contents go to a
+temporary file in the same directory that is renamed over the original,
+and ``sync`` decides what is fsynced first ("none", "file", or "full" to
+also sync the directory). With ``write_interval`` set, edits are held
+for that many seconds and a burst of edits to one file is written once
+(by a timer, on the next edit or ``flush``, or at interpreter exit;
+reads see held edits). Each file is written on its own: an edit that
+cannot be written is dropped, so reads fall back to what is on disk, and
+its error goes to the caller editing that file (or the next ``flush``).
+
+A ``patch`` replaces one snippet. By default it is written like any
+other edit; with ``patch_in_place`` only the changed byte range, or the
+tail of the file when its size changes, is written in place, so the cost
+follows the size of the change rather than of the file, at the price of
+the atomic-write guarantee. Patches fall back to an atomic rewrite when
+that range is more than half the file or the file changed on disk
+meanwhile.
+
+Files that do not exist (yet) can be added; they read as None until
+they are created.
+"""
+
+# mmap is only needed once a large file is loaded
+# pylint: disable=import-outside-toplevel
+import atexit
+import os
+import stat
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024
+SYNC_POLICIES = ("none", "file", "full")
+
+
+@dataclass
+class ContextStats:
+    """Counters reported by a FileContextStore"""
+
+    hits: int = 0
+    loads: int = 0
+    evictions: int = 0
+    cached_bytes: int = 0
+    writes: int = 0
+    region_writes: int = 0
+    coalesced: int = 0
+    failed_writes: int = 0
+
+
+class _Entry:
+    """Cached contents of one file and the stat they were loaded at
+
+    A mapped file is decoded on its first ``text`` call and the str is
+    kept alongside the map, so later text reads are hits too.
+    """
+
+    __slots__ = ("version", "data", "decoded")
+
+    def __init__(self, version: Tuple[int, int], data: Union[str, Any]):
+        # (st_mtime_ns, st_size); data is a str or an mmap of the file
+        self.version = version
+        self.data = data
+        self.decoded: Optional[str] = data if isinstance(data, str) else None
+
+    @property
+    def mapped(self) -> bool:
+        """Whether the contents are served from an mmap"""
+        return not isinstance(self.data, str)
+
+    @property
+    def size(self) -> int:
+        """Bytes counted against the budget: the file, plus its decoded copy"""
+        if self.mapped and self.decoded is not None:
+            return 2 * self.version[1]
+        return self.version[1]
+
+    def text(self) -> str:
+        """Contents as a str, decoding a mapped file only once"""
+        if self.decoded is None:
+            self.decoded = str(self.data, "utf-8", "replace")
+        return self.decoded
+
+    def view(self) -> Union[bytes, memoryview]:
+        """Contents as UTF-8 bytes; a mapped file is served without a copy"""
+        if self.mapped:
+            return memoryview(self.data)
+        return self.data.encode("utf-8")
+
+    def close(self) -> None:
+        """Unmap a mapped file; str contents need no cleanup"""
+        if self.mapped:
+            try:
+                self.data.close()
+            except BufferError:  # a caller still holds a view of the map
+                pass
+
+
+class _PendingWrite:
+    """New contents of a file that are not on disk yet
+
+    ``char_start`` is None for a full rewrite; otherwise the contents
+    differ from ``base`` (the stat of the file they were derived from)
+    only from ``char_start``/``byte_start`` up to ``char_end``, or up to
+    the end of the file when ``char_end`` is None.
+    """
+
+    __slots__ = ("text", "base", "char_start", "char_end", "byte_start", "since")
+
+    def __init__(
+        self,
+        text: str,
+        base: Optional[Tuple[int, int]] = None,
+        char_start: Optional[int] = None,
+        char_end: Optional[int] = None,
+        byte_start: int = 0,
+    ):
+        self.text = text
+        self.base = base
+        self.char_start = char_start
+        self.char_end = char_end
+        self.byte_start = byte_start
+        self.since = monotonic()
+
+    def merge(self, earlier: "_PendingWrite") -> None:
+        """Fold in an edit that is still pending from before this one"""
+        self.base = earlier.base
+        self.since = earlier.since
+        if self.char_start is None or earlier.char_start is None:
+            self.char_start = None
+            return
+        # Both texts match the file on disk up to the earlier of the starts
+        if earlier.char_start < self.char_start:
+            self.char_start = earlier.char_start
+            self.byte_start = earlier.byte_start
+        if self.char_end is None or earlier.char_end is None:
+            self.char_end = None
+        else:
+            # Bounded ranges come from edits that keep both the character
+            # and the byte length, so both kinds of offset still agree
+            self.char_end = max(self.char_end, earlier.char_end)
+
+
+def _stat(filename: str) -> Optional[Tuple[int, int]]:
+    try:
+        result = os.stat(filename)
+    except OSError:
+        return None
+    return result.st_mtime_ns, result.st_size
+
+
+_umask: Optional[int] = None
+
+
+def _new_file_mode() -> int:
+    global _umask  # pylint: disable=global-statement
+    if _umask is None:
+        # The only portable way to read the umask is to set it
+        _umask = os.umask(0o022)
+        os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def atomic_write(filename: str, data: bytes, sync: str = "file") -> None:
+    """Replace ``filename`` with ``data`` via a renamed temporary file
+
+    The file keeps its permissions; a symlink is followed and its target
+    replaced.
+    """
+    target = os.path.realpath(filename)
+    directory = os.path.dirname(target)
+    fd, temp = tempfile.mkstemp(
+        prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if sync != "none":
+                os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(target).st_mode)
+        except FileNotFoundError:
+            mode = _new_file_mode()
+        os.chmod(temp, mode)
+        os.replace(temp, target)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except FileNotFoundError:
+            pass
+        raise
+    if sync == "full":
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def _write_region(
+    filename: str, data: bytes, offset: int, size: Optional[int], sync: str
+) -> None:
+    """Overwrite bytes in place from ``offset``, then cut the file at ``size``"""
+    fd = os.open(filename, os.O_WRONLY)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view, offset = view[written:], offset + written
+        if size is not None:
+            os.ftruncate(fd, size)
+        if sync != "none":
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Stores that may hold edits, flushed when the interpreter exits
+_open_stores: "weakref.WeakSet[FileContextStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_stores() -> None:
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except OSError:
+            pass  # Nobody is left to report to
+
+
+class FileContextStore:
+    """Set of context file names with mtime-validated cached contents
+
+    Args:
+        budget_bytes: Upper bound on the bytes of file contents kept
+            cached; a file larger than this is read from disk every time
+        mmap_threshold: Files of at least this many bytes are mapped
+            rather than read
+        sync: What is fsynced before a write counts as done: "none",
+            "file" or "full" (the file and its directory)
+        write_interval: Seconds an edit may be held so that further
+            edits to the same file are written together; 0 writes every
+            edit immediately
+        patch_in_place: Write patches over the changed region instead of
+            atomically rewriting the file; a crash can then tear that
+            region
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        budget_bytes: int = DEFAULT_BUDGET_BYTES,
+        mmap_threshold: int = DEFAULT_MMAP_THRESHOLD,
+        sync: str = "file",
+        write_interval: float = 0.0,
+        patch_in_place: bool = False,
+    ):
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"sync must be one of {SYNC_POLICIES}, not {sync!r}")
+        self.budget_bytes = budget_bytes
+        self.mmap_threshold = mmap_threshold
+        self.sync = sync
+        self.write_interval = write_interval
+        self.patch_in_place = patch_in_place
+        self._names: "OrderedDict[str, None]" = OrderedDict()
+        # Least recently used first
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Edits held back for coalescing; never evicted
+        self._pending: Dict[str, _PendingWrite] = {}
+        # Errors of held edits written while another file was edited
+        self._errors: List[OSError] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._stats = ContextStats()
+
+    def __contains__(self, filename: object) -> bool:
+        return filename in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._names))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __repr__(self) -> str:
+        return f"FileContextStore({list(self._names)!r})"
+
+    @property
+    def stats(self) -> ContextStats:
+        """Snapshot of hit, load and eviction counters"""
+        with self._lock:
+            return ContextStats(**vars(self._stats))
+
+    def add(self, filename: str) -> None:
+        """Add a file to the context and load its contents"""
+        with self._lock:
+            self._names[filename] = None
+            if filename not in self._pending:
+                self._lookup(filename)
+
+    def discard(self, filename: str) -> None:
+        """Remove a file from the context if it is there"""
+        with self._lock:
+            if filename in self._pending:
+                self._flush_file(filename)
+            self._names.pop(filename, None)
+            self._drop(filename)
+
+    def remove(self, filename: str) -> None:
+        """Remove a file from the context, raising KeyError if absent"""
+        if filename not in self._names:
+            raise KeyError(filename)
+        self.discard(filename)
+
+    def release(self) -> None:
+        """Write held edits and drop every cached file, keeping the context
+
+        Raises the first ``OSError`` of an edit that could not be written,
+        after everything else was written and released.
+        """
+        with self._lock:
+            try:
+                self._raise_errors(force=True)
+            finally:
+                for filename in list(self._entries):
+                    self._drop(filename)
+
+    def clear(self) -> None:
+        """Empty the context and release every cached file"""
+        self.release()
+        with self._lock:
+            self._names.clear()
+
+    def read(self, filename: str) -> Optional[str]:
+        """Current contents of a file, None if it cannot be read
+
+        Files outside the context are read but not cached.
+        """
+        with self._lock:
+            return self._text(filename)
+
+    def read_bytes(self, filename: str) -> Optional[Union[bytes, memoryview]]:
+        """Current contents of a file as UTF-8 bytes, None if unreadable
+
+        Memory-mapped files are returned as a read-only ``memoryview`` of
+        the map, so large files are served without copying or decoding.
+        Release the view when done; a file cannot be unmapped while it is
+        held. Files outside the context are read but not cached.
+        """
+        with self._lock:
+            pending = self._pending.get(filename)
+            if pending is not None:
+                self._stats.hits += 1
+                return pending.text.encode("utf-8")
+            entry = self._lookup(filename)
+            if entry is None:
+                return None
+            data = entry.view()
+            if self._entries.get(filename) is not entry:
+                entry.close()
+            return data
+
+    def write(self, filename: str, content: str) -> None:
+        """Replace a file's contents and update its cached copy
+
+        Raises ``UnicodeEncodeError`` for unencodable content and the
+        usual ``OSError`` if the write is due and fails; the edit is then
+        dropped.
+        """
+        content.encode("utf-8", "strict")
+        with self._lock:
+            self._queue(filename, _PendingWrite(content))
+
+    def patch(self, filename: str, old: str, new: str) -> None:
+        """Replace the first occurrence of ``old`` in a file with ``new``
+
+        Raises ``FileNotFoundError`` if the file cannot be read and
+        ``ValueError`` if ``old`` is empty or does not occur in it.
+        """
+        if not old:
+            raise ValueError("Text to replace must not be empty")
+        new.encode("utf-8", "strict")
+        with self._lock:
+            pending = self._pending.get(filename)
+            base = pending.base if pending is not None else _stat(filename)
+            text = self._text(filename)
+            if text is None:
+                raise FileNotFoundError(f"Cannot read {filename}")
+            start = text.find(old)
+            if start < 0:
+                raise ValueError(f"{old!r} not found in {filename}")
+            # Only edits keeping the byte and the character length leave
+            # the offsets after them valid for later edits to merge with
+            same_size = len(old) == len(new) and len(old.encode("utf-8")) == len(
+                new.encode("utf-8")
+            )
+            self._queue(
+                filename,
+                _PendingWrite(
+                    text[:start] + new + text[start + len(old) :],
+                    base,
+                    start,
+                    start + len(new) if same_size else None,
+                    start if text.isascii() else len(text[:start].encode("utf-8")),
+                ),
+            )
+
+    def flush(self) -> None:
+        """Write every held edit
+
+        Raises the first ``OSError`` of an edit that could not be written
+        since the last flush; every other file is written regardless.
+        """
+        with self._lock:
+            self._raise_errors(force=True)
+
+    def _text(self, filename: str) -> Optional[str]:
+        pending = self._pending.get(filename)
+        if pending is not None:
+            self._stats.hits += 1
+            return pending.text
+        entry = self._lookup(filename)
+        if entry is None:
+            return None
+        size = entry.size
+        text = entry.text()
+        if self._entries.get(filename) is not entry:
+            entry.close()
+        elif entry.size != size:
+            # The decoded copy of a mapped file now counts as well
+            self._stats.cached_bytes += entry.size - size
+            self._evict_over_budget()
+        return text
+
+    def _queue(self, filename: str, pending: _PendingWrite) -> None:
+        earlier = self._pending.get(filename)
+        if earlier is not None:
+            pending.merge(earlier)
+            self._stats.coalesced += 1
+        self._pending[filename] = pending
+        # A mapped file must be unmapped before it is rewritten
+        self._drop(filename)
+        error = self._flush_due(current=filename)
+        if error is not None:
+            raise error
+        if filename in self._pending:
+            self._schedule()
+
+    def _flush_due(
+        self, force: bool = False, current: Optional[str] = None
+    ) -> Optional[OSError]:
+        """Write each due edit on its own; returns ``current``'s error
+
+        Errors of other files are kept for the next ``flush``.
+        """
+        now = monotonic()
+        error = None
+        for filename, pending in list(self._pending.items()):
+            if force or now - pending.since >= self.write_interval:
+                try:
+                    self._flush_file(filename)
+                except OSError as e:
+                    if filename == current:
+                        error = e
+                    else:
+                        self._errors.append(e)
+        return error
+
+    def _raise_errors(self, force: bool = False) -> None:
+        self._flush_due(force)
+        errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def _schedule(self) -> None:
+        """Start a timer writing held edits once they are due"""
+        _open_stores.add(self)
+        if self._timer is not None or not self._pending:
+            return
+        due = min(pending.since for pending in self._pending.values())
+        delay = max(0.0, due + self.write_interval - monotonic())
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            self._flush_due()
+            self._schedule()
+
+    def _flush_file(self, filename: str) -> None:
+        """Write one held edit, dropping it (and its cache) if that fails"""
+        pending = self._pending.pop(filename)
+        try:
+            self._write_pending(filename, pending)
+        except OSError:
+            self._stats.failed_writes += 1
+            self._drop(filename)
+            raise
+
+    def _write_pending(self, filename: str, pending: _PendingWrite) -> None:
+        text = pending.text
+        chunk = None
+        if (
+            self.patch_in_place
+            and pending.char_start is not None
+            and pending.base is not None
+            and _stat(filename) == pending.base
+        ):
+            chunk = text[pending.char_start : pending.char_end].encode("utf-8")
+            if pending.char_end is None:
+                size = pending.byte_start + len(chunk)
+            else:
+                size = pending.base[1]
+            if 2 * len(chunk) > size:
+                chunk = None
+        if chunk is not None:
+            _write_region(
+                filename,
+                chunk,
+                pending.byte_start,
+                size if pending.char_end is None else None,
+                self.sync,
+            )
+            self._stats.region_writes += 1
+        else:
+            data = text.encode("utf-8")
+            size = len(data)
+            atomic_write(filename, data, self.sync)
+        self._stats.writes += 1
+        version = _stat(filename)
+        if (
+            filename in self._names
+            and version is not None
+            and version[1] == size
+            and size < self.mmap_threshold
+        ):
+            self._store(filename, _Entry(version, text))
+
+    def _lookup(self, filename: str) -> Optional[_Entry]:
+        """Valid cached entry for a file, (re)loading it if needed"""
+        version = _stat(filename)
+        entry = self._entries.get(filename)
+        if entry is not None:
+            if entry.version == version:
+                self._entries.move_to_end(filename)
+                self._stats.hits += 1
+                return entry
+            self._drop(filename)
+        if version is None:
+            return None
+        entry = self._load(filename, version)
+        if entry is not None and filename in self._names:
+            self._store(filename, entry)
+        return entry
+
+    def _load(self, filename: str, version: Tuple[int, int]) -> Optional[_Entry]:
+        self._stats.loads += 1
+        try:
+            with open(filename, "rb") as f:
+                if version[1] >= self.mmap_threshold:
+                    import mmap
+
+                    return _Entry(
+                        version, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    )
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+        # The file may have changed between the stat and the read
+        if len(data) != version[1]:
+            version = (version[0], len(data))
+        return _Entry(version, data.decode("utf-8", "replace"))
+
+    def _store(self, filename: str, entry: _Entry) -> None:
+        if entry.size > self.budget_bytes:
+            return
+        self._entries[filename] = entry
+        self._stats.cached_bytes += entry.size
+        self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        while self._stats.cached_bytes > self.budget_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats.evictions += 1
+
+    def _drop(self, filename: str) -> None:
+        entry = self._entries.pop(filename, None)
+        if entry is not None:
+            self._stats.cached_bytes -= entry.size
+            entry.close()
@@ -0,0 +1,146 @@
+"""Storage filters for ChatHistoryMemory
+
+Filters are rules keyed by a bracketed marker such as ``[DO NOT STORE]``.
+A ``FilterChain`` finds every marker in a message with one regex scan and
+looks each up in a dict of rules, so the cost per message depends on the
+message, not on how many rules are registered. Messages without a ``[``
+skip the scan entirely.
+
+A rule's action receives the message and returns the message to store,
+possibly a transformed copy, or None to drop it. When a message carries
+several markers their actions run in the order the rules were added, each
+on the previous action's result; dropping the message stops the chain.
+
+Built-in rules (see ``FilterChain.default``):
+
+    [DO NOT STORE]: the message is dropped
+    [STORE ONLY PUBLIC]: only the ``Public:`` segments are stored; a
+        message without any is dropped
+    [SUMMARIZE]: the message is stored as a summary (see
+        ``examples.summarize``)
+"""
+
+import re
+from dataclasses import replace
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from examples.messages import BaseMessage
+from examples.summarize import SUMMARIZE_TAG, strip_tag
+
+DO_NOT_STORE_TAG = "[DO NOT STORE]"
+STORE_ONLY_PUBLIC_TAG = "[STORE ONLY PUBLIC]"
+
+FilterAction = Callable[[BaseMessage], Optional[BaseMessage]]
+
+_MARKER = re.compile(r"\[([^\[\]\n]{1,64})\]")
+# Segment labels; text up to the next label belongs to the segment
+_LABEL = re.compile(r"\b(Public|Private):")
+
+
+def public_segments(text: str) -> List[str]:
+    """Text of every ``Public:`` segment, markers removed
+
+    A segment runs from its label to the next ``Public:``/``Private:``
+    label or the end of the text. Unlabelled text is treated as private.
+    """
+    parts = _LABEL.split(_MARKER.sub(" ", text))
+    segments = []
+    for label, body in zip(parts[1::2], parts[2::2]):
+        body = body.strip().strip(",;").strip()
+        if label == "Public" and body:
+            segments.append(body)
+    return segments
+
+
+def redact_public(message: BaseMessage) -> Optional[BaseMessage]:
+    """Copy of ``message`` keeping only its public segments, or None"""
+    segments = public_segments(message.content)
+    if not segments:
+        return None
+    return replace(
+        message, content=", ".join(f"Public: {segment}" for segment in segments)
+    )
+
+
+def reject(message: BaseMessage) -> None:  # pylint: disable=unused-argument
+    """Drop the message"""
+    return None
+
+
+def _marker_key(marker: str) -> str:
+    return marker[1:-1] if marker.startswith("[") and marker.endswith("]") else marker
+
+
+class FilterChain:
+    """Marker-triggered storage rules applied in one pass over each message"""
+
+    def __init__(self):
+        # Marker text (without brackets) -> (registration order, action)
+        self._rules: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, marker: str) -> bool:
+        return _marker_key(marker) in self._rules
+
+    def add_rule(self, marker: str, action: FilterAction) -> "FilterChain":
+        """Run ``action`` on messages containing ``marker``
+
+        ``marker`` may be given with or without its brackets. Adding a rule
+        for a marker that already has one replaces the old action but keeps
+        its place in the order.
+        """
+        key = _marker_key(marker)
+        if not key or "[" in key or "]" in key or "\n" in key or len(key) > 64:
+            raise ValueError(f"Invalid filter marker {marker!r}")
+        order = self._rules[key][0] if key in self._rules else len(self._rules)
+        self._rules[key] = (order, action)
+        return self
+
+    def remove_rule(self, marker: str) -> None:
+        """Stop filtering on ``marker``"""
+        del self._rules[_marker_key(marker)]
+
+    def apply(self, message: BaseMessage) -> Optional[BaseMessage]:
+        """The message to store, or None if it should be dropped"""
+        content = message.content
+        if "[" not in content:
+            return message
+        rules = self._rules
+        matched = {
+            rules[key] for key in _MARKER.findall(content) if key in rules
+        }
+        for _, action in sorted(matched, key=lambda rule: rule[0]):
+            message = action(message)
+            if message is None:
+                return None
+        return message
+
+    @classmethod
+    def default(cls, summarizer: Optional[Any] = None) -> "FilterChain":
+        """Chain with the built-in rules
+
+        The ``[SUMMARIZE]`` rule is only added when a ``summarizer`` is
+        given.
+        """
+        chain = cls()
+        chain.add_rule(DO_NOT_STORE_TAG, reject)
+        chain.add_rule(STORE_ONLY_PUBLIC_TAG, redact_public)
+        if summarizer is not None:
+            chain.add_rule(SUMMARIZE_TAG, summarize_with(summarizer))
+        return chain
+
+
+def _summarize(summarizer: Any, message: BaseMessage) -> BaseMessage:
+    return replace(message, content=summarizer.summarize(strip_tag(message.content)))
+
+
+def summarize_with(summarizer: Any) -> FilterAction:
+    """Action storing a message as ``summarizer``'s summary of it
+
+    The action pickles along with its summarizer, so a chain built from
+    the built-in rules can be sent to worker processes.
+    """
+    return partial(_summarize, summarizer)
@@ -1,27 +1,95 @@
-"""Core message class for agent communication"""
+"""Core message class for agent communication
 
-from dataclasses import dataclass
-from typing import Dict
+Messages are slotted dataclasses: they carry no per-instance ``__dict__``
+and their role strings are interned, so long histories repeating "System"
+or "assistant" store a single copy of each. ``FrozenMessage`` is the
+immutable (and hashable) variant for histories that are shared between
+agents or threads.
+"""
 
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 
-@dataclass
+
+@dataclass(slots=True)
 class PerformanceMetrics:
     """Track performance metrics for optimization"""
     avg_response_time: float
     tool_usage_count: int
     trials: int
+    # phrase -> mean latency change (seconds) when prefixed to a prompt
     phrase_impact: Dict[str, float]
+    stdev_response_time: float = 0.0
+    p50_response_time: float = 0.0
+    p95_response_time: float = 0.0
+    p99_response_time: float = 0.0
+    # tool name -> count/mean/stdev/p50/p95/p99 of its execution time
+    per_tool: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # phrase -> confidence interval (low, high) of its phrase_impact
+    phrase_intervals: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+
+class _MessageMixin:
+    """Behaviour shared by the mutable and frozen message types"""
+
+    __slots__ = ()
+
+    def __post_init__(self) -> None:
+        # object.__setattr__ also works on the frozen variant
+        object.__setattr__(self, "role_name", sys.intern(self.role_name))
+        object.__setattr__(self, "role_type", sys.intern(self.role_type))
+
+    @classmethod
+    def make_user_message(cls, role_name: str, content: str):
+        """Create a user message"""
+        return cls(role_name=role_name, content=content, role_type="user")
 
 
-@dataclass
-class BaseMessage:
+@dataclass(slots=True)
+class BaseMessage(_MessageMixin):
     """Base message type for agent communication"""
 
     role_name: str
     content: str
     role_type: str = "user"
+    # Phrase under test when the message is part of a phrase experiment
+    optimization_phrase: Optional[str] = None
 
-    @classmethod
-    def make_user_message(cls, role_name: str, content: str) -> "BaseMessage":
-        """Create a user message"""
-        return cls(role_name=role_name, content=content, role_type="user")
+    def freeze(self) -> "FrozenMessage":
+        """Immutable copy of this message"""
+        return FrozenMessage(
+            self.role_name, self.content, self.role_type, self.optimization_phrase
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenMessage(_MessageMixin):
+    """Immutable, hashable message with the same fields as BaseMessage"""
+
+    role_name: str
+    content: str
+    role_type: str = "user"
+    optimization_phrase: Optional[str] = None
+
+    def thaw(self) -> BaseMessage:
+        """Mutable copy of this message"""
+        return BaseMessage(
+            self.role_name, self.content, self.role_type, self.optimization_phrase
+        )
+
+
+@dataclass(slots=True)
+class StreamChunk:
+    """One piece of a streamed response (see ``ChatAgent.step_stream``)"""
+
+    content: str
+    # Tool name or "worker N" that produced a partial chunk
+    source: Optional[str] = None
+    # The complete response; set on the final chunk only
+    message: Optional[BaseMessage] = None
+
+    @property
+    def final(self) -> bool:
+        """Whether this chunk ends the stream"""
+        return self.message is not None
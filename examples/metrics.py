@@ -0,0 +1,282 @@
+"""Fixed-memory latency statistics for agent performance tracking"""
+
+import math
+import threading
+from collections import deque
+from time import monotonic
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+# Histogram resolution: 2**SUB_BUCKET_BITS buckets per power of two keeps
+# the relative error of any reported percentile under ~3%
+SUB_BUCKET_BITS = 5
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+
+class RunningStats:
+    """Online count, mean, variance, min and max (Welford's algorithm)"""
+
+    __slots__ = ("count", "mean", "_m2", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float) -> None:
+        """Fold one observation into the statistics"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "RunningStats") -> None:
+        """Combine another set of statistics into this one (Chan et al.)"""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, 0.0 with fewer than two observations"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation"""
+        return math.sqrt(self.variance)
+
+
+def _bucket_index(value_ns: int) -> int:
+    shift = max(0, value_ns.bit_length() - SUB_BUCKET_BITS)
+    return shift * _HALF + (value_ns >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """Lowest value and width (in ns) of the values mapped to ``index``"""
+    shift = max(0, (index >> (SUB_BUCKET_BITS - 1)) - 1)
+    return (index - shift * _HALF) << shift, 1 << shift
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram
+
+    Latencies are recorded in nanoseconds into buckets whose width grows
+    with the value, so memory is bounded by the dynamic range rather than
+    the number of samples. Histograms with the same resolution merge by
+    adding bucket counts.
+    """
+
+    __slots__ = ("counts", "total")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        """Record one latency given in seconds"""
+        index = _bucket_index(max(0, int(seconds * 1e9)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's counts to this one"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+
+    def percentile(self, pct: float) -> float:
+        """Latency in seconds at percentile ``pct`` (0-100), 0.0 if empty"""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, width = _bucket_bounds(index)
+                return (low + (width - 1) / 2) / 1e9
+        return 0.0  # pragma: no cover - rank never exceeds total
+
+
+class LatencySummary:
+    """Running statistics paired with a histogram for one latency series"""
+
+    __slots__ = ("stats", "histogram")
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.histogram = LatencyHistogram()
+
+    def record(self, seconds: float) -> None:
+        """Record one latency given in seconds"""
+        self.stats.add(seconds)
+        self.histogram.record(seconds)
+
+    def merge(self, other: "LatencySummary") -> None:
+        """Combine another summary into this one"""
+        self.stats.merge(other.stats)
+        self.histogram.merge(other.histogram)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Count, mean, stdev and p50/p95/p99 latencies in seconds"""
+        return {
+            "count": self.stats.count,
+            "mean": self.stats.mean,
+            "stdev": self.stats.stdev,
+            "p50": self.histogram.percentile(50),
+            "p95": self.histogram.percentile(95),
+            "p99": self.histogram.percentile(99),
+        }
+
+
+def _copy(summary: LatencySummary) -> LatencySummary:
+    copy = LatencySummary()
+    copy.merge(summary)
+    return copy
+
+
+class MetricsStore:
+    """Fixed-memory store of step and per-tool latencies
+
+    Keeps all-time summaries plus a sliding window made of
+    ``window_slices`` time slices of ``slice_seconds`` each; slices older
+    than the window are dropped as new ones start. Stores from different
+    agents can be merged; their slices line up by slice number, so they
+    should use the same clock (the default monotonic clock is host-wide).
+    """
+
+    def __init__(
+        self,
+        slice_seconds: float = 10.0,
+        window_slices: int = 30,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.slice_seconds = slice_seconds
+        self.window_slices = window_slices
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.steps = LatencySummary()
+        self.tools: Dict[str, LatencySummary] = {}
+        self.tool_usage_count = 0
+        # (slice number, step summary, per-tool summaries)
+        self._slices: Deque[Tuple[int, LatencySummary, Dict[str, LatencySummary]]]
+        self._slices = deque(maxlen=window_slices)
+        # The newest slice and the clock range it covers, so recording
+        # into it costs one clock read and one comparison
+        self._slice: Optional[Tuple[int, LatencySummary, Dict]] = None
+        self._slice_start = math.inf
+        self._slice_end = -math.inf
+
+    def _current_slice(self):
+        now = self._clock()
+        if self._slice_start <= now < self._slice_end:
+            return self._slice
+        number = int(now // self.slice_seconds)
+        if not self._slices or self._slices[-1][0] != number:
+            self._slices.append((number, LatencySummary(), {}))
+        self._slice = self._slices[-1]
+        self._slice_start = number * self.slice_seconds
+        self._slice_end = self._slice_start + self.slice_seconds
+        return self._slice
+
+    def record_step(self, seconds: float, tools_used: int = 0) -> None:
+        """Record the latency of one agent step"""
+        with self._lock:
+            self.steps.record(seconds)
+            self.tool_usage_count += tools_used
+            self._current_slice()[1].record(seconds)
+
+    def record_tool(self, name: str, seconds: float) -> None:
+        """Record the execution latency of one tool call"""
+        with self._lock:
+            summary = self.tools.get(name)
+            if summary is None:
+                summary = self.tools[name] = LatencySummary()
+            summary.record(seconds)
+            window_tools = self._current_slice()[2]
+            if name not in window_tools:
+                window_tools[name] = LatencySummary()
+            window_tools[name].record(seconds)
+
+    def window(
+        self, seconds: Optional[float] = None
+    ) -> Tuple[LatencySummary, Dict[str, LatencySummary]]:
+        """Merged step and per-tool summaries over the recent window
+
+        Args:
+            seconds: Window length, rounded up to whole slices; defaults to
+                the full retained window
+        """
+        slices = self.window_slices
+        if seconds is not None:
+            slices = min(slices, max(1, math.ceil(seconds / self.slice_seconds)))
+        with self._lock:
+            oldest = int(self._clock() // self.slice_seconds) - slices + 1
+            steps = LatencySummary()
+            tools: Dict[str, LatencySummary] = {}
+            for number, step_summary, tool_summaries in self._slices:
+                if number < oldest:
+                    continue
+                steps.merge(step_summary)
+                for name, summary in tool_summaries.items():
+                    tools.setdefault(name, LatencySummary()).merge(summary)
+        return steps, tools
+
+    def merge(self, other: "MetricsStore") -> None:
+        """Fold another store's metrics into this one"""
+        # Copy under the other store's lock, then fold in under ours
+        other_steps, other_tools, other_slices = LatencySummary(), {}, []
+        with other._lock:  # pylint: disable=protected-access
+            other_steps.merge(other.steps)
+            for name, summary in other.tools.items():
+                other_tools[name] = _copy(summary)
+            for number, step_summary, tool_summaries in other._slices:
+                other_slices.append(
+                    (
+                        number,
+                        _copy(step_summary),
+                        {name: _copy(s) for name, s in tool_summaries.items()},
+                    )
+                )
+            other_usage = other.tool_usage_count
+        with self._lock:
+            self.steps.merge(other_steps)
+            self.tool_usage_count += other_usage
+            for name, summary in other_tools.items():
+                self.tools.setdefault(name, LatencySummary()).merge(summary)
+            merged = {number: (s, t) for number, s, t in self._slices}
+            for number, step_summary, tool_summaries in other_slices:
+                steps, tools = merged.setdefault(number, (LatencySummary(), {}))
+                steps.merge(step_summary)
+                for name, summary in tool_summaries.items():
+                    tools.setdefault(name, LatencySummary()).merge(summary)
+            self._slices = deque(
+                ((number, *merged[number]) for number in sorted(merged)),
+                maxlen=self.window_slices,
+            )
+            # The cached slice may have been replaced by a merged one
+            self._slice_start, self._slice_end = math.inf, -math.inf
+
+
+def merge_metrics(stores: Iterable[MetricsStore]) -> MetricsStore:
+    """Combine the metrics of many agents into a new store"""
+    stores = list(stores)
+    combined = MetricsStore(
+        slice_seconds=stores[0].slice_seconds if stores else 10.0,
+        window_slices=max((s.window_slices for s in stores), default=30),
+    )
+    for store in stores:
+        combined.merge(store)
+    return combined
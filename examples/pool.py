@@ -0,0 +1,137 @@
+"""Bounded pool of reusable tool instances and the shared tool executor"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class _ToolSlot:
+    """Idle instances and bookkeeping for one tool class"""
+
+    def __init__(self, lock: threading.Lock):
+        self.idle: List[Any] = []
+        self.created = 0
+        self.closed = False
+        self.available = threading.Condition(lock)
+
+
+class ToolPool:
+    """Pool of set-up tool instances shared by the threads of one agent
+
+    Each tool class gets up to ``max_instances`` live instances. An instance
+    is created and ``setup()`` lazily the first time it is needed, checked
+    out by one caller at a time, and returned to the pool afterwards, so a
+    tool pays its initialization cost once per agent rather than once per
+    message. When all instances of a class are checked out, further callers
+    wait for one to be released. ``teardown()`` runs when the tool is
+    discarded or the pool is closed.
+    """
+
+    def __init__(self, max_instances: int = 4):
+        if max_instances < 1:
+            raise ValueError("max_instances must be at least 1")
+        self.max_instances = max_instances
+        self._lock = threading.Lock()
+        self._slots: Dict[Any, _ToolSlot] = {}
+        self._checked_out: Dict[int, _ToolSlot] = {}
+
+    def _slot(self, tool_cls: Any) -> _ToolSlot:
+        slot = self._slots.get(tool_cls)
+        if slot is None:
+            slot = self._slots[tool_cls] = _ToolSlot(self._lock)
+        return slot
+
+    def acquire(self, tool_cls: Any) -> Any:
+        """Check out an instance of ``tool_cls``, creating it if needed"""
+        with self._lock:
+            while True:
+                slot = self._slot(tool_cls)
+                if slot.idle:
+                    instance = slot.idle.pop()
+                    self._checked_out[id(instance)] = slot
+                    return instance
+                if slot.created < self.max_instances:
+                    slot.created += 1
+                    break
+                slot.available.wait()
+        try:
+            instance = tool_cls()
+            instance.setup()
+        except BaseException:
+            with self._lock:
+                slot.created -= 1
+                slot.available.notify()
+            raise
+        with self._lock:
+            self._checked_out[id(instance)] = slot
+        return instance
+
+    def try_acquire(self, tool_cls: Any) -> Optional[Any]:
+        """Check out an instance without waiting, or return None if exhausted"""
+        with self._lock:
+            slot = self._slot(tool_cls)
+            if slot.idle:
+                instance = slot.idle.pop()
+                self._checked_out[id(instance)] = slot
+                return instance
+            if slot.created >= self.max_instances:
+                return None
+        return self.acquire(tool_cls)
+
+    def release(self, instance: Any) -> None:
+        """Return a checked-out instance to the pool"""
+        with self._lock:
+            slot = self._checked_out.pop(id(instance))
+            if not slot.closed:
+                slot.idle.append(instance)
+                slot.available.notify()
+                return
+        instance.teardown()
+
+    @contextmanager
+    def checkout(self, tool_cls: Any) -> Iterator[Any]:
+        """Context manager yielding a pooled instance of ``tool_cls``"""
+        instance = self.acquire(tool_cls)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def discard(self, tool_cls: Any) -> None:
+        """Tear down idle instances of ``tool_cls`` and stop pooling it
+
+        Instances still checked out are torn down when they are released.
+        """
+        with self._lock:
+            slot = self._slots.pop(tool_cls, None)
+            if slot is None:
+                return
+            slot.closed = True
+            idle, slot.idle = slot.idle, []
+            slot.available.notify_all()
+        for instance in idle:
+            instance.teardown()
+
+    def close(self) -> None:
+        """Tear down every pooled instance"""
+        for tool_cls in list(self._slots):
+            self.discard(tool_cls)
+
+
+_shared_executor: Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Process-wide thread pool used to run matched tools concurrently
+
+    Created on first use, so processes that never run tools concurrently
+    start no tool threads.
+    """
+    global _shared_executor  # pylint: disable=global-statement
+    if _shared_executor is None:
+        with _shared_executor_lock:
+            if _shared_executor is None:
+                _shared_executor = ThreadPoolExecutor(thread_name_prefix="tool")
+    return _shared_executor
@@ -0,0 +1,382 @@
+"""Cross-process memory sharing over a local Unix socket
+
+``MemoryServer`` exposes one ChatHistoryMemory on a Unix domain socket,
+standing in for a remote conversation store. ``RemoteChatHistoryMemory``
+is a drop-in memory for ChatAgent that forwards writes to the server and
+caches the window by version, so agents in different processes (and on
+different cores) append to and read one shared conversation.
+``ProcessWorker`` runs a delegate agent in its own process so delegation
+fans out across cores as well.
+
+The wire protocol is newline-delimited JSON; messages travel as
+``[role_name, content, role_type, optimization_phrase]`` lists.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from examples.demo_tool_usage import ChatAgent, ChatHistoryMemory, MessageWindow
+from examples.messages import BaseMessage
+from examples.storage import StoredHistory
+
+# Memory settings a RemoteChatHistoryMemory mirrors from the server
+_SETTINGS = (
+    "window_size",
+    "max_chars",
+    "max_tokens",
+    "compact",
+    "search_limit",
+)
+
+
+def _encode(message: BaseMessage) -> list:
+    return [
+        message.role_name,
+        message.content,
+        message.role_type,
+        message.optimization_phrase,
+    ]
+
+
+def _decode(fields: list) -> BaseMessage:
+    return BaseMessage(*fields)
+
+
+def unlink_stale_socket(path: str) -> None:
+    """Remove a stale socket at ``path``, refusing to delete anything else
+
+    Shared by the memory server and ``examples.server``; raises
+    ``FileExistsError`` when ``path`` is not a socket.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    os.unlink(path)
+
+
+class _MemoryRequestHandler(socketserver.StreamRequestHandler):
+    """Serve requests from one client connection until it closes"""
+
+    def handle(self) -> None:
+        memory: ChatHistoryMemory = self.server.memory
+        for line in self.rfile:
+            try:
+                reply = self._dispatch(memory, json.loads(line))
+            except Exception as e:  # pylint: disable=broad-except
+                reply = {"error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    @staticmethod
+    def _dispatch(memory: ChatHistoryMemory, request: Dict[str, Any]) -> dict:
+        op = request["op"]
+        if op == "add":
+            memory.add_messages(_decode(fields) for fields in request["messages"])
+            return {"version": memory.snapshot()[0]}
+        if op == "snapshot":
+            version, window, summary = memory.snapshot()
+            if version == request.get("version"):
+                return {"version": version}
+            return {
+                "version": version,
+                "messages": [_encode(m) for m in window],
+                "summary": summary,
+            }
+        if op == "search":
+            results = memory.search(request["query"], request.get("k", 5))
+            return {"messages": [_encode(m) for m in results]}
+        if op == "history":
+            history = memory.history
+            page = history[request["start"] : request["stop"]]
+            return {"total": len(history), "messages": [_encode(m) for m in page]}
+        if op == "settings":
+            return {name: getattr(memory, name) for name in _SETTINGS}
+        if op == "tokens":
+            return {"tokens": memory.tokenizer(request["text"])}
+        if op == "filter":
+            filtered = memory.filter_message(_decode(request["message"]))
+            return {"message": None if filtered is None else _encode(filtered)}
+        if op == "flush":
+            memory.flush()
+            return {}
+        raise ValueError(f"Unknown operation {op!r}")
+
+
+class MemoryServer(socketserver.ThreadingUnixStreamServer):
+    """Serve ``memory`` on the Unix socket at ``path``
+
+    Each client connection gets its own thread; the memory's own locking
+    makes concurrent writes safe. The socket file is created owner-only.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, memory: ChatHistoryMemory, path: str):
+        self.memory = memory
+        self.path = path
+        unlink_stale_socket(path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, _MemoryRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MemoryServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="memory-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop serving and remove the socket file"""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        try:
+            unlink_stale_socket(self.path)
+        except FileExistsError:
+            pass  # Replaced since start; not ours to remove
+
+    def __enter__(self) -> "MemoryServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RemoteChatHistoryMemory:
+    """ChatHistoryMemory stand-in backed by a ``MemoryServer``
+
+    Connections are opened lazily, one per thread, so an instance can be
+    shared by threads and pickled into worker processes (only the socket
+    path is pickled). Filtering, summarization and eviction happen on the
+    server. ``messages`` refetches the window only when the server's
+    version changed since the last read by this thread; ``history`` pages
+    the server's full history in on demand. The window budgets are read
+    from the server once, and ``tokenizer`` counts on the server.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._settings: Optional[Dict[str, Any]] = None
+
+    def __getstate__(self) -> dict:
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"])
+
+    def _connection(self):
+        stream = getattr(self._local, "stream", None)
+        if stream is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+            stream = self._local.stream = sock.makefile("rwb")
+            self._local.socket = sock
+        return stream
+
+    def _request(self, **request: Any) -> dict:
+        stream = self._connection()
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+        if not line:
+            self.close()
+            raise ConnectionError(f"Memory server at {self.path} disconnected")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Memory server error: {reply['error']}")
+        return reply
+
+    def _setting(self, name: str) -> Any:
+        if self._settings is None:
+            self._settings = self._request(op="settings")
+        return self._settings[name]
+
+    @property
+    def window_size(self) -> Optional[int]:
+        """Message count bound of the server's window"""
+        return self._setting("window_size")
+
+    @property
+    def max_chars(self) -> Optional[int]:
+        """Character bound of the server's window"""
+        return self._setting("max_chars")
+
+    @property
+    def max_tokens(self) -> Optional[int]:
+        """Token bound of the server's window"""
+        return self._setting("max_tokens")
+
+    @property
+    def compact(self) -> bool:
+        """Whether the server folds evicted messages into the summary"""
+        return self._setting("compact")
+
+    @property
+    def search_limit(self) -> Optional[int]:
+        """Newest stored messages the server's search covers"""
+        return self._setting("search_limit")
+
+    @property
+    def summary(self) -> Optional[str]:
+        """Rolling summary of the messages evicted on the server"""
+        return self.snapshot()[2]
+
+    @property
+    def tokenizer(self) -> Callable[[str], int]:
+        """The server memory's tokenizer, run on the server"""
+        return self.count_tokens
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens in ``text`` as the server memory counts them"""
+        return self._request(op="tokens", text=text)["tokens"]
+
+    @property
+    def history(self) -> Sequence[BaseMessage]:
+        """Every message the server stored, oldest first, paged on demand"""
+        return StoredHistory(_RemoteHistory(self))
+
+    def filter_message(self, message: BaseMessage) -> Optional[BaseMessage]:
+        """The message as the server would store it, or None"""
+        reply = self._request(op="filter", message=_encode(message))
+        return None if reply["message"] is None else _decode(reply["message"])
+
+    def should_store(self, message: BaseMessage) -> bool:
+        """Determine if the server would store the message"""
+        return self.filter_message(message) is not None
+
+    def flush(self) -> None:
+        """Commit messages the server's storage backend is still buffering"""
+        self._request(op="flush")
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Append a message to the shared memory"""
+        self._request(op="add", messages=[_encode(message)])
+
+    def add_messages(self, messages: Iterable[BaseMessage]) -> None:
+        """Append several messages in one round trip"""
+        self._request(op="add", messages=[_encode(m) for m in messages])
+
+    async def aadd_message(self, message: BaseMessage) -> None:
+        """Append a message without blocking the event loop"""
+        await asyncio.to_thread(self.add_message, message)
+
+    def snapshot(self) -> tuple:
+        """(version, window, summary) of the shared memory"""
+        cached = getattr(self._local, "snapshot", None)
+        reply = self._request(
+            op="snapshot", version=cached[0] if cached is not None else None
+        )
+        if "messages" in reply:
+            cached = (
+                reply["version"],
+                tuple(_decode(fields) for fields in reply["messages"]),
+                reply["summary"],
+            )
+            self._local.snapshot = cached
+        return cached
+
+    @property
+    def messages(self) -> MessageWindow:
+        """Snapshot of the shared window, oldest first"""
+        return MessageWindow(self.snapshot()[1])
+
+    @property
+    def context(self) -> List[BaseMessage]:
+        """Rolling summary (as a system message) followed by the window"""
+        _, window, summary = self.snapshot()
+        if summary is None:
+            return list(window)
+        return [BaseMessage("System", summary, "system"), *window]
+
+    def search(self, query: str, k: int = 5) -> List[BaseMessage]:
+        """Server-side relevance search over the shared memory"""
+        reply = self._request(op="search", query=query, k=k)
+        return [_decode(fields) for fields in reply["messages"]]
+
+    def close(self) -> None:
+        """Close this thread's connection to the server"""
+        stream = getattr(self._local, "stream", None)
+        if stream is not None:
+            stream.close()
+            self._local.socket.close()
+            self._local.stream = None
+
+
+class _RemoteHistory:
+    """The storage interface ``StoredHistory`` pages through, over the wire"""
+
+    def __init__(self, memory: RemoteChatHistoryMemory):
+        self._memory = memory
+
+    # pylint: disable=protected-access
+    def __len__(self) -> int:
+        return self._memory._request(op="history", start=0, stop=0)["total"]
+
+    def read(self, start: int, stop: int) -> List[BaseMessage]:
+        """Messages ``start`` to ``stop`` (exclusive) of the history"""
+        reply = self._memory._request(op="history", start=start, stop=stop)
+        return [_decode(fields) for fields in reply["messages"]]
+
+
+# Agent owned by a ProcessWorker's child process
+_worker_agent: Optional[ChatAgent] = None
+
+
+def _init_worker(factory: Callable[[], ChatAgent]) -> None:
+    global _worker_agent  # pylint: disable=global-statement
+    _worker_agent = factory()
+
+
+def _worker_step(message: BaseMessage) -> BaseMessage:
+    return _worker_agent.step(message)
+
+
+class ProcessWorker:
+    """Delegate worker whose agent lives in a dedicated process
+
+    ``factory`` must be picklable (e.g. a module-level function or a
+    ``functools.partial`` of one) and builds the agent in the child; give
+    it a RemoteChatHistoryMemory to share the conversation. Exposes the
+    ``step``/``astep`` interface DelegationScheduler expects, so broadcast
+    delegation to several ProcessWorkers runs on several cores.
+    """
+
+    def __init__(self, factory: Callable[[], ChatAgent], mp_context=None):
+        self._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(factory,),
+        )
+
+    def step(self, message: BaseMessage) -> BaseMessage:
+        """Run one step in the worker process"""
+        return self._executor.submit(_worker_step, message).result()
+
+    async def astep(self, message: BaseMessage) -> BaseMessage:
+        """Awaitable ``step``"""
+        return await asyncio.wrap_future(
+            self._executor.submit(_worker_step, message)
+        )
+
+    def close(self) -> None:
+        """Stop the worker process"""
+        self._executor.shutdown()
@@ -0,0 +1,176 @@
+"""Incremental relevance search over conversation memory
+
+``MessageIndex`` is an inverted index from terms to postings, each
+posting a (message position, weight) pair held in ``array`` buffers. New
+positions only ever grow, so postings stay sorted and adding a message is
+an append per distinct term. Removed messages are tombstoned and purged
+from the postings once they outnumber the live ones.
+
+Scoring is cosine TF-IDF in the SMART lnc.ltc scheme: document weights
+``1 + log(tf)`` are normalized per message when it is indexed and never
+change, while IDF is applied on the query side from live document
+frequencies, so the index needs no rebuild as the corpus grows. A query
+only touches the postings of its own terms; with NumPy installed they are
+scored as zero-copy array views, otherwise in pure Python.
+"""
+
+# numpy is optional and only imported once a MessageIndex is created
+# pylint: disable=import-outside-toplevel
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+_TOKEN = re.compile(r"\w\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of at least two characters"""
+    return _TOKEN.findall(text.lower())
+
+
+def _load_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _Postings:
+    """Positions and weights of the messages containing one term"""
+
+    __slots__ = ("positions", "weights", "live")
+
+    def __init__(self):
+        self.positions = array("q")
+        self.weights = array("d")
+        self.live = 0
+
+
+class MessageIndex:
+    """Inverted TF-IDF index keyed by message position
+
+    Args:
+        use_numpy: Score with NumPy if it is installed; False forces the
+            pure-Python scorer
+    """
+
+    def __init__(self, use_numpy: bool = True):
+        self._postings: Dict[str, _Postings] = {}
+        # Distinct terms of every live message, needed to remove it
+        self._terms: Dict[int, Tuple[str, ...]] = {}
+        self._deleted: Set[int] = set()
+        self._numpy = _load_numpy() if use_numpy else None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, position: int) -> bool:
+        return position in self._terms
+
+    def add(self, position: int, text: str) -> None:
+        """Index a message; positions must increase with every call"""
+        counts = Counter(tokenize(text))
+        self._terms[position] = tuple(counts)
+        if not counts:
+            return
+        weights = {term: 1.0 + math.log(tf) for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.positions.append(position)
+            postings.weights.append(weight / norm)
+            postings.live += 1
+
+    def remove(self, position: int) -> None:
+        """Drop a message from the results"""
+        terms = self._terms.pop(position, None)
+        if terms is None:
+            return
+        for term in terms:
+            self._postings[term].live -= 1
+        if terms:
+            self._deleted.add(position)
+            if len(self._deleted) > max(64, len(self._terms)):
+                self._purge()
+
+    def _purge(self) -> None:
+        deleted = self._deleted
+        for term in list(self._postings):
+            postings = self._postings[term]
+            if not postings.live:
+                del self._postings[term]
+                continue
+            kept = _Postings()
+            for position, weight in zip(postings.positions, postings.weights):
+                if position not in deleted:
+                    kept.positions.append(position)
+                    kept.weights.append(weight)
+            kept.live = postings.live
+            self._postings[term] = kept
+        self._deleted = set()
+
+    def _query_weights(self, query: str) -> List[Tuple[_Postings, float]]:
+        total = len(self._terms)
+        weighted = []
+        for term, tf in Counter(tokenize(query)).items():
+            postings = self._postings.get(term)
+            if postings is None or not postings.live:
+                continue
+            idf = math.log((total + 1) / (postings.live + 1)) + 1.0
+            weighted.append((postings, (1.0 + math.log(tf)) * idf))
+        return weighted
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top ``k`` (position, score) pairs, best first, newest on ties"""
+        weighted = self._query_weights(query)
+        if not weighted or k <= 0:
+            return []
+        if self._numpy is not None:
+            return self._search_numpy(weighted, k)
+        scores: Dict[int, float] = {}
+        for postings, query_weight in weighted:
+            for position, weight in zip(postings.positions, postings.weights):
+                scores[position] = scores.get(position, 0.0) + weight * query_weight
+        for position in self._deleted.intersection(scores):
+            del scores[position]
+        return heapq.nlargest(k, scores.items(), key=lambda item: (item[1], item[0]))
+
+    def _search_numpy(
+        self, weighted: List[Tuple[_Postings, float]], k: int
+    ) -> List[Tuple[int, float]]:
+        np = self._numpy
+        positions = np.concatenate(
+            [np.frombuffer(p.positions, dtype=np.int64) for p, _ in weighted]
+        )
+        weights = np.concatenate(
+            [np.frombuffer(p.weights, dtype=np.float64) * w for p, w in weighted]
+        )
+        unique, inverse = np.unique(positions, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        if self._deleted:
+            deleted = np.fromiter(self._deleted, np.int64, len(self._deleted))
+            live = ~np.isin(unique, deleted, assume_unique=True)
+            unique, scores = unique[live], scores[live]
+        if len(unique) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            unique, scores = unique[top], scores[top]
+        # Highest score first; equal scores favour the newest message
+        order = np.lexsort((-unique, -scores))
+        return [(int(unique[i]), float(scores[i])) for i in order]
+
+
+def build_index(
+    texts: Iterable[str], first_position: int = 0, use_numpy: bool = True
+) -> MessageIndex:
+    """Index ``texts`` numbered consecutively from ``first_position``"""
+    index = MessageIndex(use_numpy=use_numpy)
+    for position, text in enumerate(texts, first_position):
+        index.add(position, text)
+    return index
+
@@ -0,0 +1,498 @@
+"""Long-lived agent server with a warm session pool
+
+``camel-agent serve`` keeps agents alive between requests, so a message
+costs only its own step instead of interpreter startup plus
+``setup_tool_agent``. ``SessionPool`` maps session ids to warm agents; a
+few spare agents are built ahead of new sessions, sessions idle for
+``idle_timeout`` seconds are closed, and beyond ``max_sessions`` the least
+recently used idle session goes first.
+
+``AgentServer`` serves the pool on one event loop, either on a Unix
+socket speaking newline-delimited JSON (many requests per connection) or
+on localhost HTTP (``POST /message`` with a JSON body, answered with
+NDJSON; ``GET /health``). The socket is created owner-only; any local
+user can reach the HTTP port, so HTTP requests must carry the server's
+token as ``Authorization: Bearer <token>``. Plain requests await
+``astep``; streamed ones run ``step_stream`` on a worker thread. Requests
+to one session are handled in order, different sessions run concurrently.
+
+A request carries ``message``, and optionally ``session`` (default
+"default"), ``stream`` (send each tool result as it finishes) and
+``verbose`` (include the newest memory entry as ``reflection``). The
+reply is a ``{"chunk", "source"}`` record per streamed result followed by
+``{"response", "session", "latency_ms"}``, or an ``{"error"}`` record.
+``{"op": "end", "session": ...}`` closes a session. See
+``examples.client`` for the client side.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from time import monotonic, perf_counter
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from examples.demo_tool_usage import ChatAgent, setup_tool_agent
+from examples.messages import BaseMessage, StreamChunk
+from examples.remote_memory import unlink_stale_socket
+
+# Longest request line accepted, in bytes
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+class _Session:
+    """A warm agent and the bookkeeping needed to evict it safely"""
+
+    __slots__ = ("agent", "last_used", "lock", "active", "ended")
+
+    def __init__(self, agent: ChatAgent, now: float):
+        self.agent = agent
+        self.last_used = now
+        # Serializes steps so a session's messages keep their order
+        self.lock = asyncio.Lock()
+        self.active = 0
+        # Ended while a request was in flight; closed when the last finishes
+        self.ended = False
+
+
+class SessionPool:
+    """Warm agents keyed by session id
+
+    Not thread-safe: owned by the server's event loop.
+
+    Args:
+        factory: Builds the agent for a new session
+        idle_timeout: Seconds after its last request a session is closed
+        max_sessions: Sessions kept before the least recently used idle
+            ones are closed
+        warm: Spare agents kept built ahead of new sessions
+        clock: Time source, injectable for tests
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], ChatAgent] = setup_tool_agent,
+        idle_timeout: float = 600.0,
+        max_sessions: int = 1024,
+        warm: int = 1,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.warm = warm
+        self._clock = clock
+        # Least recently used first
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._spares: List[ChatAgent] = []
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+
+    @property
+    def spares(self) -> int:
+        """Number of prebuilt agents waiting for a session"""
+        return len(self._spares)
+
+    def get(self, session_id: str) -> _Session:
+        """The session's warm agent, created (from a spare) if needed"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            agent = self._spares.pop() if self._spares else self.factory()
+            return self._open(session_id, agent)
+        self._sessions.move_to_end(session_id)
+        session.last_used = self._clock()
+        return session
+
+    async def aget(self, session_id: str) -> _Session:
+        """``get`` for the event loop: agents are built on a worker thread
+
+        With no spare left, ``factory`` runs via ``asyncio.to_thread`` so
+        other sessions keep being served meanwhile.
+        """
+        if session_id not in self._sessions and not self._spares:
+            agent = await asyncio.to_thread(self.factory)
+            if session_id not in self._sessions:
+                return self._open(session_id, agent)
+            # Another request opened the session while the agent was built
+            self.add_spare(agent)
+        return self.get(session_id)
+
+    def _open(self, session_id: str, agent: ChatAgent) -> _Session:
+        session = self._sessions[session_id] = _Session(agent, self._clock())
+        self._evict_over_capacity(keep=session_id)
+        return session
+
+    def touch(self, session: _Session) -> None:
+        """Mark a session used now, e.g. when a request finishes"""
+        session.last_used = self._clock()
+
+    def release(self, session: _Session) -> None:
+        """Finish one request on a session
+
+        Closes the session's agent if the session was ended while the
+        request was in flight and no other request is still using it.
+        """
+        session.active -= 1
+        self.touch(session)
+        if session.ended and not session.active:
+            session.agent.close()
+
+    def add_spare(self, agent: ChatAgent) -> None:
+        """Keep a prebuilt agent for the next new session"""
+        if len(self._spares) < self.warm:
+            self._spares.append(agent)
+        else:
+            agent.close()
+
+    def evict_idle(self) -> int:
+        """Close sessions idle for ``idle_timeout``; returns how many"""
+        cutoff = self._clock() - self.idle_timeout
+        idle = [
+            session_id
+            for session_id, session in self._sessions.items()
+            if not session.active and session.last_used <= cutoff
+        ]
+        for session_id in idle:
+            self.end(session_id)
+        return len(idle)
+
+    def _evict_over_capacity(self, keep: str) -> None:
+        excess = len(self._sessions) - self.max_sessions
+        for session_id, session in list(self._sessions.items()):
+            if excess <= 0:
+                break
+            if not session.active and session_id != keep:
+                self.end(session_id)
+                excess -= 1
+
+    def end(self, session_id: str) -> bool:
+        """Close a session; False if there was none
+
+        A session with requests in flight leaves the pool at once, but its
+        agent is only closed by ``release`` when the last one finishes.
+        """
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        if session.active:
+            session.ended = True
+        else:
+            session.agent.close()
+        return True
+
+    def close(self) -> None:
+        """Close every session and spare agent"""
+        for session_id in list(self._sessions):
+            self.end(session_id)
+        while self._spares:
+            self._spares.pop().close()
+
+
+def _record(reply: Dict[str, Any]) -> bytes:
+    return json.dumps(reply).encode("utf-8") + b"\n"
+
+
+class AgentServer:
+    """Serve a ``SessionPool`` on a Unix socket or on localhost HTTP
+
+    Pass ``path`` for a Unix socket (created owner-only) or ``port`` for
+    HTTP on 127.0.0.1; port 0 picks a free port. HTTP requests must
+    present ``token``, generated when not given.
+    """
+
+    def __init__(
+        self,
+        pool: SessionPool,
+        path: Optional[str] = None,
+        port: Optional[int] = None,
+        sweep_interval: Optional[float] = None,
+        token: Optional[str] = None,
+    ):
+        if (path is None) == (port is None):
+            raise ValueError("Pass exactly one of path or port")
+        self.pool = pool
+        self.path = path
+        self.port = port
+        self.token = token
+        if port is not None and not token:
+            self.token = secrets.token_urlsafe(32)
+        self.sweep_interval = sweep_interval or max(1.0, pool.idle_timeout / 4)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def address(self) -> str:
+        """Socket path or ``http://127.0.0.1:<port>`` URL clients connect to"""
+        if self.path is not None:
+            return self.path
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening and build the spare agents"""
+        if self.path is not None:
+            unlink_stale_socket(self.path)
+            old_umask = os.umask(0o177)
+            try:
+                self._server = await asyncio.start_unix_server(
+                    self._serve_jsonl, self.path, limit=MAX_REQUEST_BYTES
+                )
+            finally:
+                os.umask(old_umask)
+        else:
+            self._server = await asyncio.start_server(
+                self._serve_http, "127.0.0.1", self.port, limit=MAX_REQUEST_BYTES
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        await self._refill()
+        self._tasks.append(asyncio.ensure_future(self._sweep()))
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled"""
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and close every session"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.pool.close()
+        if self.path is not None:
+            try:
+                unlink_stale_socket(self.path)
+            except FileExistsError:
+                pass  # Replaced since start; not ours to remove
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.pool.evict_idle()
+
+    async def _refill(self) -> None:
+        while self.pool.spares < self.pool.warm:
+            # Agent setup may touch disk; keep it off the event loop
+            self.pool.add_spare(await asyncio.to_thread(self.pool.factory))
+
+    async def handle(self, request: Dict[str, Any]) -> AsyncIterator[dict]:
+        """Reply records for one request"""
+        op = request.get("op", "step")
+        session_id = str(request.get("session") or "default")
+        if op == "end":
+            yield {"ended": self.pool.end(session_id), "session": session_id}
+            return
+        if op != "step":
+            raise ValueError(f"Unknown operation {op!r}")
+        text = request.get("message")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Missing message")
+
+        spares = self.pool.spares
+        session = await self.pool.aget(session_id)
+        if self.pool.spares < spares:
+            self._tasks.append(asyncio.ensure_future(self._refill()))
+            self._tasks = [task for task in self._tasks if not task.done()]
+        session.active += 1
+        try:
+            async with session.lock:
+                started = perf_counter()
+                message = BaseMessage.make_user_message("User", text)
+                if request.get("stream"):
+                    async for chunk in self._stream(session.agent, message):
+                        if chunk.final:
+                            response = chunk.message
+                        else:
+                            yield {"chunk": chunk.content, "source": chunk.source}
+                else:
+                    response = await session.agent.astep(message)
+                reply = {
+                    "response": response.content,
+                    "session": session_id,
+                    "latency_ms": round((perf_counter() - started) * 1000, 3),
+                }
+                if request.get("verbose"):
+                    reply["reflection"] = session.agent.memory.messages[-1].content
+                yield reply
+        finally:
+            self.pool.release(session)
+
+    @staticmethod
+    async def _stream(
+        agent: ChatAgent, message: BaseMessage
+    ) -> AsyncIterator[StreamChunk]:
+        """Run ``step_stream`` on a worker thread, relaying its chunks"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def produce() -> None:
+            try:
+                for chunk in agent.step_stream(message):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as e:  # pylint: disable=broad-except
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await producer
+
+    async def _reply(self, request: Any, writer: asyncio.StreamWriter) -> None:
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            async for reply in self.handle(request):
+                writer.write(_record(reply))
+                await writer.drain()
+        except Exception as e:  # pylint: disable=broad-except
+            writer.write(_record({"error": f"{type(e).__name__}: {e}"}))
+            await writer.drain()
+
+    async def _serve_jsonl(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    writer.write(_record({"error": f"Invalid JSON: {e.msg}"}))
+                    await writer.drain()
+                    continue
+                await self._reply(request, writer)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[str, Optional[Any]]:
+        """HTTP status and, for accepted messages, the decoded request"""
+        if method == "GET" and target == "/health":
+            return "200 OK", None
+        if method != "POST" or target != "/message":
+            return "404 Not Found", None
+        # Browsers can POST to localhost from any page; requiring JSON
+        # forces a CORS preflight, which this server never answers
+        if "origin" in headers or not headers.get("content-type", "").startswith(
+            "application/json"
+        ):
+            return "403 Forbidden", None
+        authorization = headers.get("authorization", "").encode("latin-1")
+        if not hmac.compare_digest(authorization, f"Bearer {self.token}".encode()):
+            return "401 Unauthorized", None
+        try:
+            return "200 OK", json.loads(body)
+        except json.JSONDecodeError:
+            return "400 Bad Request", None
+
+    async def _serve_http(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            method, target, _ = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if not 0 <= length <= MAX_REQUEST_BYTES:
+                status, request = "413 Content Too Large", None
+            else:
+                body = await reader.readexactly(length)
+                status, request = self._route(method, target, headers, body)
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        try:
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: application/x-ndjson\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+            )
+            if request is not None:
+                await self._reply(request, writer)
+            elif status == "200 OK":
+                writer.write(_record({"sessions": len(self.pool)}))
+            else:
+                writer.write(_record({"error": status}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class ServerThread:
+    """Run an ``AgentServer`` on an event loop in a background thread"""
+
+    def __init__(self, server: AgentServer):
+        self.server = server
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="agent-server", daemon=True
+        )
+
+    def start(self) -> "ServerThread":
+        """Start serving; returns once the server accepts connections"""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self
+
+    def close(self) -> None:
+        """Stop the server and its loop"""
+        asyncio.run_coroutine_threadsafe(self.server.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "ServerThread":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_server(
+    server: AgentServer, ready: Optional[Callable[[str], None]] = None
+) -> None:
+    """Serve in the foreground until interrupted
+
+    ``ready`` is called with the server's address once it is listening.
+    """
+
+    async def serve() -> None:
+        await server.start()
+        try:
+            if ready is not None:
+                ready(server.address)
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
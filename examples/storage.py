@@ -0,0 +1,411 @@
+"""Persistent storage backends for ChatHistoryMemory
+
+A memory with a backend keeps only its window in RAM; every stored
+message is also appended to the backend, and older messages are paged
+back in on demand through ``StoredHistory``. Backends buffer appends and
+commit them in groups, so persistence costs one write (and one fsync)
+per ``group_size`` messages rather than per message. Messages still in
+the buffer are visible to reads but are lost if the process dies before
+the next commit; call ``flush`` for a durability point.
+
+Backends:
+    AppendOnlyLog: segment files of CRC-checked records read through mmap;
+        a torn tail left by a crash is truncated away on open
+    SQLiteStorage: one SQLite table in WAL mode
+"""
+
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from time import monotonic
+from typing import Dict, Iterable, List, Tuple
+
+from examples.messages import BaseMessage
+
+# Record header: payload length, CRC32 of the payload
+_RECORD = struct.Struct("<II")
+# Payload header: byte lengths of role_name, role_type, optimization_phrase
+# (plus one, 0 meaning None) and content, followed by the four strings
+_FIELDS = struct.Struct("<IIII")
+
+
+def encode_message(message: BaseMessage) -> bytes:
+    """Serialize a message into one length-prefixed, checksummed record"""
+    role_name = message.role_name.encode("utf-8")
+    role_type = message.role_type.encode("utf-8")
+    phrase = message.optimization_phrase
+    phrase_bytes = b"" if phrase is None else phrase.encode("utf-8")
+    content = message.content.encode("utf-8")
+    payload = b"".join(
+        (
+            _FIELDS.pack(
+                len(role_name),
+                len(role_type),
+                0 if phrase is None else len(phrase_bytes) + 1,
+                len(content),
+            ),
+            role_name,
+            role_type,
+            phrase_bytes,
+            content,
+        )
+    )
+    return _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_message(payload: bytes) -> BaseMessage:
+    """Inverse of ``encode_message`` for a record's payload"""
+    name_len, type_len, phrase_len, content_len = _FIELDS.unpack_from(payload)
+    pos = _FIELDS.size
+    role_name = payload[pos : pos + name_len].decode("utf-8")
+    pos += name_len
+    role_type = payload[pos : pos + type_len].decode("utf-8")
+    pos += type_len
+    phrase = None
+    if phrase_len:
+        phrase = payload[pos : pos + phrase_len - 1].decode("utf-8")
+        pos += phrase_len - 1
+    content = payload[pos : pos + content_len].decode("utf-8")
+    return BaseMessage(role_name, content, role_type, phrase)
+
+
+class StorageBackend:
+    """Group-committing message store; subclasses implement the I/O
+
+    Subclasses provide ``_commit(messages)``, ``_stored_count()`` and
+    ``_read_stored(start, stop)``. Appends are buffered until
+    ``group_size`` messages are pending or ``commit_interval`` seconds
+    have passed since the last commit (checked on append).
+    """
+
+    def __init__(self, group_size: int = 64, commit_interval: float = 1.0):
+        self.group_size = group_size
+        self.commit_interval = commit_interval
+        self._lock = threading.RLock()
+        self._pending: List[BaseMessage] = []
+        self._last_commit = monotonic()
+
+    def append(self, message: BaseMessage) -> None:
+        """Buffer one message, committing the group when it is due"""
+        with self._lock:
+            self._pending.append(message)
+            self._maybe_commit()
+
+    def extend(self, messages: Iterable[BaseMessage]) -> None:
+        """Buffer several messages, committing at most once"""
+        with self._lock:
+            self._pending.extend(messages)
+            self._maybe_commit()
+
+    def _maybe_commit(self) -> None:
+        if (
+            len(self._pending) >= self.group_size
+            or monotonic() - self._last_commit >= self.commit_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Commit every pending message"""
+        with self._lock:
+            if self._pending:
+                self._commit(self._pending)
+                self._pending = []
+            self._last_commit = monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stored_count() + len(self._pending)
+
+    def read(self, start: int, stop: int) -> List[BaseMessage]:
+        """Messages ``start`` to ``stop`` (exclusive), oldest first"""
+        with self._lock:
+            stored = self._stored_count()
+            start, stop = max(0, start), min(stop, stored + len(self._pending))
+            if start >= stop:
+                return []
+            messages = []
+            if start < stored:
+                messages = self._read_stored(start, min(stop, stored))
+            if stop > stored:
+                messages.extend(self._pending[max(0, start - stored) : stop - stored])
+            return messages
+
+    def tail(self, count: int) -> List[BaseMessage]:
+        """The newest ``count`` messages, oldest first"""
+        total = len(self)
+        return self.read(max(0, total - count), total)
+
+    def close(self) -> None:
+        """Commit pending messages and release resources"""
+        self.flush()
+
+    def _commit(self, messages: List[BaseMessage]) -> None:
+        raise NotImplementedError
+
+    def _stored_count(self) -> int:
+        raise NotImplementedError
+
+    def _read_stored(self, start: int, stop: int) -> List[BaseMessage]:
+        raise NotImplementedError
+
+
+class AppendOnlyLog(StorageBackend):
+    """Crash-safe append-only log split into segment files
+
+    Each commit writes all pending records to the active segment in one
+    ``write`` (repeated for the rest after a short write), followed by an
+    ``fsync`` when ``sync`` is set; records are indexed only once they are
+    fully written, and a failed commit is cut off the segment again.
+    Segments roll over at ``segment_bytes``. On open every segment is scanned to rebuild
+    the record index; a truncated or corrupt tail of the last segment (a
+    commit interrupted by a crash) is cut off, while corruption anywhere
+    else raises ``ValueError``.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 << 20,
+        group_size: int = 64,
+        commit_interval: float = 1.0,
+        sync: bool = True,
+    ):
+        super().__init__(group_size=group_size, commit_interval=commit_interval)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.sync = sync
+        os.makedirs(directory, exist_ok=True)
+        # Per segment: path and the offset of every record in it
+        self._paths: List[str] = []
+        self._offsets: List[array] = []
+        # Index of the first message in each segment
+        self._starts: List[int] = []
+        self._count = 0
+        self._maps: Dict[int, mmap.mmap] = {}
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".log"))
+        for position, name in enumerate(names):
+            self._load_segment(
+                os.path.join(directory, name), last=position == len(names) - 1
+            )
+        if not self._paths:
+            self._add_segment()
+        self._fd = os.open(self._paths[-1], os.O_WRONLY | os.O_APPEND)
+        self._size = os.path.getsize(self._paths[-1])
+
+    def _load_segment(self, path: str, last: bool) -> None:
+        offsets = array("Q")
+        size = os.path.getsize(path)
+        offset = 0
+        if size:
+            with open(path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                while offset + _RECORD.size <= size:
+                    length, crc = _RECORD.unpack_from(data, offset)
+                    body = offset + _RECORD.size
+                    end = body + length
+                    if end > size or zlib.crc32(data[body:end]) != crc:
+                        break
+                    offsets.append(offset)
+                    offset = end
+        if offset != size:
+            if not last:
+                raise ValueError(f"Corrupt record at {path}:{offset}")
+            os.truncate(path, offset)
+        self._paths.append(path)
+        self._offsets.append(offsets)
+        self._starts.append(self._count)
+        self._count += len(offsets)
+
+    def _add_segment(self) -> None:
+        path = os.path.join(self.directory, f"{len(self._paths):08d}.log")
+        with open(path, "ab"):
+            pass
+        self._paths.append(path)
+        self._offsets.append(array("Q"))
+        self._starts.append(self._count)
+
+    def _commit(self, messages: List[BaseMessage]) -> None:
+        records = [encode_message(message) for message in messages]
+        batch_size = sum(len(record) for record in records)
+        if self._size and self._size + batch_size > self.segment_bytes:
+            os.close(self._fd)
+            self._add_segment()
+            self._fd = os.open(self._paths[-1], os.O_WRONLY | os.O_APPEND)
+            self._size = 0
+        data = memoryview(b"".join(records))
+        try:
+            while data:
+                data = data[os.write(self._fd, data) :]
+            if self.sync:
+                os.fsync(self._fd)
+        except OSError:
+            # Drop the partial batch so the next commit starts at _size
+            os.ftruncate(self._fd, self._size)
+            raise
+        offsets = self._offsets[-1]
+        offset = self._size
+        for record in records:
+            offsets.append(offset)
+            offset += len(record)
+        self._size = offset
+        self._count += len(records)
+
+    def _stored_count(self) -> int:
+        return self._count
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        data = self._maps.get(segment)
+        if data is None or len(data) < end:
+            # The active segment grows, so its mapping is renewed as needed
+            if data is not None:
+                data.close()
+            with open(self._paths[segment], "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = data
+        return data
+
+    def _read_stored(self, start: int, stop: int) -> List[BaseMessage]:
+        messages = []
+        index = start
+        segment = bisect_right(self._starts, start) - 1
+        while index < stop:
+            offsets = self._offsets[segment]
+            first = index - self._starts[segment]
+            last = min(len(offsets), stop - self._starts[segment])
+            if first < last:
+                data = self._map(segment, self._segment_end(segment, last))
+                for offset in offsets[first:last]:
+                    length, _ = _RECORD.unpack_from(data, offset)
+                    body = offset + _RECORD.size
+                    messages.append(decode_message(data[body : body + length]))
+                index += last - first
+            segment += 1
+        return messages
+
+    def _segment_end(self, segment: int, last: int) -> int:
+        """Byte offset just past record ``last - 1`` of ``segment``"""
+        offsets = self._offsets[segment]
+        if last < len(offsets):
+            return offsets[last]
+        if segment == len(self._offsets) - 1:
+            return self._size
+        return os.path.getsize(self._paths[segment])
+
+    def close(self) -> None:
+        """Commit pending messages, then close the file and mappings"""
+        with self._lock:
+            self.flush()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            for data in self._maps.values():
+                data.close()
+            self._maps.clear()
+
+
+class SQLiteStorage(StorageBackend):
+    """Messages stored in one SQLite table, committed in groups"""
+
+    def __init__(
+        self,
+        path: str,
+        group_size: int = 64,
+        commit_interval: float = 1.0,
+        synchronous: str = "NORMAL",
+    ):
+        super().__init__(group_size=group_size, commit_interval=commit_interval)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={synchronous}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " id INTEGER PRIMARY KEY,"
+            " role_name TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " role_type TEXT NOT NULL,"
+            " optimization_phrase TEXT)"
+        )
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def _commit(self, messages: List[BaseMessage]) -> None:
+        rows = [
+            (
+                self._count + i + 1,
+                m.role_name,
+                m.content,
+                m.role_type,
+                m.optimization_phrase,
+            )
+            for i, m in enumerate(messages)
+        ]
+        with self._db:
+            self._db.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?)", rows)
+        self._count += len(rows)
+
+    def _stored_count(self) -> int:
+        return self._count
+
+    def _read_stored(self, start: int, stop: int) -> List[BaseMessage]:
+        rows = self._db.execute(
+            "SELECT role_name, content, role_type, optimization_phrase"
+            " FROM messages WHERE id > ? AND id <= ? ORDER BY id",
+            (start, stop),
+        )
+        return [BaseMessage(*row) for row in rows]
+
+    def close(self) -> None:
+        """Commit pending messages and close the database"""
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+
+class StoredHistory(Sequence):
+    """Read-only view of a backend's full history, paged in on demand
+
+    Reads fetch whole pages of ``page_size`` messages and keep the most
+    recently used page, so scanning the history sequentially costs one
+    backend read per page.
+    """
+
+    def __init__(self, storage: StorageBackend, page_size: int = 256):
+        self._storage = storage
+        self._page_size = page_size
+        self._page: Tuple[int, List[BaseMessage]] = (-1, [])
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    def __getitem__(self, index):
+        total = len(self._storage)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(total)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._storage.read(start, stop)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("history index out of range")
+        number = index // self._page_size
+        page_number, page = self._page
+        offset = index - number * self._page_size
+        if page_number != number or offset >= len(page):
+            start = number * self._page_size
+            page = self._storage.read(start, start + self._page_size)
+            self._page = (number, page)
+        return page[offset]
+
+    def __iter__(self):
+        total = len(self._storage)
+        for start in range(0, total, self._page_size):
+            yield from self._storage.read(start, min(total, start + self._page_size))
@@ -0,0 +1,109 @@
+"""Summaries for ChatHistoryMemory
+
+A summarizer turns text into short summaries in two situations:
+
+    summarize(text): a message tagged ``[SUMMARIZE]`` is stored as a
+        short summary instead of verbatim
+    fold(summary, messages): in compaction mode, messages evicted from
+        the window are folded into a rolling summary of older context
+
+Any object with these two methods can be passed to ChatHistoryMemory, for
+example one calling a language model. ``KeywordSummarizer`` is the local,
+deterministic default.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from examples.messages import BaseMessage
+
+SUMMARIZE_TAG = "[SUMMARIZE]"
+
+_TERM = re.compile(r"[a-z0-9][a-z0-9_'-]{2,}")
+_STOPWORDS = frozenset(
+    "the and for are but not you your with this that have from they will"
+    " would there their what about which when were been has had was can"
+    " could should into than then them these those its our out all any"
+    " please just also very some summary words".split()
+)
+
+
+class KeywordSummarizer:
+    """Deterministic extractive summarizer based on term frequency
+
+    Summaries list the most frequent non-stopword terms, ties broken by
+    first occurrence. When folding, the summarizer keeps the weights
+    behind its last summary and scales them by ``decay`` per folded
+    message, so older context persists for a while but recent evictions
+    push it out. Only the ``max_terms * 4`` heaviest terms are kept. A
+    summary it did not produce itself (another memory's, or one restored
+    from a snapshot) is picked up by counting its terms ``carry`` times.
+    """
+
+    def __init__(
+        self,
+        max_chars: int = 48,
+        max_summary_chars: int = 240,
+        max_terms: int = 12,
+        carry: int = 2,
+        decay: float = 0.9,
+    ):
+        self.max_chars = max_chars
+        self.max_summary_chars = max_summary_chars
+        self.max_terms = max_terms
+        self.carry = carry
+        self.decay = decay
+        # (last summary returned by fold, term weights behind it), swapped
+        # as one value so memories sharing the summarizer never mix them
+        self._last: Tuple[Optional[str], Dict[str, float]] = (None, {})
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return [t for t in _TERM.findall(text.lower()) if t not in _STOPWORDS]
+
+    @staticmethod
+    def _top(counts: Counter, limit: int) -> List[str]:
+        # Counter preserves insertion order, so ties go to the earliest term
+        return [term for term, _ in counts.most_common(limit)]
+
+    @staticmethod
+    def _fit(prefix: str, terms: List[str], suffix: str, limit: int, sep: str) -> str:
+        while terms and len(prefix) + len(sep.join(terms)) + len(suffix) > limit:
+            terms = terms[:-1]
+        return (prefix + sep.join(terms) + suffix)[:limit]
+
+    def summarize(self, text: str) -> str:
+        """Summary of one message of at most ``max_chars`` characters"""
+        terms = self._top(Counter(self._terms(text)), 3)
+        return self._fit(
+            "Summary: ", terms, f" ({len(text.split())} words)", self.max_chars, " "
+        )
+
+    def fold(self, summary: Optional[str], messages: Sequence[BaseMessage]) -> str:
+        """New rolling summary covering ``summary`` plus ``messages``"""
+        last_summary, weights = self._last
+        if summary is None or summary != last_summary:
+            weights = dict.fromkeys(self._terms(summary or ""), float(self.carry))
+        keep = self.max_terms * 4
+        for message in messages:
+            # Each folded message ages everything folded before it
+            weights = {term: weight * self.decay for term, weight in weights.items()}
+            for term in self._terms(message.content):
+                weights[term] = weights.get(term, 0.0) + 1.0
+            if len(weights) > keep:
+                weights = dict(Counter(weights).most_common(keep))
+        folded = self._fit(
+            "Summary: ",
+            self._top(Counter(weights), self.max_terms),
+            "",
+            self.max_summary_chars,
+            ", ",
+        )
+        self._last = (folded, weights)
+        return folded
+
+
+def strip_tag(content: str) -> str:
+    """Message content without the ``[SUMMARIZE]`` tag"""
+    return content.replace(SUMMARIZE_TAG, " ").strip()
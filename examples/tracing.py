@@ -0,0 +1,254 @@
+"""Per-phase tracing spans for agent steps
+
+A ``Tracer`` times named phases and hands each finished ``Span`` to its
+sinks. A tracer without sinks is disabled: ``span`` then returns a shared
+no-op context manager and ``record`` returns immediately, so tracing can
+stay wired into the step path at close to zero cost.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from time import perf_counter, time
+from typing import IO, Any, Deque, Dict, Iterable, List, Optional, Sequence
+
+# Upper bounds (seconds) of the Prometheus histogram buckets
+DEFAULT_BUCKETS = (
+    0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0
+)
+
+
+@dataclass
+class Span:
+    """One timed phase of a step"""
+
+    name: str
+    # Wall-clock start (seconds since the epoch) and duration in seconds
+    start: float
+    duration: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class _NullSpan:
+    """Context manager returned by a disabled tracer"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        """Ignore attributes, mirroring ``_ActiveSpan.set``"""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    """Context manager timing one phase of an enabled tracer"""
+
+    __slots__ = ("_tracer", "_name", "_attributes", "_wall", "_started")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> "_ActiveSpan":
+        self._wall = time()
+        self._started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        duration = perf_counter() - self._started
+        if exc_type is not None:
+            self._attributes["error"] = exc_type.__name__
+        self._tracer.emit(Span(self._name, self._wall, duration, self._attributes))
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes discovered while the phase runs"""
+        self._attributes.update(attributes)
+
+
+class Tracer:
+    """Time named phases and forward finished spans to sinks
+
+    Sinks are objects with ``emit(span)`` and ``close()`` methods, such as
+    ``InMemorySink``, ``JsonlSink`` and ``PrometheusSink``. Sinks may be
+    called from tool threads and must be thread-safe.
+    """
+
+    def __init__(self, sinks: Iterable[Any] = ()):
+        self.sinks: List[Any] = list(sinks)
+        self.enabled = bool(self.sinks)
+
+    def add_sink(self, sink: Any) -> None:
+        """Start sending spans to ``sink``"""
+        self.sinks.append(sink)
+        self.enabled = True
+
+    def span(self, name: str, **attributes: Any):
+        """Context manager timing the enclosed block as a span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, attributes)
+
+    def record(self, name: str, duration: float, **attributes: Any) -> None:
+        """Emit a span for a phase the caller already timed"""
+        if self.enabled:
+            self.emit(Span(name, time() - duration, duration, attributes))
+
+    def emit(self, span: Span) -> None:
+        """Send a finished span to every sink"""
+        for sink in self.sinks:
+            sink.emit(span)
+
+    def close(self) -> None:
+        """Flush and close every sink"""
+        for sink in self.sinks:
+            sink.close()
+
+
+class InMemorySink:
+    """Keep the most recent ``max_spans`` spans in memory"""
+
+    def __init__(self, max_spans: int = 10000):
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+
+    def emit(self, span: Span) -> None:
+        """Store one span, dropping the oldest when full"""
+        self.spans.append(span)
+
+    def by_name(self, name: str) -> List[Span]:
+        """Stored spans with the given name, oldest first"""
+        return [span for span in list(self.spans) if span.name == name]
+
+    def close(self) -> None:
+        """Nothing to release; spans stay readable"""
+
+
+class JsonlSink:
+    """Append spans to a file as one JSON object per line"""
+
+    def __init__(self, path: str, flush_every: int = 64):
+        self._dumps = json.dumps
+        self.path = path
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = open(path, "a", encoding="utf-8")
+        self._pending = 0
+
+    def emit(self, span: Span) -> None:
+        """Write one span, flushing every ``flush_every`` spans"""
+        line = self._dumps(asdict(span), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._file.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        """Flush and close the file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PrometheusSink:
+    """Aggregate span durations into a Prometheus text exposition file
+
+    Durations are kept per span name as a cumulative histogram. The file is
+    rewritten atomically every ``write_every`` spans and on ``write``/
+    ``close``, so a node exporter textfile collector can scrape it.
+    """
+
+    metric = "agent_phase_duration_seconds"
+
+    def __init__(
+        self,
+        path: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        write_every: int = 256,
+    ):
+        self.path = path
+        self.buckets = tuple(sorted(buckets))
+        self.write_every = write_every
+        self._lock = threading.Lock()
+        # span name -> (bucket counts, total count, sum of durations)
+        self._series: Dict[str, List[Any]] = {}
+        self._unwritten = 0
+
+    def emit(self, span: Span) -> None:
+        """Add one span's duration to its histogram"""
+        with self._lock:
+            series = self._series.get(span.name)
+            if series is None:
+                series = self._series[span.name] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if span.duration <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += 1
+            series[2] += span.duration
+            self._unwritten += 1
+            if self._unwritten >= self.write_every:
+                self._write_locked()
+
+    def render(self) -> str:
+        """Current histograms in the Prometheus text exposition format"""
+        with self._lock:
+            return self._render_locked()
+
+    def _render_locked(self) -> str:
+        lines = [
+            f"# HELP {self.metric} Time spent in each agent step phase.",
+            f"# TYPE {self.metric} histogram",
+        ]
+        for name in sorted(self._series):
+            counts, total, duration_sum = self._series[name]
+            label = f'phase="{_escape_label(name)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(
+                    f'{self.metric}_bucket{{{label},le="{_format_value(bound)}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(f'{self.metric}_bucket{{{label},le="+Inf"}} {total}')
+            lines.append(f"{self.metric}_sum{{{label}}} {_format_value(duration_sum)}")
+            lines.append(f"{self.metric}_count{{{label}}} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Rewrite the exposition file with the current histograms"""
+        with self._lock:
+            self._write_locked()
+
+    def _write_locked(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._render_locked())
+        os.replace(tmp_path, self.path)
+        self._unwritten = 0
+
+    def close(self) -> None:
+        """Write the final histograms"""
+        self.write()
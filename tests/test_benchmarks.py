@@ -0,0 +1,48 @@
+"""Test the benchmark suite's result handling"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from benchmarks.suite import compare, load_results, main, run, write_results
+
+
+def test_compare_flags_regressions_over_threshold():
+    """Test only slowdowns beyond the threshold count as regressions"""
+    baseline = {"fast": 1.0, "slow": 1.0, "retired": 1.0}
+    current = {"fast": 0.5, "slow": 1.5, "new": 2.0}
+    rows = {row[0]: row for row in compare(current, baseline, threshold=0.25)}
+    assert set(rows) == {"fast", "slow"}
+    assert not rows["fast"][4]
+    assert rows["slow"][3] == 1.5 and rows["slow"][4]
+
+
+def test_results_round_trip(tmp_path):
+    """Test results written to JSON load back unchanged"""
+    path = str(tmp_path / "results.json")
+    write_results(path, {"step_tools_3": 1e-5})
+    assert load_results(path) == {"step_tools_3": 1e-5}
+
+
+def test_compare_mode_exit_status(tmp_path):
+    """Test the suite exits non-zero when a benchmark regressed"""
+    path = str(tmp_path / "baseline.json")
+    assert main(["-k", "memory_add_window_1000", "-o", path]) == 0
+    # A baseline that is far faster than anything achievable
+    write_results(path, {"memory_add_window_1000": 1e-12})
+    assert main(["-k", "memory_add_window_1000", "-c", path]) == 1
+
+
+def test_filter_selects_exact_names_and_globs(monkeypatch):
+    """Test a plain filter runs one benchmark and globs select families"""
+    monkeypatch.setattr(
+        "benchmarks.suite.BENCHMARKS",
+        {name: lambda: 1e-6 for name in ("window_1000", "window_10000", "other")},
+    )
+    assert list(run("window_1000")) == ["window_1000"]
+    assert list(run("window_*")) == ["window_1000", "window_10000"]
+    assert len(run()) == 3
@@ -0,0 +1,136 @@
+"""Test tool result caching"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.cache import MISSING, ToolResultCache
+from examples.demo_tool_usage import (
+    BaseTool,
+    ChatAgent,
+    ChatHistoryMemory,
+    TextRatingTool,
+    setup_tool_agent,
+)
+from examples.messages import BaseMessage
+
+
+class FakeClock:  # pylint: disable=too-few-public-methods
+    """Manually advanced clock for TTL tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EchoTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Pure tool counting its executions"""
+
+    name = "echo_tool"
+    description = "Echoes the message"
+    cache_size = 2
+    calls = 0
+
+    def execute(self, *args, **kwargs) -> str:
+        EchoTool.calls += 1
+        return args[0].upper()
+
+
+def test_lru_eviction_and_stats():
+    """Test least recently used entries are evicted first"""
+    cache = ToolResultCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+
+
+def test_ttl_expiry():
+    """Test entries expire after their TTL"""
+    clock = FakeClock()
+    cache = ToolResultCache(max_entries=1, ttl=5.0, clock=clock)
+    cache.put("usage", "50%")
+    clock.now = 4.9
+    assert cache.get("usage") == "50%"
+    clock.now = 5.0
+    assert cache.get("usage") is MISSING
+    assert cache.stats().expirations == 1
+
+
+def test_agent_skips_execution_for_repeated_prompts():
+    """Test repeated prompts are served from the cache"""
+    EchoTool.calls = 0
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[EchoTool])
+    msg = BaseMessage("User", "echo_tool hello")
+    first = agent.step(msg)
+    second = agent.step(msg)
+
+    assert first.content == second.content == "Used echo_tool: ECHO_TOOL HELLO"
+    assert EchoTool.calls == 1
+    stats = agent.cache_stats()["echo_tool"]
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_bypass_cache_per_call():
+    """Test use_cache=False runs the tool and refreshes the entry"""
+    EchoTool.calls = 0
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[EchoTool])
+    msg = BaseMessage("User", "echo_tool hello")
+    agent.step(msg)
+    agent.step(msg, use_cache=False)
+    assert EchoTool.calls == 2
+    agent.step(msg)
+    assert EchoTool.calls == 2
+
+
+def test_builtin_tool_cache_declarations():
+    """Test demo tools declare caching and uncached tools are skipped"""
+    agent = setup_tool_agent()
+    agent.step(BaseMessage("User", "check disk usage"))
+    agent.step(BaseMessage("User", "check disk usage again"))
+    stats = agent.cache_stats()
+    assert set(stats) == {"greeting_tool", "rating_tool", "disk_usage_tool"}
+    # Disk usage is keyed on nothing, so different prompts share the reading
+    assert stats["disk_usage_tool"].hits == 1
+
+
+
+def test_rating_cache_keys_long_texts_by_digest():
+    """Test long rated texts are cached under a short digest, still hit"""
+    assert TextRatingTool.cache_key("short text") == "short text"
+    long_text = "word " * 10_000
+    key = TextRatingTool.cache_key(long_text)
+    assert isinstance(key, bytes) and len(key) == 16
+    assert key == TextRatingTool.cache_key("word " * 10_000)
+    assert key != TextRatingTool.cache_key(long_text + "more")
+
+    agent = setup_tool_agent()
+    message = BaseMessage("User", "rating_tool: " + long_text)
+    assert agent.step(message).content == agent.step(message).content
+    assert agent.cache_stats()["rating_tool"].hits == 1
+
+
+def test_uncached_tools_always_execute():
+    """Test tools without cache_size run on every call"""
+
+    class UncachedEcho(EchoTool):  # pylint: disable=too-few-public-methods
+        cache_size = 0
+
+    EchoTool.calls = 0
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[UncachedEcho])
+    for _ in range(3):
+        agent.step(BaseMessage("User", "echo_tool hello"))
+    assert EchoTool.calls == 3
+    assert not agent.cache_stats()
@@ -1,5 +1,7 @@
 """Test command line interface for agent interaction"""
 
+import json
+import subprocess
 import sys
 import os
 
@@ -14,6 +16,75 @@ from click.testing import CliRunner
 # pylint: disable=import-error,no-name-in-module
 from examples.cli import main
 
+# Modules the CLI must not import at start: the agent and everything
+# behind it are loaded on first use, so --help and --version stay fast
+CLI_LAZY_MODULES = {
+    "examples.demo_tool_usage",
+    "examples.delegation",
+    "examples.messages",
+    "examples.client",
+    "examples.server",
+    "examples.search",
+    "examples.storage",
+    "numpy",
+}
+# Generous bound on the modules ``import examples.cli`` may pull in: about
+# 70 with click, while importing the agent would add about 110 more
+CLI_IMPORT_BUDGET_MODULES = 120
+# Modules the agent itself only loads when a feature needs them
+AGENT_LAZY_MODULES = {
+    "examples.delegation",
+    "examples.experiments",
+    "examples.search",
+    "examples.storage",
+    "numpy",
+}
+
+
+def imported_modules(module: str) -> set:
+    """Names in sys.modules after importing ``module`` in a fresh interpreter"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))",
+        ],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout))
+
+
+def measure_cli_import():
+    """Import examples.cli in a fresh interpreter under -X importtime
+
+    Returns:
+        (cumulative import time in ms, names of the modules it imported)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import examples.cli"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Rows list children before their parent, indented one level deeper,
+    # so the modules examples.cli pulled in are the nested rows above it
+    nested = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("  "):
+            nested.append(name.strip())
+        elif name.strip() == "examples.cli":
+            return int(cumulative) / 1000, set(nested)
+        else:
+            nested = []
+    raise AssertionError("examples.cli missing from -X importtime output")
+
 
 def test_cli_basic_execution():
     """Test basic CLI execution with a message"""
@@ -90,3 +161,85 @@ def test_cli_disk_usage_tool():
     assert "Disk Usage" in result.output
     assert "%" in result.output
     assert result.exit_code == 0
+
+
+def test_cli_batch_mode():
+    """Test batch mode streams JSONL responses for mixed input"""
+    runner = CliRunner()
+    batch_input = (
+        "Hello there\n"
+        "\n"
+        '{"id": "greet", "message": "use greeting_tool"}\n'
+        "{not json\n"
+    )
+    result = runner.invoke(main, ["--batch", "-"], input=batch_input)
+    assert result.exit_code == 0
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["id"] for r in records] == [1, "greet", 4]
+    assert records[0]["response"] == "Hello World!"
+    assert "Hello from tool!" in records[1]["response"]
+    assert records[1]["latency_ms"] >= 0
+    assert "Invalid JSON" in records[2]["error"]
+
+
+def test_cli_batch_rejects_message():
+    """Test --batch and --message together are a usage error"""
+    result = CliRunner().invoke(main, ["--batch", "-", "-m", "Hello"], input="Hi\n")
+    assert result.exit_code == 2
+    assert "--batch cannot be combined with --message" in result.output
+
+
+def test_cli_batch_mode_with_workers(tmp_path):
+    """Test batch mode keeps input order with a pool of agents"""
+    batch_file = tmp_path / "messages.txt"
+    batch_file.write_text(
+        "\n".join(f"message number {i}" for i in range(50)), encoding="utf-8"
+    )
+    runner = CliRunner()
+    result = runner.invoke(main, ["--batch", str(batch_file), "--workers", "4"])
+    assert result.exit_code == 0
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["id"] for r in records] == list(range(1, 51))
+    assert all(r["response"] == "Hello World!" for r in records)
+
+
+def test_cli_batch_workers_keep_errors_in_order(tmp_path):
+    """Test invalid lines stay in input order when workers read ahead"""
+    lines = []
+    for i in range(40):
+        lines.append("{broken" if i % 3 == 0 else f"message number {i}")
+    batch_file = tmp_path / "messages.txt"
+    batch_file.write_text("\n".join(lines), encoding="utf-8")
+    result = CliRunner().invoke(main, ["--batch", str(batch_file), "--workers", "2"])
+    assert result.exit_code == 0
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["id"] for r in records] == list(range(1, 41))
+    assert all(("error" in r) == (r["id"] % 3 == 1) for r in records)
+    assert all(r["latency_ms"] < 1000 for r in records if "response" in r)
+
+
+def test_cli_start_leaves_agent_modules_unloaded():
+    """Test importing the CLI does not load the agent or its dependencies"""
+    eagerly_loaded = CLI_LAZY_MODULES & imported_modules("examples.cli")
+    assert not eagerly_loaded, f"Imported at CLI start: {sorted(eagerly_loaded)}"
+
+
+def test_agent_import_leaves_optional_features_unloaded():
+    """Test importing the agent does not load search, storage or delegation"""
+    eagerly_loaded = AGENT_LAZY_MODULES & imported_modules("examples.demo_tool_usage")
+    assert not eagerly_loaded, f"Imported with the agent: {sorted(eagerly_loaded)}"
+
+
+def test_cli_import_budget():
+    """Test -X importtime shows the CLI importing a bounded set of modules"""
+    cumulative_ms, imported = measure_cli_import()
+    assert cumulative_ms > 0 and "click" in imported
+    eagerly_loaded = CLI_LAZY_MODULES & imported
+    assert not eagerly_loaded, f"Imported at CLI start: {sorted(eagerly_loaded)}"
+    assert len(imported) <= CLI_IMPORT_BUDGET_MODULES, (
+        f"examples.cli imports {len(imported)} modules, "
+        f"budget is {CLI_IMPORT_BUDGET_MODULES}"
+    )
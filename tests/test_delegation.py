@@ -0,0 +1,118 @@
+"""Test scheduling of delegated tasks across workers"""
+
+import asyncio
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import BaseTool, ChatAgent, ChatHistoryMemory
+from examples.delegation import DelegationScheduler
+from examples.messages import BaseMessage
+
+
+def make_tool(delay: float, reply: str):
+    """Build a tool class named work_tool that sleeps then replies"""
+
+    class WorkTool(BaseTool):  # pylint: disable=too-few-public-methods
+        name = "work_tool"
+        description = "Does some slow work"
+
+        def execute(self, *args, **kwargs) -> str:
+            time.sleep(delay)
+            return reply
+
+    return WorkTool
+
+
+def make_manager(delays, strategy, timeout=None):
+    """Manager with one worker per delay, sharing one memory"""
+    memory = ChatHistoryMemory(window_size=100)
+    workers = [
+        ChatAgent(memory=memory, tools=[make_tool(delay, f"worker {i} done")])
+        for i, delay in enumerate(delays)
+    ]
+    return ChatAgent(
+        memory=memory,
+        tools=[],
+        delegate_workers=workers,
+        delegation_strategy=strategy,
+        delegation_timeout=timeout,
+    )
+
+
+TASK = BaseMessage("Manager", "Delegate to worker: use work_tool")
+
+
+def test_broadcast_gathers_all_workers_in_parallel():
+    """Test broadcast runs every worker concurrently and aggregates"""
+    manager = make_manager([0.2, 0.2, 0.2], "broadcast")
+    start = time.perf_counter()
+    response = manager.step(TASK)
+    assert time.perf_counter() - start < 0.45
+
+    lines = response.content.split("\n")
+    assert lines == [
+        f"Delegated to worker {i + 1}: Used work_tool: worker {i} done"
+        for i in range(3)
+    ]
+    assert manager.memory.messages[-1] is response
+
+
+def test_first_response_wins():
+    """Test first_response returns the fastest worker's answer"""
+    manager = make_manager([0.5, 0.05], "first_response")
+    start = time.perf_counter()
+    response = manager.step(TASK)
+    assert time.perf_counter() - start < 0.4
+    assert response.content == "Delegated to worker: Used work_tool: worker 1 done"
+
+
+def test_least_loaded_spreads_concurrent_tasks():
+    """Test concurrent delegations land on different workers"""
+    manager = make_manager([0.2, 0.2, 0.2], "least_loaded")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(lambda _: manager.step(TASK), range(3)))
+    assert time.perf_counter() - start < 0.45
+    answered_by = {r.content.rsplit("worker ", 1)[1] for r in responses}
+    assert answered_by == {"0 done", "1 done", "2 done"}
+    assert all(manager.delegation.load(w) == 0 for w in manager.delegate_workers)
+
+
+def test_worker_timeout_reported_inline():
+    """Test a slow worker is reported instead of stalling the manager"""
+    manager = make_manager([0.05, 1.0], "broadcast", timeout=0.2)
+    start = time.perf_counter()
+    response = manager.step(TASK)
+    assert time.perf_counter() - start < 0.5
+    assert response.content.split("\n") == [
+        "Delegated to worker 1: Used work_tool: worker 0 done",
+        "Delegated to worker 2: timed out after 0.2s",
+    ]
+
+
+def test_async_strategies():
+    """Test adelegate honours the same strategies"""
+    broadcast = make_manager([0.1, 0.1], "broadcast")
+    first = make_manager([0.5, 0.05], "first_response")
+
+    async def run():
+        return await asyncio.gather(broadcast.astep(TASK), first.astep(TASK))
+
+    broadcast_response, first_response = asyncio.run(run())
+    assert broadcast_response.content.count("Delegated to worker") == 2
+    assert first_response.content.endswith("worker 1 done")
+
+
+def test_unknown_strategy_rejected():
+    """Test invalid strategy names fail fast"""
+    with pytest.raises(ValueError, match="random"):
+        DelegationScheduler([], strategy="random")
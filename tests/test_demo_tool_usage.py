@@ -1,5 +1,7 @@
+import asyncio
 import sys
 import os
+import time
 
 # Add project root and examples directory to path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -15,6 +17,8 @@ from examples.demo_tool_usage import (
     setup_tool_agent,
     ChatAgent,
     ChatHistoryMemory,
+    BaseTool,
+    step_many_sessions,
 )
 from examples.messages import BaseMessage
 
@@ -123,6 +127,47 @@ def test_shared_memory_initialization():
     assert len(memory.messages) == 0, "Shared memory should start empty"
 
 
+def test_memory_window_evicts_oldest():
+    """Test memory keeps only the newest window_size messages"""
+    memory = ChatHistoryMemory(window_size=3)
+    for i in range(5):
+        memory.add_message(BaseMessage("User", f"message {i}"))
+
+    assert [m.content for m in memory.messages] == [
+        "message 2",
+        "message 3",
+        "message 4",
+    ]
+    assert memory.messages[-1].content == "message 4"
+    assert [m.content for m in memory.messages[1:]] == ["message 3", "message 4"]
+
+
+def test_memory_char_budget():
+    """Test memory window bounded by total characters"""
+    memory = ChatHistoryMemory(window_size=None, max_chars=10)
+    for content in ["aaaa", "bbbb", "cccc"]:
+        memory.add_message(BaseMessage("User", content))
+
+    assert [m.content for m in memory.messages] == ["bbbb", "cccc"]
+    assert memory.total_chars == 8
+
+    # A single oversized message is still kept as the newest entry
+    memory.add_message(BaseMessage("User", "x" * 20))
+    assert [m.content for m in memory.messages] == ["x" * 20]
+
+
+def test_memory_token_budget():
+    """Test memory window bounded by total tokens"""
+    memory = ChatHistoryMemory(window_size=100, max_tokens=5)
+    memory.add_message(BaseMessage("User", "one two three"))
+    memory.add_message(BaseMessage("User", "four five"))
+    assert len(memory.messages) == 2
+
+    memory.add_message(BaseMessage("User", "six"))
+    assert [m.content for m in memory.messages] == ["four five", "six"]
+    assert memory.total_tokens == 3
+
+
 class TestTextRatingTool:
     def test_tool_properties(self):
         """Test rating tool metadata."""
@@ -393,6 +438,232 @@ class TestPerformanceOptimization:
         )
 
 
+class SlowTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Tool that sleeps before answering"""
+
+    name = "slow_tool"
+    description = "Sleeps for a while"
+    delay = 0.2
+
+    def execute(self, *args, **kwargs) -> str:
+        time.sleep(self.delay)
+        return "slow done"
+
+
+class SleepyTool(SlowTool):  # pylint: disable=too-few-public-methods
+    """Second sleeping tool to run alongside SlowTool"""
+
+    name = "sleepy_tool"
+
+
+class HangingTool(SlowTool):  # pylint: disable=too-few-public-methods
+    """Tool that outlives its own timeout"""
+
+    name = "hanging_tool"
+    delay = 1.0
+    timeout = 0.05
+
+
+class FailingTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Tool that always raises"""
+
+    name = "failing_tool"
+    description = "Always fails"
+
+    def execute(self, *args, **kwargs) -> str:
+        raise RuntimeError("boom")
+
+
+class TestConcurrentTools:
+    """Test matched tools run concurrently with per-tool timeouts"""
+
+    def test_matched_tools_run_concurrently(self):
+        """Test latency is bounded by the slowest tool, not the sum"""
+        agent = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, SleepyTool])
+        start = time.perf_counter()
+        response = agent.step(BaseMessage("User", "use slow_tool and sleepy_tool"))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.35, f"Tools ran sequentially ({elapsed:.2f}s)"
+        assert response.content == (
+            "Used slow_tool: slow done\nUsed sleepy_tool: slow done"
+        )
+
+    def test_timeout_and_failure_reported_inline(self):
+        """Test slow and failing tools do not stall or break the step"""
+        agent = ChatAgent(
+            memory=ChatHistoryMemory(),
+            tools=[HangingTool, FailingTool, GreetingTool],
+        )
+        start = time.perf_counter()
+        response = agent.step(
+            BaseMessage("User", "hanging_tool failing_tool greeting_tool")
+        )
+        assert time.perf_counter() - start < 0.5
+
+        lines = response.content.split("\n")
+        assert lines[0] == "Used hanging_tool: timed out after 0.05s"
+        assert lines[1] == "Used failing_tool: failed: RuntimeError: boom"
+        assert lines[2] == "Used greeting_tool: Hello from tool!"
+
+        system_messages = [
+            m.content for m in agent.memory.messages if m.role_type == "system"
+        ]
+        assert [m.split(":")[0] for m in system_messages] == [
+            "Agent used hanging_tool",
+            "Agent used failing_tool",
+            "Agent used greeting_tool",
+        ]
+
+    def test_agent_default_timeout(self):
+        """Test agent-wide timeout applies to tools without their own"""
+        agent = ChatAgent(
+            memory=ChatHistoryMemory(), tools=[SlowTool], tool_timeout=0.01
+        )
+        response = agent.step(BaseMessage("User", "use slow_tool"))
+        assert "timed out after 0.01s" in response.content
+
+
+class AsyncSleepTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Native async tool that yields to the event loop while waiting"""
+
+    name = "async_sleep_tool"
+    description = "Sleeps without blocking the loop"
+    delay = 0.1
+
+    async def aexecute(self, *args, **kwargs) -> str:
+        await asyncio.sleep(self.delay)
+        return "awake"
+
+
+class TestAsyncAgent:
+    """Test the asyncio-native agent path"""
+
+    def test_astep_adapts_sync_tools(self):
+        """Test sync-only tools run through astep"""
+        agent = setup_tool_agent()
+        response = asyncio.run(
+            agent.astep(BaseMessage.make_user_message("User", "use greeting_tool"))
+        )
+        assert response.content == "Used greeting_tool: Hello from tool!"
+        assert [m.role_type for m in agent.memory.messages] == [
+            "user",
+            "system",
+            "assistant",
+        ]
+
+    def test_astep_fallback_matches_step(self):
+        """Test astep and step give the same non-tool responses"""
+        agent = setup_tool_agent()
+        for content in ["Hi", "Just say hello normally"]:
+            msg = BaseMessage.make_user_message("User", content)
+            assert asyncio.run(agent.astep(msg)) == agent.step(msg)
+
+    def test_sessions_multiplex_on_one_loop(self):
+        """Test many sessions awaiting slow tools overlap on one loop"""
+        agents = [
+            ChatAgent(memory=ChatHistoryMemory(), tools=[AsyncSleepTool])
+            for _ in range(200)
+        ]
+
+        async def run_all():
+            msg = BaseMessage("User", "use async_sleep_tool")
+            return await asyncio.gather(*(agent.astep(msg) for agent in agents))
+
+        start = time.perf_counter()
+        responses = asyncio.run(run_all())
+        assert time.perf_counter() - start < 1.0
+        assert all("awake" in r.content for r in responses)
+
+    def test_astep_timeout_reported_inline(self):
+        """Test async tool timeouts are reported instead of raised"""
+        agent = ChatAgent(
+            memory=ChatHistoryMemory(),
+            tools=[AsyncSleepTool, GreetingTool],
+            tool_timeout=0.01,
+        )
+        response = asyncio.run(
+            agent.astep(BaseMessage("User", "async_sleep_tool greeting_tool"))
+        )
+        assert response.content.split("\n") == [
+            "Used async_sleep_tool: timed out after 0.01s",
+            "Used greeting_tool: Hello from tool!",
+        ]
+
+    def test_astep_delegation_and_file_operations(self, tmp_path):
+        """Test delegation and file commands through astep"""
+        memory = ChatHistoryMemory()
+        worker = ChatAgent(memory=memory, tools=[GreetingTool])
+        manager = ChatAgent(memory=memory, tools=[], delegate_workers=[worker])
+        response = asyncio.run(
+            manager.astep(BaseMessage("Manager", "Delegate to worker: greeting_tool"))
+        )
+        assert "Delegated to worker" in response.content
+        assert "Hello from tool!" in response.content
+
+        target = tmp_path / "notes.txt"
+        asyncio.run(manager.astep(BaseMessage("User", f"add {target}")))
+        response = asyncio.run(
+            manager.astep(BaseMessage("User", f"edit {target} 'async edit'"))
+        )
+        assert "Updated" in response.content
+        assert target.read_text(encoding="utf-8") == "async edit"
+
+
+class TestStepMany:
+    """Test batched and streaming step API"""
+
+    def test_step_many_matches_step(self):
+        """Test step_many gives the same responses and memory as step"""
+        contents = ["use greeting_tool", "Hi", "rate this text please", "hello"] * 5
+        stepped = setup_tool_agent()
+        expected = [
+            stepped.step(BaseMessage.make_user_message("User", c)).content
+            for c in contents
+        ]
+
+        batched = setup_tool_agent()
+        messages = (BaseMessage.make_user_message("User", c) for c in contents)
+        responses = batched.step_many(messages, batch_size=3)
+        assert [r.content for r in responses] == expected
+        assert [m.content for m in batched.memory.messages] == [
+            m.content for m in stepped.memory.messages
+        ]
+        assert len(batched.performance_data) == len(stepped.performance_data)
+
+    def test_step_many_is_lazy(self):
+        """Test responses stream out before the input is exhausted"""
+        agent = setup_tool_agent()
+        consumed = []
+
+        def messages():
+            for i in range(100):
+                consumed.append(i)
+                yield BaseMessage.make_user_message("User", f"message {i}")
+
+        responses = agent.step_many(messages())
+        next(responses)
+        assert consumed == [0]
+        responses.close()
+        assert agent.memory.messages[-1].content == "Hello World!"
+
+    def test_step_many_sessions_in_order(self):
+        """Test independent sessions keep per-session order and output order"""
+        agents = [setup_tool_agent() for _ in range(3)]
+        pairs = [
+            (agents[i % 3], BaseMessage.make_user_message("User", f"msg {i} hello"))
+            for i in range(30)
+        ]
+        responses = list(step_many_sessions(iter(pairs), max_workers=3, window=7))
+        assert len(responses) == 30
+        for agent in agents:
+            user_messages = [
+                m.content for m in agent.memory.messages if m.role_type == "user"
+            ]
+            indices = [int(c.split()[1]) for c in user_messages]
+            assert indices == sorted(indices)
+
+
 class TestDelegation:
     """Test agent-to-agent delegation"""
 
@@ -0,0 +1,95 @@
+"""Test compiled tool dispatch index"""
+
+import random
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.dispatch import ToolDispatcher
+from examples.demo_tool_usage import ChatHistoryMemory, ChatAgent, GreetingTool
+from examples.messages import BaseMessage
+
+
+def reference_match(names, text):
+    """Matching semantics of the original linear scan in ChatAgent.step"""
+    exact = [name for name in names if name in text]
+    if exact:
+        return exact
+    return [
+        name for name in names if any(part in text for part in name.split("_"))
+    ]
+
+
+def test_exact_match_takes_precedence():
+    """Test full names win over partial name matches"""
+    dispatcher = ToolDispatcher(
+        ["greeting_tool", "rating_tool", "disk_usage_tool"], scan_threshold=0
+    )
+    assert dispatcher.match("use greeting_tool please") == ["greeting_tool"]
+    assert dispatcher.match("use greeting tool") == [
+        "greeting_tool",
+        "rating_tool",
+        "disk_usage_tool",
+    ]
+    assert dispatcher.match("check disk usage") == ["disk_usage_tool"]
+    assert dispatcher.match("nothing here") == []
+
+
+def test_overlapping_patterns():
+    """Test patterns found inside other patterns are all reported"""
+    dispatcher = ToolDispatcher(["she_he", "hers", "is_his"], scan_threshold=0)
+    assert dispatcher.match("ushers") == reference_match(
+        ["she_he", "hers", "is_his"], "ushers"
+    )
+
+
+def test_matches_reference_semantics():
+    """Test automaton agrees with the linear scan on random inputs"""
+    rng = random.Random(1234)
+    alphabet = "abc_"
+    names = list(
+        dict.fromkeys(
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+            for _ in range(60)
+        )
+    )
+    dispatcher = ToolDispatcher(names, scan_threshold=0)
+    for _ in range(300):
+        text = "".join(rng.choice("abc d") for _ in range(rng.randint(0, 30)))
+        assert dispatcher.match(text) == reference_match(names, text), text
+
+
+def test_incremental_add_and_remove():
+    """Test index stays consistent as tools come and go"""
+    rng = random.Random(99)
+    pool = ["alpha_tool", "beta_tool", "gamma_ray", "delta", "alpha_beta"]
+    dispatcher = ToolDispatcher(scan_threshold=0)
+    names = []
+    for _ in range(200):
+        name = rng.choice(pool)
+        if name in names:
+            dispatcher.remove(name)
+            names.remove(name)
+        else:
+            dispatcher.add(name)
+            names.append(name)
+        text = rng.choice(["use alpha", "beta_tool now", "gamma", "x", "delta tool"])
+        assert dispatcher.match(text) == reference_match(names, text)
+
+
+def test_agent_register_and_unregister_tool():
+    """Test tools registered after construction are dispatched"""
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[])
+    msg = BaseMessage.make_user_message("User", "use greeting_tool")
+    assert "Hello from tool!" not in agent.step(msg).content
+
+    agent.register_tool(GreetingTool)
+    assert "Hello from tool!" in agent.step(msg).content
+
+    agent.unregister_tool("greeting_tool")
+    assert "greeting_tool" not in agent.tools
+    assert "Hello from tool!" not in agent.step(msg).content
@@ -0,0 +1,129 @@
+"""Test prompt-variation experiments"""
+
+import pickle
+import time
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import (
+    BaseTool,
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+    setup_tool_agent,
+)
+from examples.experiments import AgentSpec
+from examples.filters import FilterChain, reject
+from examples.messages import BaseMessage
+from examples.summarize import KeywordSummarizer
+from examples.tracing import InMemorySink, Tracer
+
+
+class PauseTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Tool that makes any prompt mentioning it measurably slower"""
+
+    name = "pause_tool"
+    description = "Sleeps briefly"
+
+    def execute(self, *args, **kwargs) -> str:
+        time.sleep(0.002)
+        return "paused"
+
+
+def test_spec_clones_are_isolated():
+    """Test clones copy tools and memory without sharing them"""
+    agent = setup_tool_agent()
+    agent.step(BaseMessage("User", "Just say hello"))
+    clone = AgentSpec.from_agent(agent).build()
+
+    assert clone is not agent and clone.memory is not agent.memory
+    assert list(clone.tools) == list(agent.tools)
+    assert list(clone.memory.messages) == list(agent.memory.messages)
+    clone.step(BaseMessage("User", "Just say hello again"))
+    assert len(clone.memory.messages) > len(agent.memory.messages)
+
+
+def test_spec_clones_memory_configuration_and_tracing():
+    """Test clones keep filters, summarizer, compaction, summary and tracing"""
+    filters = FilterChain().add_rule("[SECRET]", reject)
+    memory = ChatHistoryMemory(
+        window_size=2,
+        compact=True,
+        summarizer=KeywordSummarizer(max_terms=3),
+        filters=filters,
+    )
+    agent = ChatAgent(
+        memory=memory,
+        tools=[GreetingTool],
+        performance_history=50,
+        tracer=Tracer([InMemorySink()]),
+    )
+    for text in ("alpha beta", "gamma delta", "Hello there"):
+        agent.step(BaseMessage("User", text))
+
+    # Specs travel to worker processes
+    clone = pickle.loads(pickle.dumps(AgentSpec.from_agent(agent))).build()
+    assert clone.memory.compact and clone.memory.summary == memory.summary
+    assert clone.memory.context[0].content == memory.summary
+    assert clone.memory.summarizer.max_terms == 3
+    assert "[SECRET]" in clone.memory.filters
+    assert clone.memory.summarized_count == memory.summarized_count
+    assert list(clone.memory.messages) == list(memory.messages)
+    assert clone.performance_data.maxlen == 50
+    assert clone.tracer.enabled
+    assert clone.tracer.sinks[0] is not agent.tracer.sinks[0]
+    clone.step(BaseMessage("User", "[SECRET] not kept"))
+    assert clone.memory.messages[-1].content != "[SECRET] not kept"
+
+
+def test_zero_trials_run_nothing():
+    """Test an experiment without trials returns empty metrics"""
+    metrics = setup_tool_agent().optimize_with_random_phrases(["Urgent:"], trials=0)
+    assert metrics.trials == 0 and metrics.phrase_impact == {}
+
+
+def test_phrase_impact_across_process_pool():
+    """Test trials in worker processes fill phrase impact and intervals"""
+    agent = setup_tool_agent()
+    agent.step(BaseMessage("User", "rating_tool: rate these words"))
+    memory_before = list(agent.memory.messages)
+    phrases = ["Urgent:", "Important:", "Please respond quickly:"]
+
+    metrics = agent.optimize_with_random_phrases(
+        phrases=phrases, trials=4, phrases_per_trial=2, max_workers=2, seed=3
+    )
+
+    assert metrics.trials == 4
+    assert metrics.avg_response_time > 0
+    assert metrics.p50_response_time <= metrics.p99_response_time
+    assert set(metrics.phrase_impact) <= set(phrases)
+    for phrase, (low, high) in metrics.phrase_intervals.items():
+        assert low <= metrics.phrase_impact[phrase] <= high
+    assert list(agent.memory.messages) == memory_before
+    assert agent.calculate_performance_metrics().phrase_impact == metrics.phrase_impact
+
+
+def test_clearly_slower_phrase_stops_early():
+    """Test a phrase whose effect is decided is not sampled again"""
+    agent = setup_tool_agent()
+    agent.register_tool(PauseTool)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        metrics = agent.optimize_with_random_phrases(
+            phrases=["use pause_tool and"],
+            trials=20,
+            phrases_per_trial=1,
+            prompts=["Please say hello", "Tell me a story"],
+            max_workers=1,
+            executor=executor,
+            min_samples=6,
+            seed=1,
+        )
+    assert metrics.trials == 1
+    low, _ = metrics.phrase_intervals["use pause_tool and"]
+    assert low > 0.001
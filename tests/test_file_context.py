@@ -0,0 +1,328 @@
+"""Test the cached file context store behind add/remove/edit"""
+
+import sys
+import os
+import time
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatAgent, ChatHistoryMemory
+from examples.file_context import FileContextStore, _flush_open_stores
+from examples.messages import BaseMessage
+
+
+def bump_mtime(path) -> None:
+    """Move a file's mtime forward so changes are seen even on coarse clocks"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_add_loads_once_and_rereads_are_hits(tmp_path):
+    """Test repeated reads of an unchanged file do not reload it"""
+    path = tmp_path / "notes.txt"
+    path.write_text("hello", encoding="utf-8")
+    store = FileContextStore()
+    store.add(str(path))
+
+    for _ in range(5):
+        assert store.read(str(path)) == "hello"
+
+    stats = store.stats
+    assert stats.loads == 1
+    assert stats.hits == 5
+    assert stats.cached_bytes == 5
+
+
+def test_external_change_is_revalidated(tmp_path):
+    """Test a file changed on disk is reloaded on the next read"""
+    path = tmp_path / "notes.txt"
+    path.write_text("old", encoding="utf-8")
+    store = FileContextStore()
+    store.add(str(path))
+
+    path.write_text("new content", encoding="utf-8")
+    bump_mtime(path)
+    assert store.read(str(path)) == "new content"
+    assert store.stats.loads == 2
+
+    path.unlink()
+    assert store.read(str(path)) is None
+    assert str(path) in store
+    assert store.stats.cached_bytes == 0
+
+
+def test_write_updates_cache_in_place(tmp_path):
+    """Test a write through the store needs no reload afterwards"""
+    path = tmp_path / "notes.txt"
+    store = FileContextStore()
+    store.add(str(path))
+    assert store.read(str(path)) is None
+
+    store.write(str(path), "written")
+    assert path.read_text(encoding="utf-8") == "written"
+    assert store.read(str(path)) == "written"
+    assert store.stats.loads == 0
+
+
+def test_large_files_are_mapped(tmp_path):
+    """Test files above the threshold are served from an mmap"""
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"x" * 4096)
+    store = FileContextStore(mmap_threshold=1024)
+    store.add(str(path))
+
+    assert store.read(str(path)) == "x" * 4096
+    assert not isinstance(store._entries[str(path)].data, str)
+
+    store.write(str(path), "y" * 2048)
+    assert store.read(str(path)) == "y" * 2048
+    store.discard(str(path))
+    assert str(path) not in store and store.stats.cached_bytes == 0
+
+
+def test_mapped_files_are_decoded_once_and_counted(tmp_path):
+    """Test text hits reuse one decoded copy and read_bytes serves the map"""
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"z" * 4096)
+    store = FileContextStore(mmap_threshold=1024)
+    store.add(str(path))
+    assert store.stats.cached_bytes == 4096
+
+    view = store.read_bytes(str(path))
+    assert isinstance(view, memoryview) and view == b"z" * 4096
+    view.release()
+    assert store.stats.cached_bytes == 4096
+
+    first = store.read(str(path))
+    assert store.read(str(path)) is first
+    # The decoded str is counted on top of the mapped file
+    assert store.stats.cached_bytes == 2 * 4096
+    assert store.stats.loads == 1
+
+    small = tmp_path / "small.txt"
+    small.write_text("short", encoding="utf-8")
+    assert store.read_bytes(str(small)) == b"short"
+
+
+def test_budget_evicts_least_recently_used(tmp_path):
+    """Test cached bytes stay within the budget, evicting the oldest file"""
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.txt"
+        path.write_text(name * 40, encoding="utf-8")
+        paths.append(str(path))
+    store = FileContextStore(budget_bytes=100)
+    store.add(paths[0])
+    store.add(paths[1])
+    store.read(paths[0])
+    store.add(paths[2])
+
+    stats = store.stats
+    assert stats.cached_bytes == 80
+    assert stats.evictions == 1
+    assert list(store) == paths
+    # The evicted file is still in context and reloads transparently
+    assert store.read(paths[1]) == "b" * 40
+
+
+def test_agent_edit_keeps_context_cache_current(tmp_path):
+    """Test add/edit through the agent serve the edited text from cache"""
+    path = str(tmp_path / "doc.txt")
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[])
+    agent.step(BaseMessage.make_user_message("User", f"add {path}"))
+    agent.step(BaseMessage.make_user_message("User", f"edit {path} 'one\\ntwo'"))
+
+    assert agent.read_context_file(path) == "one\ntwo"
+    assert agent.context_files.stats.loads == 0
+    agent.step(BaseMessage.make_user_message("User", f"remove {path}"))
+    assert agent.read_context_file(path) is None
+
+
+def test_write_is_atomic_and_keeps_mode(tmp_path, monkeypatch):
+    """Test a failed write leaves the original file and no temp files"""
+    path = tmp_path / "notes.txt"
+    path.write_text("original", encoding="utf-8")
+    os.chmod(path, 0o640)
+    store = FileContextStore(sync="full")
+    store.add(str(path))
+
+    store.write(str(path), "replaced")
+    assert path.read_text(encoding="utf-8") == "replaced"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        store.write(str(path), "lost")
+    assert path.read_text(encoding="utf-8") == "replaced"
+    assert os.listdir(tmp_path) == ["notes.txt"]
+
+
+def test_rapid_edits_are_coalesced(tmp_path):
+    """Test a burst of edits within the write interval is written once"""
+    path = tmp_path / "notes.txt"
+    path.write_text("v0", encoding="utf-8")
+    store = FileContextStore(write_interval=60.0)
+    store.add(str(path))
+
+    for i in range(1, 6):
+        store.write(str(path), f"v{i}")
+    store.patch(str(path), "v5", "final")
+
+    assert store.read(str(path)) == "final"
+    assert path.read_text(encoding="utf-8") == "v0"
+    store.flush()
+    assert path.read_text(encoding="utf-8") == "final"
+    stats = store.stats
+    assert stats.writes == 1
+    assert stats.coalesced == 5
+
+
+def test_patch_writes_only_the_changed_region(tmp_path, monkeypatch):
+    """Test a same-size patch writes just its bytes, a resize the tail"""
+    path = tmp_path / "big.txt"
+    path.write_text("a" * 10_000 + "needle" + "b" * 100, encoding="utf-8")
+    store = FileContextStore(patch_in_place=True)
+    store.add(str(path))
+    written = []
+    real_pwrite = os.pwrite
+
+    def pwrite(fd, data, offset):
+        written.append(len(data))
+        return real_pwrite(fd, data, offset)
+
+    monkeypatch.setattr(os, "pwrite", pwrite)
+
+    store.patch(str(path), "needle", "NEEDLE")
+    store.patch(str(path), "b" * 100, "tail")
+
+    expected = "a" * 10_000 + "NEEDLE" + "tail"
+    assert path.read_text(encoding="utf-8") == expected
+    assert store.read(str(path)) == expected
+    assert written == [6, 4]
+    assert store.stats.region_writes == 2
+
+
+def test_patch_falls_back_to_atomic_rewrite(tmp_path):
+    """Test patches rewrite the file when it changed on disk or is small"""
+    path = tmp_path / "notes.txt"
+    path.write_text("héllo wörld", encoding="utf-8")
+    store = FileContextStore(write_interval=60.0, patch_in_place=True)
+    store.add(str(path))
+
+    store.patch(str(path), "wörld", "world")
+    path.write_text("héllo wörld!", encoding="utf-8")
+    bump_mtime(path)
+    store.flush()
+
+    assert path.read_text(encoding="utf-8") == "héllo world"
+    assert store.stats.region_writes == 0
+    with pytest.raises(ValueError):
+        store.patch(str(path), "missing", "x")
+
+
+def test_patches_are_atomic_by_default(tmp_path, monkeypatch):
+    """Test patches replace the file unless in-place writes are enabled"""
+    path = tmp_path / "big.txt"
+    path.write_text("a" * 10_000 + "needle", encoding="utf-8")
+    store = FileContextStore()
+    store.add(str(path))
+
+    def pwrite(*args):
+        raise AssertionError("patched in place")
+
+    monkeypatch.setattr(os, "pwrite", pwrite)
+    store.patch(str(path), "needle", "NEEDLE")
+    assert path.read_text(encoding="utf-8") == "a" * 10_000 + "NEEDLE"
+    assert store.stats.region_writes == 0
+
+
+def test_merged_patches_with_multibyte_text(tmp_path):
+    """Test merged patches stay correct when byte and character sizes differ"""
+    path = tmp_path / "notes.txt"
+    path.write_text("a" * 1000 + "éABCDE" + "b" * 20, encoding="utf-8")
+    store = FileContextStore(write_interval=60.0, patch_in_place=True)
+    store.add(str(path))
+
+    store.patch(str(path), "ABCDE", "VWXYZ")
+    # Same UTF-8 size but one character more: later offsets shift
+    store.patch(str(path), "é", "ab")
+    store.flush()
+
+    expected = "a" * 1000 + "abVWXYZ" + "b" * 20
+    assert store.read(str(path)) == expected
+    assert path.read_text(encoding="utf-8") == expected
+    assert store.stats.region_writes == 1
+
+
+def test_failed_write_is_isolated(tmp_path):
+    """Test a write that fails does not block or poison other files"""
+    broken = str(tmp_path / "folder")
+    os.mkdir(broken)
+    other = tmp_path / "other.txt"
+    store = FileContextStore()
+    store.add(broken)
+    store.add(str(other))
+
+    with pytest.raises(OSError):
+        store.write(broken, "lost")
+    store.write(str(other), "kept")
+    assert other.read_text(encoding="utf-8") == "kept"
+    assert store.read(broken) is None
+
+    # A held edit failing while another file is edited is reported by flush
+    store.write_interval = 60.0
+    store.write(broken, "lost again")
+    store.write_interval = 0.0
+    store.write(str(other), "kept again")
+    assert other.read_text(encoding="utf-8") == "kept again"
+    with pytest.raises(OSError):
+        store.flush()
+    store.flush()
+    assert store.stats.failed_writes == 2
+    store.release()
+
+
+def test_held_edits_are_written_without_close(tmp_path):
+    """Test held edits reach the disk by timer and at interpreter exit"""
+    path = tmp_path / "notes.txt"
+    store = FileContextStore(write_interval=0.05)
+    store.add(str(path))
+    store.write(str(path), "timed")
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert path.read_text(encoding="utf-8") == "timed"
+
+    store.write_interval = 3600.0
+    store.write(str(path), "at exit")
+    assert path.read_text(encoding="utf-8") == "timed"
+    _flush_open_stores()
+    assert path.read_text(encoding="utf-8") == "at exit"
+
+
+def test_agent_patch_command(tmp_path):
+    """Test the patch command edits a context file and reports errors"""
+    path = str(tmp_path / "doc.txt")
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[])
+    agent.step(BaseMessage.make_user_message("User", f"add {path}"))
+    agent.step(BaseMessage.make_user_message("User", f"edit {path} 'one two'"))
+
+    response = agent.step(
+        BaseMessage.make_user_message("User", f"patch {path} 'two' 'three'")
+    )
+    assert response.content == f"Patched {path}"
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "one three"
+
+    missing = agent.step(BaseMessage.make_user_message("User", f"patch {path} 'x' 'y'"))
+    assert "Error patching" in missing.content
+    invalid = agent.step(BaseMessage.make_user_message("User", f"patch {path} 'x'"))
+    assert "Invalid patch format" in invalid.content
@@ -0,0 +1,103 @@
+"""Test the storage filter chain and public-only redaction"""
+
+import sys
+import os
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatHistoryMemory, setup_tool_agent
+from examples.filters import FilterChain, public_segments, reject
+from examples.messages import BaseMessage, FrozenMessage
+
+
+def user(content: str) -> BaseMessage:
+    """User message with ``content``"""
+    return BaseMessage.make_user_message("User", content)
+
+
+def test_store_only_public_redacts_private_segments():
+    """Test only the public part of a [STORE ONLY PUBLIC] message is stored"""
+    agent = setup_tool_agent()
+    agent.step(user("Private: 12345, Public: 67890 [STORE ONLY PUBLIC]"))
+
+    contents = [m.content for m in agent.memory.messages]
+    assert "Public: 67890" in contents
+    assert not any("12345" in content for content in contents)
+    assert not any("[STORE ONLY PUBLIC]" in content for content in contents)
+
+
+def test_public_segments():
+    """Test segment extraction treats unlabelled text as private"""
+    text = "intro Public: a b; Private: secret, Public: c [STORE ONLY PUBLIC]"
+    assert public_segments(text) == ["a b", "c"]
+    assert public_segments("Private: only secrets") == []
+
+
+def test_store_only_public_without_public_segment_is_dropped():
+    """Test a [STORE ONLY PUBLIC] message with nothing public is not stored"""
+    memory = ChatHistoryMemory()
+    memory.add_message(user("Private: 12345 [STORE ONLY PUBLIC]"))
+    assert len(memory.messages) == 0
+
+
+def test_do_not_store_wins_over_other_markers():
+    """Test a dropped message is not transformed by later rules"""
+    memory = ChatHistoryMemory()
+    memory.add_message(user("Public: x [STORE ONLY PUBLIC] [DO NOT STORE]"))
+    memory.add_message(user("Public: x [DO NOT STORE] [SUMMARIZE]"))
+    assert len(memory.messages) == 0
+    assert not memory.should_store(user("[DO NOT STORE]"))
+    assert memory.should_store(user("plain [brackets] are fine"))
+
+
+def test_custom_rules_transform_in_registration_order():
+    """Test user rules run in the order added, each on the previous result"""
+    chain = FilterChain()
+    chain.add_rule("UPPER", lambda m: BaseMessage(m.role_name, m.content.upper()))
+    chain.add_rule("[TRIM]", lambda m: BaseMessage(m.role_name, m.content[:5]))
+    memory = ChatHistoryMemory(filters=chain)
+
+    memory.add_messages([user("[TRIM] hello [UPPER]"), user("[DO NOT STORE] kept")])
+
+    assert [m.content for m in memory.messages] == ["[TRIM", "[DO NOT STORE] kept"]
+    assert "[TRIM]" in chain and "UPPER" in chain
+
+
+def test_rule_replacement_and_removal():
+    """Test re-adding a marker replaces its action and rules can be removed"""
+    chain = FilterChain.default()
+    chain.add_rule("DO NOT STORE", lambda m: m)
+    assert chain.apply(user("[DO NOT STORE]")) is not None
+    chain.remove_rule("[DO NOT STORE]")
+    assert "DO NOT STORE" not in chain
+
+    with pytest.raises(ValueError):
+        chain.add_rule("[]", reject)
+
+
+def test_transform_keeps_message_type():
+    """Test redaction copies the message without changing its type"""
+    frozen = user("Public: ok, Private: no [STORE ONLY PUBLIC]").freeze()
+    redacted = FilterChain.default().apply(frozen)
+    assert isinstance(redacted, FrozenMessage)
+    assert redacted.content == "Public: ok"
+    assert frozen.content.startswith("Public: ok, Private")
+
+
+def test_filter_message_can_be_overridden():
+    """Test agents can customize filtering by overriding filter_message"""
+
+    class ShoutingMemory(ChatHistoryMemory):
+        """Memory storing everything upper-cased"""
+
+        def filter_message(self, message):
+            return BaseMessage(message.role_name, message.content.upper())
+
+    memory = ShoutingMemory()
+    memory.add_message(user("quiet [DO NOT STORE]"))
+    assert memory.messages[0].content == "QUIET [DO NOT STORE]"
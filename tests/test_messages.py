@@ -0,0 +1,58 @@
+"""Test the compact message types"""
+
+import dataclasses
+import pickle
+import sys
+import os
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.messages import BaseMessage, FrozenMessage, PerformanceMetrics
+
+
+def test_messages_have_no_instance_dict():
+    """Test messages and metrics are slotted"""
+    message = BaseMessage("User", "hello")
+    assert not hasattr(message, "__dict__")
+    with pytest.raises(AttributeError):
+        message.extra = 1  # pylint: disable=assigning-non-slot
+    metrics = PerformanceMetrics(0.1, 0, 1, {})
+    assert not hasattr(metrics, "__dict__")
+
+
+def test_role_strings_are_interned():
+    """Test equal role strings built at runtime share one object"""
+    first = BaseMessage("".join("System"), "a", "".join("system"))
+    second = BaseMessage("".join("System"), "b", "".join("system"))
+    assert first.role_name is second.role_name
+    assert first.role_type is second.role_type
+
+
+def test_existing_constructors_still_work():
+    """Test positional, keyword and make_user_message construction"""
+    assert BaseMessage("Assistant", "hi", "assistant").role_type == "assistant"
+    assert BaseMessage(role_name="User", content="hi").role_type == "user"
+    message = BaseMessage.make_user_message(role_name="User", content="hi")
+    assert isinstance(message, BaseMessage) and message.role_type == "user"
+    assert isinstance(FrozenMessage.make_user_message("User", "hi"), FrozenMessage)
+
+
+def test_frozen_messages_are_immutable_and_hashable():
+    """Test freeze/thaw round trip and immutability"""
+    message = BaseMessage("User", "hello", optimization_phrase="Urgent:")
+    frozen = message.freeze()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        frozen.content = "changed"
+    assert len({frozen, message.freeze()}) == 1
+    assert frozen.thaw() == message
+
+
+def test_messages_pickle():
+    """Test slotted messages survive pickling (used by process pools)"""
+    for message in (BaseMessage("User", "hi"), FrozenMessage("User", "hi")):
+        assert pickle.loads(pickle.dumps(message)) == message
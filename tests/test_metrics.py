@@ -0,0 +1,149 @@
+"""Test fixed-memory latency statistics"""
+
+import random
+import statistics
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.metrics import (
+    LatencyHistogram,
+    MetricsStore,
+    RunningStats,
+    merge_metrics,
+)
+from examples.demo_tool_usage import ChatAgent, ChatHistoryMemory, setup_tool_agent
+from examples.messages import BaseMessage
+
+
+class FakeClock:  # pylint: disable=too-few-public-methods
+    """Manually advanced clock for window tests"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def sample_latencies(count=5000, seed=7):
+    """Log-normal latencies between microseconds and seconds"""
+    rng = random.Random(seed)
+    return [rng.lognormvariate(-7, 1.5) for _ in range(count)]
+
+
+def test_running_stats_match_statistics_module():
+    """Test online mean/variance agree with exact computation"""
+    values = sample_latencies(1000)
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert abs(stats.mean - statistics.mean(values)) < 1e-12
+    assert abs(stats.stdev - statistics.stdev(values)) < 1e-9
+    assert stats.minimum == min(values) and stats.maximum == max(values)
+
+
+def test_merged_stats_equal_combined_stats():
+    """Test merging two halves equals recording everything once"""
+    values = sample_latencies(1000)
+    left, right, whole = RunningStats(), RunningStats(), RunningStats()
+    for value in values[:300]:
+        left.add(value)
+    for value in values[300:]:
+        right.add(value)
+    for value in values:
+        whole.add(value)
+    left.merge(right)
+    assert left.count == whole.count
+    assert abs(left.mean - whole.mean) < 1e-12
+    assert abs(left.variance - whole.variance) < 1e-12
+
+
+def test_histogram_percentiles_within_resolution():
+    """Test percentiles stay within the histogram's relative error"""
+    values = sample_latencies()
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    ordered = sorted(values)
+    for pct in (50, 95, 99):
+        exact = ordered[int(pct / 100 * len(ordered)) - 1]
+        assert abs(histogram.percentile(pct) - exact) / exact < 0.05
+    # Memory is bounded by dynamic range, not by sample count
+    assert len(histogram.counts) < 500
+
+
+def test_sliding_window_drops_old_slices():
+    """Test window queries only cover recent slices"""
+    clock = FakeClock()
+    store = MetricsStore(slice_seconds=1.0, window_slices=5, clock=clock)
+    store.record_step(1.0)
+    clock.now = 3.0
+    store.record_step(0.001)
+    store.record_tool("greeting_tool", 0.002)
+
+    steps, tools = store.window(2.0)
+    assert steps.stats.count == 1
+    assert tools["greeting_tool"].stats.count == 1
+    assert store.window()[0].stats.count == 2
+
+    clock.now = 10.0
+    assert store.window()[0].stats.count == 0
+    assert store.steps.stats.count == 2
+
+
+def test_cached_slice_follows_the_clock_and_merges():
+    """Test records reuse the current slice until the clock leaves it"""
+    # pylint: disable=protected-access
+    clock = FakeClock()
+    store = MetricsStore(slice_seconds=1.0, window_slices=5, clock=clock)
+    store.record_step(0.001)
+    clock.now = 0.99
+    store.record_step(0.001)
+    clock.now = 1.0
+    store.record_step(0.001)
+    assert [s[1].stats.count for s in store._slices] == [2, 1]
+
+    other = MetricsStore(slice_seconds=1.0, window_slices=5, clock=clock)
+    other.record_step(0.002)
+    store.merge(other)
+    # The merged slice replaced the cached one; new records land in it
+    store.record_step(0.003)
+    assert [s[1].stats.count for s in store._slices] == [2, 3]
+    assert store.window(1.0)[0].stats.count == 3
+
+
+def test_merge_metrics_from_many_agents():
+    """Test stores from several agents combine into one view"""
+    agents = [setup_tool_agent() for _ in range(3)]
+    for agent in agents:
+        agent.step(BaseMessage("User", "use greeting_tool"))
+        agent.step(BaseMessage("User", "Just say hello"))
+    combined = merge_metrics(agent.metrics for agent in agents)
+    assert combined.steps.stats.count == 6
+    assert combined.tools["greeting_tool"].stats.count == 3
+    assert combined.window()[0].stats.count == 6
+
+
+def test_agent_performance_metrics_percentiles():
+    """Test PerformanceMetrics exposes percentiles and per-tool data"""
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[], performance_history=5)
+    for _ in range(20):
+        agent.step(BaseMessage("User", "Just say hello"))
+
+    assert len(agent.performance_data) == 5
+    metrics = agent.calculate_performance_metrics(trials=10)
+    assert metrics.trials == 5
+    assert 0 < metrics.p50_response_time <= metrics.p95_response_time
+    assert metrics.p95_response_time <= metrics.p99_response_time
+    assert agent.metrics.steps.stats.count == 20
+
+    tool_agent = setup_tool_agent()
+    tool_agent.step(BaseMessage("User", "rating_tool: some text"))
+    per_tool = tool_agent.calculate_performance_metrics(window=60).per_tool
+    assert per_tool["rating_tool"]["count"] == 1
+    assert per_tool["rating_tool"]["p99"] > 0
@@ -0,0 +1,104 @@
+"""Test pooled tool instances and lifecycle hooks"""
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.pool import ToolPool
+from examples.demo_tool_usage import BaseTool, ChatAgent, ChatHistoryMemory
+from examples.messages import BaseMessage
+
+
+class CountingTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Tool recording how often its lifecycle hooks run"""
+
+    name = "counting_tool"
+    description = "Counts setups and teardowns"
+    setups = 0
+    teardowns = 0
+    lock = threading.Lock()
+
+    def setup(self) -> None:
+        with CountingTool.lock:
+            CountingTool.setups += 1
+
+    def teardown(self) -> None:
+        with CountingTool.lock:
+            CountingTool.teardowns += 1
+
+    def execute(self, *args, **kwargs) -> str:
+        time.sleep(0.001)
+        return "counted"
+
+
+def reset_counts():
+    """Reset class-level counters between tests"""
+    CountingTool.setups = 0
+    CountingTool.teardowns = 0
+
+
+def test_agent_reuses_tool_instances():
+    """Test a tool is set up once across many steps"""
+    reset_counts()
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[CountingTool])
+    for _ in range(5):
+        response = agent.step(BaseMessage("User", "use counting_tool"))
+        assert "counted" in response.content
+    assert CountingTool.setups == 1
+
+    agent.close()
+    assert CountingTool.teardowns == 1
+
+
+def test_pool_bounds_concurrent_instances():
+    """Test concurrent checkouts never exceed max_instances"""
+    reset_counts()
+    pool = ToolPool(max_instances=3)
+    in_use = set()
+    peak = []
+    guard = threading.Lock()
+
+    def work(_):
+        with pool.checkout(CountingTool) as tool:
+            with guard:
+                assert id(tool) not in in_use, "Instance shared between threads"
+                in_use.add(id(tool))
+                peak.append(len(in_use))
+            tool.execute()
+            with guard:
+                in_use.discard(id(tool))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(100)))
+
+    assert max(peak) <= 3
+    assert CountingTool.setups <= 3
+    pool.close()
+    assert CountingTool.teardowns == CountingTool.setups
+
+
+def test_discard_tears_down_checked_out_instance_on_release():
+    """Test instances released after discard are torn down, not pooled"""
+    reset_counts()
+    pool = ToolPool()
+    instance = pool.acquire(CountingTool)
+    pool.discard(CountingTool)
+    assert CountingTool.teardowns == 0
+    pool.release(instance)
+    assert CountingTool.teardowns == 1
+
+
+def test_unregister_tool_tears_down_instances():
+    """Test unregistering a tool releases its pooled state"""
+    reset_counts()
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[CountingTool])
+    agent.step(BaseMessage("User", "use counting_tool"))
+    agent.unregister_tool("counting_tool")
+    assert CountingTool.teardowns == 1
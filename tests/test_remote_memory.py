@@ -0,0 +1,152 @@
+"""Test memory shared across processes through a memory server"""
+
+import functools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import (
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+    TextRatingTool,
+)
+from examples.messages import BaseMessage
+from examples.remote_memory import (
+    MemoryServer,
+    ProcessWorker,
+    RemoteChatHistoryMemory,
+)
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    """Memory server on a temporary socket"""
+    memory = ChatHistoryMemory(window_size=1000)
+    with MemoryServer(memory, str(tmp_path / "memory.sock")) as server:
+        yield server
+
+
+def remote_agent(path):
+    """Agent built in a worker process around the shared memory"""
+    return ChatAgent(
+        memory=RemoteChatHistoryMemory(path), tools=[GreetingTool, TextRatingTool]
+    )
+
+
+def step_remote(path, worker_id, steps):
+    """Step a fresh agent in a pool process; return its process id"""
+    agent = remote_agent(path)
+    for i in range(steps):
+        agent.step(BaseMessage("User", f"worker {worker_id} message {i}"))
+    agent.memory.close()
+    return os.getpid()
+
+
+def test_remote_memory_round_trip(server):
+    """Test writes, filtering and cached snapshots through the server"""
+    memory = RemoteChatHistoryMemory(server.path)
+    memory.add_message(BaseMessage("User", "hello", optimization_phrase="Hi:"))
+    memory.add_messages(
+        [BaseMessage("User", "[DO NOT STORE] secret"), BaseMessage("Bot", "ok", "bot")]
+    )
+    window = memory.messages
+    assert [m.content for m in window] == ["hello", "ok"]
+    assert window[0].optimization_phrase == "Hi:"
+    # An unchanged server version reuses the cached window
+    assert memory.snapshot()[1] is memory.snapshot()[1]
+    assert memory.search("hello")[0].content == "hello"
+    assert server.memory.messages[-1].role_type == "bot"
+    memory.close()
+
+
+def test_remote_memory_mirrors_the_memory_interface(server):
+    """Test budgets, history, filtering and flush are served remotely"""
+    memory = RemoteChatHistoryMemory(server.path)
+    memory.add_messages([BaseMessage("User", f"message {i}") for i in range(3)])
+    assert memory.window_size == 1000
+    assert memory.max_chars is None and memory.max_tokens is None
+    assert memory.compact is False and memory.summary is None
+    assert memory.tokenizer("three little words") == 3
+    assert [m.content for m in memory.history[1:]] == ["message 1", "message 2"]
+    assert len(memory.history) == 3
+    assert not memory.should_store(BaseMessage("User", "[DO NOT STORE] x"))
+    memory.flush()
+    memory.close()
+
+
+def test_agent_experiments_with_remote_memory(server):
+    """Test phrase experiments clone an agent whose memory is remote"""
+    agent = remote_agent(server.path)
+    agent.step(BaseMessage("User", "rating_tool: rate these words"))
+    before = len(server.memory.messages)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        metrics = agent.optimize_with_random_phrases(
+            phrases=["Urgent:"], trials=2, executor=executor, seed=1
+        )
+    assert metrics.trials == 2
+    assert "Urgent:" in metrics.phrase_impact
+    # Trials ran on local clones, not on the shared conversation
+    assert len(server.memory.messages) == before
+    agent.memory.close()
+
+
+def test_server_keeps_non_socket_files(tmp_path):
+    """Test a regular file at the socket path is not deleted"""
+    path = tmp_path / "memory.sock"
+    path.write_text("keep me", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        MemoryServer(ChatHistoryMemory(), str(path))
+    assert path.read_text(encoding="utf-8") == "keep me"
+
+
+def test_server_errors_are_raised(server):
+    """Test a failing request surfaces as an exception on the client"""
+    memory = RemoteChatHistoryMemory(server.path)
+    with pytest.raises(RuntimeError, match="Unknown operation"):
+        memory._request(op="explode")  # pylint: disable=protected-access
+    memory.close()
+
+
+def test_agents_in_process_pool_share_one_conversation(server):
+    """Test agents on several processes append to the same memory"""
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        pids = list(
+            pool.map(step_remote, [server.path] * 4, range(4), [25] * 4)
+        )
+    assert len(set(pids)) > 1 or os.cpu_count() == 1
+    user_messages = [m for m in server.memory.messages if m.role_type == "user"]
+    assert len(user_messages) == 100
+    assert {m.content for m in user_messages} == {
+        f"worker {w} message {i}" for w in range(4) for i in range(25)
+    }
+
+
+def test_delegation_to_process_workers(server):
+    """Test broadcast delegation to agents running in other processes"""
+    workers = [
+        ProcessWorker(functools.partial(remote_agent, server.path)) for _ in range(2)
+    ]
+    manager = ChatAgent(
+        memory=RemoteChatHistoryMemory(server.path),
+        tools=[],
+        delegate_workers=workers,
+        delegation_strategy="broadcast",
+    )
+    try:
+        response = manager.step(BaseMessage("User", "delegate to workers: say hi"))
+    finally:
+        manager.close()
+        for worker in workers:
+            worker.close()
+    assert response.content.count("Delegated to worker") == 2
+    # The manager and both workers logged the task in the shared memory
+    contents = [m.content for m in server.memory.messages]
+    assert contents.count("delegate to workers: say hi") == 3
@@ -0,0 +1,110 @@
+"""Test relevance search over conversation memory"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatHistoryMemory
+from examples.messages import BaseMessage
+from examples.search import MessageIndex, build_index
+from examples.storage import AppendOnlyLog
+
+TOPICS = [
+    "the deployment pipeline failed on the staging cluster",
+    "lunch options near the office today",
+    "database migration plan for the orders table",
+    "staging cluster needs more memory for the pipeline",
+    "quarterly planning meeting moved to friday",
+]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request):
+    """Run index tests with and without the NumPy scorer"""
+    return request.param
+
+
+def test_most_relevant_messages_rank_first(use_numpy):
+    """Test TF-IDF ranking prefers messages sharing rare query terms"""
+    index = build_index(TOPICS, use_numpy=use_numpy)
+    results = index.search("staging pipeline", k=2)
+    assert sorted(position for position, _ in results) == [0, 3]
+    assert results[0][1] >= results[1][1] > 0
+    assert index.search("nothing matches this", k=3) == []
+
+
+def test_removed_messages_disappear_after_purge(use_numpy):
+    """Test removals apply immediately and survive postings purges"""
+    index = MessageIndex(use_numpy=use_numpy)
+    for position in range(500):
+        index.add(position, f"message {position} about topic{position % 5}")
+    for position in range(400):
+        index.remove(position)
+    assert len(index) == 100
+    results = index.search("topic3", k=50)
+    assert len(results) == 20
+    assert all(position >= 400 for position, _ in results)
+
+
+def test_numpy_and_python_scorers_agree():
+    """Test both scorers return the same ranking"""
+    texts = [f"alpha beta {'gamma ' * (i % 4)}delta{i % 3}" for i in range(60)]
+    fast = build_index(texts, use_numpy=True).search("gamma delta1", k=10)
+    slow = build_index(texts, use_numpy=False).search("gamma delta1", k=10)
+    assert [p for p, _ in fast] == [p for p, _ in slow]
+    assert [round(s, 9) for _, s in fast] == [round(s, 9) for _, s in slow]
+
+
+def test_memory_search_follows_the_window():
+    """Test memory.search tracks additions and evictions incrementally"""
+    memory = ChatHistoryMemory(window_size=3)
+    for text in TOPICS[:3]:
+        memory.add_message(BaseMessage("User", text))
+    assert memory.search("migration")[0].content == TOPICS[2]
+
+    for text in TOPICS[3:]:
+        memory.add_message(BaseMessage("User", text))
+    assert [m.content for m in memory.search("staging", k=5)] == [TOPICS[3]]
+    assert memory.search("deployment") == []
+
+
+def test_memory_search_reaches_persisted_history(tmp_path):
+    """Test evicted messages are still found through the storage backend"""
+    memory = ChatHistoryMemory(window_size=2, storage=AppendOnlyLog(str(tmp_path)))
+    for text in TOPICS:
+        memory.add_message(BaseMessage("User", text))
+    memory.close()
+
+    reopened = ChatHistoryMemory(window_size=2, storage=AppendOnlyLog(str(tmp_path)))
+    assert reopened.search("lunch office")[0].content == TOPICS[1]
+    reopened.add_message(BaseMessage("User", "lunch was great"))
+    assert [m.content for m in reopened.search("lunch", k=2)] == [
+        "lunch was great",
+        TOPICS[1],
+    ]
+    reopened.close()
+
+
+def test_memory_search_is_limited_to_newest_messages(tmp_path):
+    """Test the index covers only the newest search_limit stored messages"""
+    storage = AppendOnlyLog(str(tmp_path))
+    memory = ChatHistoryMemory(window_size=2, storage=storage, search_limit=3)
+    for text in TOPICS:
+        memory.add_message(BaseMessage("User", text))
+    # Built on first search from the newest three stored messages
+    assert memory.search("lunch office") == []
+    assert memory.search("staging")[0].content == TOPICS[3]
+    assert len(memory._index) == 3  # pylint: disable=protected-access
+
+    # Older messages leave the index as new ones are stored
+    for i in range(10):
+        memory.add_message(BaseMessage("User", f"filler message {i}"))
+    assert memory.search("staging") == []
+    assert len(memory._index) == 3  # pylint: disable=protected-access
+    memory.close()
@@ -0,0 +1,297 @@
+"""Test the long-lived agent server, its session pool and client"""
+
+import asyncio
+import json
+import sys
+import os
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+from click.testing import CliRunner
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.cli import main
+from examples.client import AgentClient
+from examples.demo_tool_usage import (
+    BaseTool,
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+    setup_tool_agent,
+)
+from examples.server import AgentServer, ServerThread, SessionPool
+
+
+class FakeClock:
+    """Manually advanced time source"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class NapTool(BaseTool):  # pylint: disable=too-few-public-methods
+    """Tool that sleeps briefly so concurrent sessions overlap"""
+
+    name = "nap_tool"
+
+    def execute(self, *args, **kwargs) -> str:
+        time.sleep(0.2)
+        return "rested"
+
+
+def nap_agent() -> ChatAgent:
+    """Agent with the greeting and nap tools"""
+    return ChatAgent(memory=ChatHistoryMemory(), tools=[GreetingTool, NapTool])
+
+
+@pytest.fixture(name="unix_server")
+def fixture_unix_server(tmp_path):
+    """Agent server on a Unix socket in a background thread"""
+    pool = SessionPool(factory=nap_agent, warm=2)
+    with ServerThread(AgentServer(pool, path=str(tmp_path / "agent.sock"))) as thread:
+        yield thread.server
+
+
+def test_pool_reuses_sessions_and_evicts_idle_ones():
+    """Test sessions keep their agent until idle for the timeout"""
+    clock = FakeClock()
+    built = []
+
+    def factory():
+        built.append(setup_tool_agent())
+        return built[-1]
+
+    pool = SessionPool(factory=factory, idle_timeout=10, warm=1, clock=clock)
+    pool.add_spare(factory())
+    first = pool.get("a")
+    assert first.agent is built[0] and pool.spares == 0
+    assert pool.get("a") is first
+
+    clock.now = 5
+    pool.get("b")
+    clock.now = 12
+    first.active = 1
+    assert pool.evict_idle() == 0
+    first.active = 0
+    assert pool.evict_idle() == 1
+    assert "a" not in pool and "b" in pool
+
+
+def test_pool_caps_sessions_keeping_busy_ones():
+    """Test the least recently used idle session goes beyond max_sessions"""
+    pool = SessionPool(factory=setup_tool_agent, max_sessions=2, warm=0)
+    busy = pool.get("busy")
+    busy.active = 1
+    pool.get("idle")
+    pool.get("new")
+    assert list(pool._sessions) == ["busy", "new"]
+    # A new session is never evicted to make room for itself
+    pool.max_sessions = 1
+    pool.get("newest")
+    assert list(pool._sessions) == ["busy", "newest"]
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_new_sessions_are_built_off_the_event_loop():
+    """Test building an agent for a new session does not stall the loop"""
+    threads = []
+
+    def slow_factory():
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return setup_tool_agent()
+
+    async def scenario():
+        pool = SessionPool(factory=slow_factory, warm=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        session = await pool.aget("new")
+        task.cancel()
+        assert await pool.aget("new") is session
+        pool.close()
+        return ticks
+
+    assert asyncio.run(scenario()) >= 5
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_ending_a_busy_session_waits_for_its_request():
+    """Test end() defers closing an agent until its request finishes"""
+    closed = []
+    agent = setup_tool_agent()
+    agent.close = lambda: closed.append(True)
+    pool = SessionPool(factory=lambda: agent, warm=0)
+    session = pool.get("busy")
+    session.active += 1
+    assert pool.end("busy") is True
+    assert "busy" not in pool and not closed
+    pool.release(session)
+    assert closed == [True]
+
+
+def test_server_refuses_to_replace_non_socket(tmp_path):
+    """Test a file at the socket path is left alone instead of deleted"""
+    path = tmp_path / "agent.sock"
+    path.write_text("keep me", encoding="utf-8")
+    with pytest.raises(FileExistsError):
+        ServerThread(AgentServer(SessionPool(warm=0), path=str(path))).start()
+    assert path.read_text(encoding="utf-8") == "keep me"
+
+
+def test_unix_socket_sessions_keep_separate_memory(unix_server):
+    """Test each session id gets its own warm agent across connections"""
+    with AgentClient(unix_server.path, session="alice") as alice:
+        assert alice.step("Hello there") == "Hello World!"
+        assert "Used greeting_tool: Hello from tool!" in alice.step("greeting tool")
+    with AgentClient(unix_server.path, session="alice") as again:
+        chunks = list(again.stream("Hello again", verbose=True))
+        assert chunks[-1].message.content == "Hello World!"
+        assert again.last_reflection == "Hello World!"
+    with AgentClient(unix_server.path, session="bob") as bob:
+        bob.step("Hello there")
+
+    sessions = unix_server.pool._sessions
+    assert len(sessions["alice"].agent.memory.messages) == 8
+    assert len(sessions["bob"].agent.memory.messages) == 2
+    # Spares were topped up after both sessions took one
+    deadline = time.monotonic() + 5
+    while unix_server.pool.spares < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert unix_server.pool.spares == 2
+
+
+def test_sessions_are_served_concurrently(unix_server):
+    """Test requests of different sessions overlap on one server"""
+
+    def ask(session: str) -> None:
+        with AgentClient(unix_server.path, session=session) as client:
+            assert client.step("use nap_tool") == "Used nap_tool: rested"
+
+    threads = [threading.Thread(target=ask, args=(f"s{i}",)) for i in range(4)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - start < 0.6
+
+
+def test_errors_and_end_of_session(unix_server):
+    """Test bad requests get error replies and sessions can be ended"""
+    with AgentClient(unix_server.path, session="temp") as client:
+        with pytest.raises(RuntimeError, match="Missing message"):
+            list(client.request(message=""))
+        client.step("Hello there")
+        assert client.end() is True
+        assert client.end() is False
+        # The connection stays usable after an error
+        assert client.step("Hello there") == "Hello World!"
+
+
+def post(port: int, body: str, **headers: str) -> int:
+    """Status of a raw POST /message to a localhost server"""
+    connection = HTTPConnection("127.0.0.1", port)
+    connection.request(
+        "POST",
+        "/message",
+        body=body,
+        headers={"Content-Type": "application/json", **headers},
+    )
+    status = connection.getresponse().status
+    connection.close()
+    return status
+
+
+def test_http_streaming_and_origin_check():
+    """Test the localhost HTTP transport streams chunks and rejects browsers"""
+    pool = SessionPool(factory=nap_agent, warm=0)
+    with ServerThread(AgentServer(pool, port=0, token="secret")) as thread:
+        address = thread.server.address
+        client = AgentClient(address, session="web", token="secret")
+        chunks = list(client.stream("use nap_tool and greeting_tool"))
+        assert [chunk.source for chunk in chunks] == ["greeting_tool", "nap_tool", None]
+
+        body = json.dumps({"message": "Hello there"})
+        headers = {"Authorization": "Bearer secret", "Origin": "http://evil"}
+        assert post(thread.server.port, body, **headers) == 403
+
+        connection = HTTPConnection("127.0.0.1", thread.server.port)
+        connection.request("GET", "/health")
+        assert json.loads(connection.getresponse().read()) == {"sessions": 1}
+        connection.close()
+
+
+def test_http_requires_token(tmp_path):
+    """Test HTTP requests without the token cannot reach an agent"""
+    victim = tmp_path / "victim.txt"
+    pool = SessionPool(warm=0)
+    with ServerThread(AgentServer(pool, port=0)) as thread:
+        token = thread.server.token
+        assert token
+        for guess in (None, "wrong"):
+            client = AgentClient(thread.server.address, token=guess)
+            with pytest.raises(RuntimeError, match="401"):
+                client.step(f"edit {victim} 'owned'")
+        assert not victim.exists() and len(pool) == 0
+
+        body = json.dumps({"message": "Hello there"})
+        auth = {"Authorization": f"Bearer {token}"}
+        too_long = {**auth, "Content-Length": str(64 * 1024 * 1024)}
+        assert post(thread.server.port, body, **too_long) == 413
+
+        client = AgentClient(thread.server.address, token=token)
+        assert client.step("Hello there") == "Hello World!"
+
+
+def test_cli_connect_mode(unix_server):
+    """Test the CLI client talks to a running server"""
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["--connect", unix_server.path, "--session", "cli", "-m", "Hello there"]
+    )
+    assert result.exit_code == 0
+    assert result.output == "Agent: Hello World!\n"
+    assert "cli" in unix_server.pool
+
+    missing = unix_server.path + ".missing"
+    result = runner.invoke(main, ["--connect", missing, "-m", "Hi"])
+    assert result.exit_code == 1
+    assert "Cannot reach agent server" in result.output
+
+
+
+def test_cli_connect_reports_server_errors(unix_server, monkeypatch):
+    """Test errors from a reachable server are not reported as outages"""
+
+    def failing_stream(self, message, verbose=False):
+        raise RuntimeError("Agent server error: ValueError: boom")
+
+    monkeypatch.setattr(AgentClient, "stream", failing_stream)
+    result = CliRunner().invoke(main, ["--connect", unix_server.path, "-m", "Hi"])
+    assert result.exit_code == 1
+    assert "Error: Agent server error: ValueError: boom" in result.output
+    assert "Cannot reach" not in result.output
+
+
+def test_cli_serve_requires_one_address():
+    """Test serve needs exactly one of --socket and --port"""
+    result = CliRunner().invoke(main, ["serve"])
+    assert result.exit_code == 2
+    assert "exactly one of --socket or --port" in result.output
@@ -0,0 +1,140 @@
+"""Stress test a ChatHistoryMemory shared by agents on many threads"""
+
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import (
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+    TextRatingTool,
+)
+from examples.messages import BaseMessage
+from examples.storage import AppendOnlyLog
+
+THREADS = 8
+STEPS_PER_THREAD = 300
+# user message, tool system message and assistant response per step
+WRITES_PER_STEP = 3
+
+
+def run_agents(memory, threads, steps):
+    """Step one agent per thread against the shared memory"""
+    barrier = threading.Barrier(threads)
+
+    def worker(worker_id):
+        agent = ChatAgent(memory=memory, tools=[GreetingTool, TextRatingTool])
+        barrier.wait()
+        for i in range(steps):
+            agent.step(BaseMessage("User", f"w{worker_id} m{i} rating_tool: hi"))
+        agent.close()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+
+
+def test_concurrent_steps_keep_memory_consistent(tmp_path):
+    """Test no write is lost and readers only see complete windows"""
+    storage = AppendOnlyLog(str(tmp_path), sync=False)
+    memory = ChatHistoryMemory(window_size=50, storage=storage)
+    stop = threading.Event()
+    violations = []
+    snapshots = 0
+
+    def reader():
+        nonlocal snapshots
+        while not stop.is_set():
+            window = memory.messages
+            snapshots += 1
+            if len(window) > 50 or any(m is None for m in window):
+                violations.append(len(window))
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    try:
+        run_agents(memory, THREADS, STEPS_PER_THREAD)
+    finally:
+        stop.set()
+        reader_thread.join()
+
+    assert not violations
+    assert snapshots > 0
+    assert len(memory.messages) == 50
+    assert len(storage) == THREADS * STEPS_PER_THREAD * WRITES_PER_STEP
+    # Every user message was stored exactly once
+    user_messages = [m.content for m in memory.history if m.role_type == "user"]
+    assert len(user_messages) == len(set(user_messages)) == THREADS * 300
+    memory.close()
+
+
+def test_each_step_write_is_atomic():
+    """Test a batch of writes is never observed half-applied"""
+    memory = ChatHistoryMemory(window_size=4)
+    stop = threading.Event()
+    torn = []
+
+    def writer():
+        for i in range(5000):
+            memory.add_messages(
+                [BaseMessage("User", f"{i}a"), BaseMessage("User", f"{i}b")]
+            )
+        stop.set()
+
+    def reader():
+        while not stop.is_set():
+            contents = [m.content for m in memory.messages]
+            # Batches land whole, so the window always ends with a pair
+            if contents and (
+                len(contents) % 2 or contents[-1][:-1] != contents[-2][:-1]
+            ):
+                torn.append(contents)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not torn
+
+
+def test_snapshots_are_immutable_and_lock_free():
+    """Test readers never wait for the lock and old snapshots never change"""
+    memory = ChatHistoryMemory(window_size=3)
+    memory.add_messages([BaseMessage("User", f"m{i}") for i in range(3)])
+    held = memory.messages
+    with memory._lock:
+        # A writer holding the lock does not block readers
+        assert [m.content for m in memory.messages] == ["m0", "m1", "m2"]
+    for i in range(3, 500):
+        memory.add_message(BaseMessage("User", f"m{i}"))
+    assert [m.content for m in held] == ["m0", "m1", "m2"]
+    assert [m.content for m in held[::-1]] == ["m2", "m1", "m0"]
+    assert [m.content for m in memory.messages] == ["m497", "m498", "m499"]
+    # Evicted messages are cut off the window's list as writes go on
+    assert len(memory._items) < 3 * 64
+
+
+def test_search_reads_storage_outside_the_lock(tmp_path, monkeypatch):
+    """Test paging stored messages in does not hold up writers"""
+    storage = AppendOnlyLog(str(tmp_path), sync=False)
+    memory = ChatHistoryMemory(window_size=2, storage=storage)
+    for i in range(10):
+        memory.add_message(BaseMessage("User", f"topic{i} message"))
+    real_read = storage.read
+    locked = []
+
+    def read(start, stop):
+        locked.append(memory._lock.locked())
+        return real_read(start, stop)
+
+    monkeypatch.setattr(storage, "read", read)
+    assert memory.search("topic3")[0].content == "topic3 message"
+    assert locked and not any(locked)
+    memory.close()
@@ -0,0 +1,198 @@
+"""Test persistent storage backends for ChatHistoryMemory"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatHistoryMemory
+from examples.messages import BaseMessage
+from examples.storage import (
+    AppendOnlyLog,
+    SQLiteStorage,
+    decode_message,
+    encode_message,
+)
+
+
+def numbered(count, start=0):
+    """Distinct user messages for ordering checks"""
+    return [BaseMessage("User", f"message {i}") for i in range(start, start + count)]
+
+
+@pytest.fixture(params=["log", "sqlite"])
+def open_storage(request, tmp_path):
+    """Factory reopening the same backend location"""
+
+    def factory(**kwargs):
+        if request.param == "log":
+            return AppendOnlyLog(str(tmp_path / "log"), **kwargs)
+        return SQLiteStorage(str(tmp_path / "history.db"), **kwargs)
+
+    return factory
+
+
+def test_record_round_trip():
+    """Test encoding keeps every field, including None and unicode"""
+    for message in (
+        BaseMessage("Assistant", "héllo ✓", "assistant"),
+        BaseMessage("User", "", optimization_phrase="Urgent:"),
+        BaseMessage("x" * 70_000, "long role name", "y" * 70_000, "z" * 70_000),
+    ):
+        record = encode_message(message)
+        assert decode_message(record[8:]) == message
+
+
+def test_history_survives_restart(open_storage):
+    """Test a reopened memory refills its window and keeps the history"""
+    memory = ChatHistoryMemory(window_size=5, storage=open_storage())
+    for message in numbered(20):
+        memory.add_message(message)
+    memory.close()
+
+    reopened = ChatHistoryMemory(window_size=5, storage=open_storage())
+    assert [m.content for m in reopened.messages] == [
+        f"message {i}" for i in range(15, 20)
+    ]
+    history = reopened.history
+    assert len(history) == 20
+    assert history[0].content == "message 0"
+    assert [m.content for m in history[3:6]] == ["message 3", "message 4", "message 5"]
+    assert [m.content for m in history] == [f"message {i}" for i in range(20)]
+    reopened.close()
+
+
+def test_budgeted_window_refills_without_loading_history(open_storage):
+    """Test a char-budgeted memory pages in only what its window holds"""
+    storage = open_storage()
+    storage.extend(numbered(5000))
+    storage.close()
+
+    storage = open_storage()
+    reads = []
+    read = storage.read
+
+    def counting_read(start, stop):
+        reads.append(stop - start)
+        return read(start, stop)
+
+    storage.read = counting_read
+    memory = ChatHistoryMemory(window_size=None, max_chars=100, storage=storage)
+    assert [m.content for m in memory.messages] == [
+        f"message {i}" for i in range(4992, 5000)
+    ]
+    assert sum(reads) <= 1024 and len(memory.history) == 5000
+    memory.add_message(BaseMessage("User", "message 5000"))
+    assert memory.history[-1].content == "message 5000"
+    memory.close()
+
+
+def test_filtered_messages_are_not_persisted(open_storage):
+    """Test should_store applies to storage as well as the window"""
+    memory = ChatHistoryMemory(storage=open_storage())
+    memory.add_messages(
+        [BaseMessage("User", "keep"), BaseMessage("User", "[DO NOT STORE] secret")]
+    )
+    assert [m.content for m in memory.history] == ["keep"]
+    memory.close()
+
+
+def test_appends_are_group_committed(tmp_path):
+    """Test nothing is written until a group is complete"""
+    storage = AppendOnlyLog(str(tmp_path), group_size=4, commit_interval=60)
+    segment = os.path.join(str(tmp_path), "00000000.log")
+    for message in numbered(3):
+        storage.append(message)
+    assert os.path.getsize(segment) == 0
+    # Pending messages are still readable
+    assert [m.content for m in storage.tail(2)] == ["message 1", "message 2"]
+    storage.append(BaseMessage("User", "message 3"))
+    assert os.path.getsize(segment) > 0
+    storage.close()
+
+
+def test_short_and_failed_writes_keep_the_index_consistent(tmp_path, monkeypatch):
+    """Test records are indexed only after every byte of them is written"""
+    storage = AppendOnlyLog(str(tmp_path), group_size=1)
+    storage.append(BaseMessage("User", "before"))
+    segment = os.path.join(str(tmp_path), "00000000.log")
+    size = os.path.getsize(segment)
+    real_write = os.write
+    calls = []
+
+    def short_write(fd, data):
+        calls.append(len(data))
+        return real_write(fd, data[:10])
+
+    monkeypatch.setattr(os, "write", short_write)
+    storage.append(BaseMessage("User", "written in pieces"))
+    assert len(calls) > 1
+    assert storage.read(1, 2)[0].content == "written in pieces"
+    size = os.path.getsize(segment)
+
+    def failing_write(fd, data):
+        # Part of the batch reaches the file before the disk fills up
+        if calls[-1] == 0:
+            raise OSError("disk full")
+        calls.append(0)
+        return real_write(fd, data[:10])
+
+    monkeypatch.setattr(os, "write", failing_write)
+    with pytest.raises(OSError):
+        storage.append(BaseMessage("User", "lost in a crash"))
+    assert os.path.getsize(segment) == size
+    assert storage._stored_count() == 2
+
+    monkeypatch.setattr(os, "write", real_write)
+    storage.flush()
+    storage.close()
+    reopened = AppendOnlyLog(str(tmp_path))
+    assert [m.content for m in reopened.read(0, 3)] == [
+        "before",
+        "written in pieces",
+        "lost in a crash",
+    ]
+    reopened.close()
+
+
+def test_torn_tail_is_truncated_on_open(tmp_path):
+    """Test a partial record from a crash is dropped, earlier ones kept"""
+    storage = AppendOnlyLog(str(tmp_path), group_size=1)
+    storage.extend(numbered(3))
+    storage.close()
+    segment = os.path.join(str(tmp_path), "00000000.log")
+    intact_size = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        f.write(encode_message(BaseMessage("User", "torn"))[:-3])
+
+    reopened = AppendOnlyLog(str(tmp_path), group_size=1)
+    assert len(reopened) == 3
+    assert os.path.getsize(segment) == intact_size
+    reopened.append(BaseMessage("User", "after crash"))
+    assert reopened.read(2, 4)[1].content == "after crash"
+    reopened.close()
+
+
+def test_segments_roll_over_and_read_across(tmp_path):
+    """Test small segments roll over and reads span them"""
+    storage = AppendOnlyLog(str(tmp_path), segment_bytes=200, group_size=2)
+    for message in numbered(30):
+        storage.append(message)
+    storage.flush()
+    assert len([n for n in os.listdir(str(tmp_path)) if n.endswith(".log")]) > 3
+    contents = [m.content for m in storage.read(0, 30)]
+    assert contents == [f"message {i}" for i in range(30)]
+    storage.close()
+
+    reopened = AppendOnlyLog(str(tmp_path), segment_bytes=200)
+    assert [m.content for m in reopened.read(9, 12)] == [
+        "message 9",
+        "message 10",
+        "message 11",
+    ]
+    reopened.close()
@@ -0,0 +1,171 @@
+"""Test streaming responses from ChatAgent.step_stream and the CLI"""
+
+import sys
+import os
+import time
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.cli import stream_message
+from examples.demo_tool_usage import (
+    BaseTool,
+    ChatAgent,
+    ChatHistoryMemory,
+    GreetingTool,
+)
+from examples.messages import BaseMessage
+from examples.tracing import InMemorySink, Tracer
+
+
+def make_tool(name: str, delay: float, reply: str, timeout=None):
+    """Tool class ``name`` that sleeps ``delay`` seconds then replies"""
+
+    def execute(self, *args, **kwargs) -> str:
+        time.sleep(delay)
+        return reply
+
+    return type(
+        name, (BaseTool,), {"name": name, "timeout": timeout, "execute": execute}
+    )
+
+
+SlowTool = make_tool("slow_tool", 0.3, "slow done")
+FastTool = make_tool("fast_tool", 0.0, "fast done")
+
+
+def test_fast_tool_is_streamed_before_slow_tool_finishes():
+    """Test chunks arrive in completion order, ahead of slow tools"""
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+    message = BaseMessage("User", "use slow_tool and fast_tool")
+
+    start = time.perf_counter()
+    stream = agent.step_stream(message)
+    first = next(stream)
+    first_latency = time.perf_counter() - start
+    rest = list(stream)
+
+    assert first.source == "fast_tool"
+    assert first.content == "Used fast_tool: fast done"
+    assert first_latency < 0.2
+    assert [chunk.source for chunk in rest] == ["slow_tool", None]
+    final = rest[-1]
+    assert final.final and not first.final
+    # The final message keeps the order step() would use
+    assert final.message.content == (
+        "Used slow_tool: slow done\nUsed fast_tool: fast done"
+    )
+
+
+def test_stream_writes_same_memory_as_step():
+    """Test a streamed step leaves memory and metrics as step() would"""
+    message = BaseMessage("User", "use slow_tool and fast_tool")
+    streaming = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+    stepping = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+
+    final = list(streaming.step_stream(message))[-1].message
+    response = stepping.step(message)
+
+    assert final.content == response.content
+    assert [m.content for m in streaming.memory.messages] == [
+        m.content for m in stepping.memory.messages
+    ]
+    assert streaming.performance_data[-1]["tools_used"] == 2
+
+
+def test_stream_reports_timeouts_and_plain_replies():
+    """Test timed-out tools are streamed and replies yield one final chunk"""
+    hanging = make_tool("hanging_tool", 0.5, "late", timeout=0.05)
+    sink = InMemorySink()
+    agent = ChatAgent(
+        memory=ChatHistoryMemory(),
+        tools=[hanging, FastTool],
+        tracer=Tracer([sink]),
+    )
+
+    chunks = list(agent.step_stream(BaseMessage("User", "hanging_tool fast_tool")))
+    assert [chunk.content for chunk in chunks[:2]] == [
+        "Used fast_tool: fast done",
+        "Used hanging_tool: timed out after 0.05s",
+    ]
+    assert len(sink.by_name("first_output")) == 1
+
+    reply = list(agent.step_stream(BaseMessage("User", "Hello there")))
+    assert len(reply) == 1 and reply[0].message.content == "Hello World!"
+
+
+def test_broadcast_delegation_streams_each_worker():
+    """Test every broadcast worker's response is streamed as it completes"""
+    memory = ChatHistoryMemory(window_size=100)
+    workers = [
+        ChatAgent(memory=memory, tools=[make_tool("work_tool", delay, f"w{i}")])
+        for i, delay in enumerate([0.3, 0.0])
+    ]
+    manager = ChatAgent(
+        memory=memory,
+        tools=[],
+        delegate_workers=workers,
+        delegation_strategy="broadcast",
+    )
+
+    chunks = list(
+        manager.step_stream(BaseMessage("Manager", "Delegate to worker: work_tool"))
+    )
+    assert [chunk.source for chunk in chunks] == ["worker 2", "worker 1", None]
+    assert chunks[-1].message.content == (
+        "Delegated to worker 1: Used work_tool: w0\n"
+        "Delegated to worker 2: Used work_tool: w1"
+    )
+
+
+def test_single_worker_delegation_streams_what_step_returns():
+    """Test a single delegated result is streamed worded as step() words it"""
+    message = BaseMessage("Manager", "Delegate to worker: work_tool")
+
+    def manager():
+        worker = ChatAgent(
+            memory=ChatHistoryMemory(), tools=[make_tool("work_tool", 0.0, "done")]
+        )
+        return ChatAgent(
+            memory=ChatHistoryMemory(), tools=[], delegate_workers=[worker]
+        )
+
+    chunks = list(manager().step_stream(message))
+    response = manager().step(message)
+    assert len(chunks) == 1
+    assert chunks[0].message.content == response.content
+    lines = list(stream_message(manager(), message.content))
+    assert lines == [f"Agent: {response.content}"]
+
+
+def test_closed_stream_still_writes_memory():
+    """Test closing a stream after its first chunk keeps step() bookkeeping"""
+    message = BaseMessage("User", "use slow_tool and fast_tool")
+    streaming = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+    stepping = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+
+    stream = streaming.step_stream(message)
+    assert next(stream).source == "fast_tool"
+    stream.close()
+    stepping.step(message)
+
+    assert [m.content for m in streaming.memory.messages] == [
+        m.content for m in stepping.memory.messages
+    ]
+    assert streaming.performance_data[-1]["tools_used"] == 2
+
+
+def test_cli_stream_message_lines():
+    """Test the CLI prints each chunk once, without repeating the final"""
+    agent = ChatAgent(memory=ChatHistoryMemory(), tools=[SlowTool, FastTool])
+    lines = list(stream_message(agent, "use slow_tool and fast_tool", verbose=True))
+    assert lines == [
+        "Agent: Used fast_tool: fast done",
+        "Used slow_tool: slow done",
+        "[System reflection] Used slow_tool: slow done\nUsed fast_tool: fast done",
+    ]
+
+    greeter = ChatAgent(memory=ChatHistoryMemory(), tools=[GreetingTool])
+    assert list(stream_message(greeter, "Hello there")) == ["Agent: Hello World!"]
@@ -0,0 +1,120 @@
+"""Test [SUMMARIZE] handling and memory compaction"""
+
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatHistoryMemory, setup_tool_agent
+from examples.messages import BaseMessage
+from examples.summarize import KeywordSummarizer
+
+
+class UpperSummarizer:
+    """Custom summarizer recording how often it folds"""
+
+    def __init__(self):
+        self.folds = 0
+
+    def summarize(self, text: str) -> str:
+        """Shout the first word"""
+        return f"SUMMARY {text.split()[0].upper()}"
+
+    def fold(self, summary, messages) -> str:
+        """Count folded messages"""
+        self.folds += 1
+        previous = int(summary.split()[-1]) if summary else 0
+        return f"folded {previous + len(messages)}"
+
+
+def test_tagged_message_is_stored_as_summary():
+    """Test an agent stores a [SUMMARIZE] message as a short summary"""
+    agent = setup_tool_agent()
+    long_text = " ".join(["foo"] * 50)
+    agent.step(BaseMessage.make_user_message("User", f"{long_text} [SUMMARIZE]"))
+
+    stored = agent.memory.messages[0]
+    assert stored.role_type == "user"
+    assert "summary" in stored.content.lower() and len(stored.content) < 50
+    assert "foo" in stored.content and "50 words" in stored.content
+
+
+def test_keyword_summaries_are_deterministic_and_bounded():
+    """Test the default summarizer ranks frequent terms and fits its limit"""
+    summarizer = KeywordSummarizer()
+    text = "deploy the release, then deploy again; the release notes mention deploy"
+    assert summarizer.summarize(text) == "Summary: deploy release again (11 words)"
+    assert len(summarizer.summarize("word " * 500 + "x" * 100)) <= 48
+
+
+def test_compaction_folds_evicted_messages():
+    """Test evicted messages survive in the rolling summary"""
+    memory = ChatHistoryMemory(window_size=3, compact=True)
+    memory.add_message(BaseMessage("User", "the database migration failed twice"))
+    for i in range(5):
+        memory.add_message(BaseMessage("User", f"filler message {i}"))
+
+    assert memory.summarized_count == 3
+    assert "database" in memory.summary and "migration" in memory.summary
+    context = memory.context
+    assert context[0].role_type == "system" and context[0].content == memory.summary
+    assert context[1:] == list(memory.messages)
+
+
+def test_rolling_summary_stays_bounded():
+    """Test the summary does not grow with the number of folded messages"""
+    memory = ChatHistoryMemory(window_size=2, compact=True)
+    for i in range(2000):
+        memory.add_message(BaseMessage("User", f"topic{i} detail{i % 7} status"))
+    assert memory.summarized_count == 1998
+    assert len(memory.summary) <= memory.summarizer.max_summary_chars
+    assert "status" in memory.summary
+
+
+def test_without_compaction_evictions_are_dropped():
+    """Test the default memory keeps no summary"""
+    memory = ChatHistoryMemory(window_size=1)
+    memory.add_messages([BaseMessage("User", "first"), BaseMessage("User", "second")])
+    assert memory.summary is None and memory.context == list(memory.messages)
+
+
+def test_custom_summarizer_folds_once_per_batch():
+    """Test a pluggable summarizer sees whole batches of evictions"""
+    summarizer = UpperSummarizer()
+    memory = ChatHistoryMemory(window_size=2, summarizer=summarizer, compact=True)
+    memory.add_messages(BaseMessage("User", f"message {i}") for i in range(10))
+    memory.add_message(BaseMessage("User", "hello there [SUMMARIZE]"))
+
+    assert summarizer.folds == 2
+    assert memory.summary == "folded 9"
+    assert memory.messages[-1].content == "SUMMARY HELLO"
+
+
+def test_later_topics_reach_the_rolling_summary():
+    """Test recent evictions push the first topic out of the summary"""
+    memory = ChatHistoryMemory(window_size=2, compact=True)
+    for i in range(50):
+        memory.add_message(
+            BaseMessage("User", f"database index postgres vacuum replica query{i}")
+        )
+    assert "postgres" in memory.summary
+    for i in range(500):
+        memory.add_message(
+            BaseMessage("User", f"kubernetes cluster pod deployment ingress node{i}")
+        )
+    assert "kubernetes" in memory.summary and "ingress" in memory.summary
+    assert "postgres" not in memory.summary
+    assert len(memory.summary) <= memory.summarizer.max_summary_chars
+
+
+def test_fold_picks_up_a_foreign_summary():
+    """Test a summary made elsewhere is carried into the next fold"""
+    summarizer = KeywordSummarizer()
+    folded = summarizer.fold(
+        "Summary: database, migration", [BaseMessage("User", "lunch plans")]
+    )
+    assert folded.startswith("Summary: database, migration")
+    assert "lunch" in folded
@@ -0,0 +1,135 @@
+"""Test per-phase tracing spans and sinks"""
+
+import asyncio
+import json
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+# pylint: disable=import-error,no-name-in-module,wrong-import-position
+from examples.demo_tool_usage import ChatAgent, ChatHistoryMemory, setup_tool_agent
+from examples.messages import BaseMessage
+from examples.tracing import InMemorySink, JsonlSink, PrometheusSink, Tracer
+
+
+def traced_agent(**kwargs):
+    """Tool agent whose spans land in an in-memory sink"""
+    sink = InMemorySink()
+    agent = setup_tool_agent()
+    agent.tracer = Tracer([sink])
+    for name, value in kwargs.items():
+        setattr(agent, name, value)
+    return agent, sink
+
+
+def test_disabled_tracer_emits_nothing():
+    """Test a tracer without sinks hands out the shared no-op span"""
+    tracer = Tracer()
+    assert not tracer.enabled
+    assert tracer.span("a") is tracer.span("b")
+    with tracer.span("phase") as span:
+        span.set(ignored=True)
+    tracer.record("phase", 0.1)
+
+
+class UnusableTracer(Tracer):
+    """Disabled tracer that fails if a step still opens spans on it"""
+
+    def span(self, name, **attributes):
+        raise AssertionError(f"span {name!r} opened while tracing is off")
+
+    def record(self, name, duration, **attributes):
+        raise AssertionError(f"span {name!r} recorded while tracing is off")
+
+
+def test_untraced_steps_skip_the_tracer():
+    """Test step, step_stream and astep never touch a disabled tracer"""
+    agent = setup_tool_agent()
+    agent.tracer = UnusableTracer()
+    for text in ("Hello there", "use greeting_tool and rating_tool"):
+        message = BaseMessage("User", text)
+        expected = agent.step(message).content
+        assert list(agent.step_stream(message))[-1].content == expected
+        assert asyncio.run(agent.astep(message)).content == expected
+    assert len(agent.performance_data) == 6
+    assert agent.performance_data[-1]["tools_used"] == 2
+
+
+def test_tool_step_spans_each_phase():
+    """Test a tool step records memory, dispatch, tool and step spans"""
+    agent, sink = traced_agent()
+    agent.step(BaseMessage("User", "use greeting_tool and rating_tool"))
+
+    names = [span.name for span in sink.spans]
+    assert names[-1] == "step"
+    for phase in ("memory.add", "file_command", "dispatch", "tools"):
+        assert phase in names
+    tools = sorted(span.attributes["tool"] for span in sink.by_name("tool.execute"))
+    assert tools == ["greeting_tool", "rating_tool"]
+    step = sink.by_name("step")[0]
+    assert step.attributes == {"path": "tools", "tools_used": 2}
+    assert step.duration >= sink.by_name("tools")[0].duration
+
+
+def test_every_return_path_records_performance():
+    """Test file, delegation and tool responses are all measured"""
+    worker = ChatAgent(memory=ChatHistoryMemory(), tools=[])
+    agent, sink = traced_agent(delegate_workers=[worker])
+    agent.step(BaseMessage("User", "add notes.txt"))
+    agent.step(BaseMessage("User", "delegate to worker: summarize"))
+    agent.step(BaseMessage("User", "use greeting_tool"))
+    agent.step(BaseMessage("User", "Just say hello"))
+
+    paths = [span.attributes["path"] for span in sink.by_name("step")]
+    assert paths == ["file_command", "delegation", "tools", "reply"]
+    assert len(agent.performance_data) == 4
+    assert agent.calculate_performance_metrics().tool_usage_count == 1
+    assert sink.by_name("delegation")[0].attributes["strategy"] == "least_loaded"
+
+
+def test_jsonl_sink_writes_one_span_per_line(tmp_path):
+    """Test the JSONL sink appends parseable span records"""
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer([JsonlSink(str(path), flush_every=1)])
+    with tracer.span("phase", tool="x"):
+        pass
+    tracer.record("tool.execute", 0.25, tool="y")
+    tracer.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["phase", "tool.execute"]
+    assert records[1]["duration"] == 0.25
+    assert records[1]["attributes"] == {"tool": "y"}
+
+
+def test_prometheus_sink_exposition(tmp_path):
+    """Test the Prometheus sink writes cumulative histograms per phase"""
+    path = tmp_path / "agent.prom"
+    sink = PrometheusSink(str(path), buckets=(0.01, 0.1), write_every=1000)
+    tracer = Tracer([sink])
+    for duration in (0.005, 0.05, 0.5):
+        tracer.record("tools", duration)
+    assert not path.exists()
+    tracer.close()
+
+    text = path.read_text()
+    assert "# TYPE agent_phase_duration_seconds histogram" in text
+    assert 'agent_phase_duration_seconds_bucket{phase="tools",le="0.01"} 1' in text
+    assert 'agent_phase_duration_seconds_bucket{phase="tools",le="0.1"} 2' in text
+    assert 'agent_phase_duration_seconds_bucket{phase="tools",le="+Inf"} 3' in text
+    assert 'agent_phase_duration_seconds_count{phase="tools"} 3' in text
+
+
+def test_failed_phase_is_tagged():
+    """Test spans closed by an exception carry the error type"""
+    sink = InMemorySink()
+    tracer = Tracer([sink])
+    try:
+        with tracer.span("phase"):
+            raise KeyError("boom")
+    except KeyError:
+        pass
+    assert sink.spans[0].attributes == {"error": "KeyError"}